@@ -0,0 +1,285 @@
+"""실제 크롤링 명령을 로컬 대역 서버에 돌려서 처리량을 잰다.
+
+c3_crawling 디렉터리에서:
+
+    python -m benchmarks.run --site oliveyoung --engine http --products 240 --latency-ms 30
+    python -m benchmarks.run --site zigzag --categories 2 -- --detail-workers 4
+
+-- 뒤의 인자는 크롤링 명령에 그대로 넘긴다. 실행마다 처리량(상품/초), 상품당 WebDriver
+명령 수, 상품당 DB 문 수, 최대 RSS(크롬 포함)를 benchmarks/results.jsonl 에 커밋 해시와 함께
+한 줄씩 남기고, 같은 시나리오의 이전 결과와 나란히 보여준다.
+첫 실행은 빈 DB 에 신규 저장, 다음 실행부터는 대역 서버 seed 를 바꿔 일부 가격만 바뀐 상태를 잰다.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.request import urlopen
+
+import psutil
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCH_DIR.parent
+RESULTS_PATH = BENCH_DIR / 'results.jsonl'
+
+SITES = {
+    'oliveyoung': {'command': 'oy_cosmetics', 'table': 'oycosmetic', 'setting': 'OLIVEYOUNG_BASE_URL'},
+    'zigzag': {'command': 'zz_cosmetics', 'table': 'zzcosmetic', 'setting': 'ZIGZAG_BASE_URL'},
+    'musinsa': {'command': 'mss_cosmetics', 'table': 'msscosmetic', 'setting': 'MUSINSA_BASE_URL'},
+}
+
+
+class Counters:
+    """WebDriver 명령과 DB 문을 센다. 상세 파이프라인 스레드에서도 불리므로 잠근다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.webdriver_calls = 0
+        self.db_statements = 0
+
+    def reset(self):
+        with self.lock:
+            self.webdriver_calls = 0
+            self.db_statements = 0
+
+    def install(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+        from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+        counters = self
+        execute = RemoteConnection.execute
+
+        def counted_execute(connection, command, params):
+            with counters.lock:
+                counters.webdriver_calls += 1
+            return execute(connection, command, params)
+
+        RemoteConnection.execute = counted_execute
+
+        def count_statement(run, sql, params, many, context):
+            with counters.lock:
+                counters.db_statements += 1
+            return run(sql, params, many, context)
+
+        def on_connection_created(sender, connection, **kwargs):
+            if count_statement not in connection.execute_wrappers:
+                connection.execute_wrappers.append(count_statement)
+
+        # 스레드마다 새로 여는 연결에도 걸리도록 시그널로 붙인다
+        connection_created.connect(on_connection_created, weak=False)
+        for connection in connections.all():
+            on_connection_created(None, connection)
+
+
+class RssSampler(threading.Thread):
+    """이 프로세스와 자식(chromedriver, 크롬) RSS 합계의 최댓값을 주기적으로 잰다."""
+
+    def __init__(self, interval=0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        process = psutil.Process()
+        while not self.stopped.is_set():
+            total = 0
+            for member in [process] + process.children(recursive=True):
+                try:
+                    total += member.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.peak = max(self.peak, total)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_standin(args, port):
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'benchmarks.standin', '--port', str(port),
+            '--products', str(args.products), '--latency-ms', str(args.latency_ms),
+            '--jitter-ms', str(args.jitter_ms), '--image-kb', str(args.image_kb),
+        ],
+        cwd=PROJECT_DIR,
+    )
+    for _ in range(100):
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError('대역 서버가 뜨지 않았습니다')
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def limit_categories(site, count):
+    """크롤링 명령의 카테고리 목록을 앞에서부터 카테고리 코드 count 개로 줄인다."""
+    from importlib import import_module
+
+    module = import_module(f"c3_crawling_app.management.commands.{SITES[site]['command']}")
+    limited, total = {}, 0
+    for name, codes in module.CATEGORIES.items():
+        if total >= count:
+            break
+        if isinstance(codes, list):
+            codes = codes[:count - total]
+            total += len(codes)
+        else:
+            total += 1
+        limited[name] = codes
+    module.CATEGORIES = limited
+    return total
+
+
+def scenario_of(args):
+    return {
+        'site': args.site,
+        'engine': args.engine if args.site == 'oliveyoung' else 'selenium',
+        'products': args.products,
+        'categories': args.categories,
+        'latency_ms': args.latency_ms,
+        'db': args.db,
+        'command_args': args.command_args,
+    }
+
+
+def show_history(scenario, limit=10):
+    if not RESULTS_PATH.exists():
+        return
+    with open(RESULTS_PATH, encoding='utf-8') as results_file:
+        rows = [json.loads(line) for line in results_file if line.strip()]
+    rows = [row for row in rows if row['scenario'] == scenario][-limit:]
+    print(f"{'시각':<20} {'커밋':<9} {'회차':>3} {'상품/초':>8} {'WD/상품':>8} {'DB/상품':>8} {'RSS MB':>8}")
+    for row in rows:
+        print(
+            f"{row['timestamp']:<20} {row['commit'] or '-':<9} {row['run']:>3} "
+            f"{row['products_per_sec']:>8.1f} {row['webdriver_calls_per_product']:>8.2f} "
+            f"{row['db_statements_per_product']:>8.2f} {row['peak_rss_mb']:>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='크롤러 오프라인 벤치마크')
+    parser.add_argument('--site', choices=sorted(SITES), required=True)
+    parser.add_argument('--engine', choices=['selenium', 'http', 'async'], default='selenium',
+                        help='올리브영 목록 수집 방식')
+    parser.add_argument('--products', type=int, default=120, help='카테고리당 상품 수')
+    parser.add_argument('--categories', type=int, default=2, help='크롤링할 카테고리(코드) 수')
+    parser.add_argument('--latency-ms', type=float, default=30, help='대역 서버 응답 지연(ms)')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='응답 지연에 더할 무작위 값의 최대(ms)')
+    parser.add_argument('--image-kb', type=int, default=20, help='상품 이미지 한 장의 크기(KB)')
+    parser.add_argument('--runs', type=int, default=2, help='같은 DB 로 연달아 돌릴 횟수')
+    parser.add_argument('--db', choices=['sqlite', 'mysql'], default='sqlite',
+                        help='mysql 이면 BENCH_MYSQL_NAME(기본 c3_bench) 스키마를 쓴다')
+    parser.add_argument('--no-save', action='store_true', help='results.jsonl 에 남기지 않는다')
+    parser.add_argument('command_args', nargs=argparse.REMAINDER, help='-- 뒤에 크롤링 명령 인자')
+    args = parser.parse_args()
+    args.command_args = [arg for arg in args.command_args if arg != '--']
+
+    port = free_port()
+    standin = start_standin(args, port)
+    workdir = tempfile.TemporaryDirectory(prefix='c3-bench-')
+    try:
+        # 설정 모듈이 읽기 전에 환경변수를 채운다
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+        os.environ['BENCH_DB'] = args.db
+        os.environ['BENCH_SQLITE_PATH'] = os.path.join(workdir.name, 'bench.sqlite3')
+        for site in SITES.values():
+            os.environ[site['setting']] = f'http://127.0.0.1:{port}'
+        # 크롤링 명령이 cwd 에 남기는 로그 파일도 임시 디렉터리로 보낸다
+        os.chdir(workdir.name)
+        sys.path.insert(0, str(PROJECT_DIR))
+
+        import django
+        django.setup()
+        from django.core.management import call_command
+        from django.db import connection
+
+        call_command('migrate', verbosity=0)
+        categories = limit_categories(args.site, args.categories)
+        expected = categories * args.products
+        counters = Counters()
+        counters.install()
+
+        command_args = list(args.command_args)
+        if args.site == 'oliveyoung':
+            command_args += ['--engine', args.engine]
+
+        scenario = scenario_of(args)
+        commit = git_commit()
+        for run in range(1, args.runs + 1):
+            # 두 번째 실행부터는 일부 상품의 가격만 바뀐 상태
+            urlopen(f'http://127.0.0.1:{port}/_bench/seed?value={run - 1}').read()
+            counters.reset()
+            sampler = RssSampler()
+            sampler.start()
+            started = time.perf_counter()
+            call_command(SITES[args.site]['command'], *command_args)
+            seconds = time.perf_counter() - started
+            peak_rss = sampler.stop()
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM {SITES[args.site]['table']}")
+                rows = cursor.fetchone()[0]
+
+            result = {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'commit': commit,
+                'scenario': scenario,
+                'run': run,
+                'seconds': round(seconds, 3),
+                'expected_products': expected,
+                'rows': rows,
+                'products_per_sec': round(expected / seconds, 2),
+                'webdriver_calls': counters.webdriver_calls,
+                'webdriver_calls_per_product': round(counters.webdriver_calls / expected, 3),
+                'db_statements': counters.db_statements,
+                'db_statements_per_product': round(counters.db_statements / expected, 3),
+                'peak_rss_mb': round(peak_rss / 1024 / 1024, 1),
+            }
+            print(json.dumps(result, ensure_ascii=False))
+            if rows != expected:
+                print(f'경고: 저장된 상품 {rows}개, 기대값 {expected}개', file=sys.stderr)
+            if not args.no_save:
+                with open(RESULTS_PATH, 'a', encoding='utf-8') as results_file:
+                    results_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+        show_history(scenario)
+    finally:
+        standin.terminate()
+        standin.wait()
+        os.chdir(PROJECT_DIR)
+        workdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
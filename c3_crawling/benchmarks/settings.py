@@ -0,0 +1,17 @@
+# 벤치마크 전용 설정. 운영 DB 를 건드리지 않도록 SQLite 임시 파일이나 별도 MySQL 스키마를 쓴다.
+import os
+
+from c3_crawling.settings import *  # noqa: F401,F403
+from c3_crawling.settings import DATABASES
+
+if os.environ.get('BENCH_DB', 'sqlite') == 'mysql':
+    DATABASES['default']['NAME'] = os.environ.get('BENCH_MYSQL_NAME', 'c3_bench')
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ['BENCH_SQLITE_PATH'],
+            # 상세 파이프라인의 저장 스레드와 메인 스레드가 같이 쓰므로 잠금을 기다리게 한다
+            'OPTIONS': {'timeout': 30},
+        }
+    }
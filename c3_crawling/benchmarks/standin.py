@@ -0,0 +1,234 @@
+"""올리브영/지그재그/무신사 페이지 구조를 흉내 낸 로컬 대역 서버.
+
+크롤러가 읽는 선택자(카드, 가격, 링크)와 페이지 방식(올리브영 페이지 번호, 지그재그/무신사
+무한 스크롤)만 맞춘 합성 페이지를 돌려준다. 상품과 가격은 seed 로 정해지므로 같은 설정이면
+항상 같은 카탈로그가 나오고, /_bench/seed?value=N 으로 일부 상품의 가격만 바꿀 수 있다.
+
+    python -m benchmarks.standin --port 8765 --products 120 --latency-ms 30
+"""
+import argparse
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+OY_PAGE_SIZE = 24
+SCROLL_BATCH = 20
+# 같은 포장 사진을 여러 상품이 쓰는 것처럼 이미지 내용은 이만큼만 서로 다르다
+IMAGE_VARIANTS = 7
+
+ZZ_CARD = (
+    '<div class="css-5hci9z" style="height:320px">'
+    '<a class="css-152zj1o product-card-link" href="/catalog/products/{id}">'
+    '<img class="zds4_11053yc2" src="/_bench/img/{id}.jpg">'
+    '<span class="zds4_1kdomr8">{brand}</span>'
+    '<p class="zds4_1kdomrc zds4_1kdomra">{name}</p>'
+    '<span class="zds4_s96ru86 zds4_s96ru8w zds4_1jsf80i3 zds4_1jsf80i5">{sale_price:,}원</span>'
+    '</a></div>'
+)
+MSS_CARD = (
+    '<div class="sc-fUnNpA iCowMw" style="height:320px">'
+    '<a class="gtm-select-item" href="/products/{id}"><img class="max-w-full" src="/_bench/img/{id}.jpg"></a>'
+    '<span class="text-etc_11px_semibold sc-dcJtft sc-iGgVNO jEEFmT laXDWb font-pretendard">{brand}</span>'
+    '<span class="text-body_13px_reg sc-dcJtft sc-gsFSjX jEEFmT eEPdZZ font-pretendard">{name}</span>'
+    '<span class="text-body_13px_semi sc-fqkwJk ioeSYE font-pretendard">{discount}%</span>'
+    '<span class="text-body_13px_semi sc-fqkwJk ioeSYE font-pretendard">{sale_price:,}원</span>'
+    '</div>'
+)
+OY_CARD = (
+    '<li><div class="prd_info">'
+    '<a class="prd_thumb" href="/store/goods/getGoodsDetail.do?goodsNo={id}&trackingCd=Cat{category}_Small">'
+    '<img src="/_bench/img/{id}.jpg"></a>'
+    '<div class="prd_name"><a><span class="tx_brand">{brand}</span><p class="tx_name">{name}</p></a></div>'
+    '<p class="prd_price">{org}<span class="tx_cur"><span class="tx_num">{sale_price:,}</span>원</span></p>'
+    '</div></li>'
+)
+
+# 스크롤이 바닥에 닿으면 다음 카드 묶음을 받아 붙인다 (실제 사이트의 무한 스크롤과 같은 동작)
+SCROLL_SCRIPT = """
+<script>
+var offset = %(offset)d, total = %(total)d, loading = false;
+window.addEventListener('scroll', function () {
+    if (loading || offset >= total) return;
+    if (window.innerHeight + window.scrollY < document.body.scrollHeight - 400) return;
+    loading = true;
+    fetch('/_bench/%(site)s/cards?category=%(category)s&offset=' + offset)
+        .then(function (response) { return response.text(); })
+        .then(function (html) {
+            document.getElementById('grid').insertAdjacentHTML('beforeend', html);
+            offset += %(batch)d;
+            loading = false;
+        });
+});
+</script>
+"""
+
+
+class Catalogue:
+    def __init__(self, products, seed=0, change_rate=0.1, discount_rate=0.7):
+        self.products = products
+        self.seed = seed
+        self.change_rate = change_rate
+        self.discount_rate = discount_rate
+
+    def product(self, site, category, index):
+        key = f'{site}-{category}-{index}'
+        stable = random.Random(key)
+        # change_rate 만큼의 상품만 seed 에 따라 가격이 달라진다
+        changes = stable.random() < self.change_rate
+        prices = random.Random(f'{key}-{self.seed}') if changes else stable
+        price = prices.randrange(50, 600) * 100
+        discounted = stable.random() < self.discount_rate
+        sale_price = price * prices.randrange(60, 95) // 100 // 10 * 10 if discounted else price
+        return {
+            'id': f'{category}{index:05d}',
+            'brand': f'브랜드{stable.randrange(1, 200)}',
+            'name': f'벤치마크 상품 {category}-{index}',
+            'price': price,
+            'sale_price': sale_price,
+            'discount': round(100 - sale_price * 100 / price),
+        }
+
+    def page(self, site, category, offset, limit):
+        return [self.product(site, category, index) for index in range(offset, min(offset + limit, self.products))]
+
+    def find(self, site, product_id):
+        category, index = product_id[:-5], int(product_id[-5:])
+        return self.product(site, category, index)
+
+
+def html_page(body, title='bench'):
+    return f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head><body>{body}</body></html>'
+
+
+class Handler(BaseHTTPRequestHandler):
+    catalogue = None
+    latency = 0.0
+    jitter = 0.0
+    image_bytes = b''
+
+    def do_GET(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.random() * self.jitter)
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path
+
+        if path == '/store/display/getMCategoryList.do':
+            return self.send_html(self.oliveyoung_listing(query['dispCatNo'], int(query.get('pageIdx', 1))))
+        if path == '/categories/1098':
+            return self.send_html(self.scroll_listing('zigzag', ZZ_CARD, query['middle_category_id']))
+        if path.startswith('/category/'):
+            return self.send_html(self.scroll_listing('musinsa', MSS_CARD, path.rsplit('/', 1)[1]))
+        if path in ('/_bench/zigzag/cards', '/_bench/musinsa/cards'):
+            site = path.split('/')[2]
+            template = ZZ_CARD if site == 'zigzag' else MSS_CARD
+            products = self.catalogue.page(site, query['category'], int(query['offset']), SCROLL_BATCH)
+            return self.send_html(''.join(template.format(**product) for product in products))
+        if path.startswith('/catalog/products/'):
+            return self.send_html(self.zigzag_detail(path.rsplit('/', 1)[1]))
+        if path.startswith('/products/'):
+            return self.send_html(self.musinsa_detail(path.rsplit('/', 1)[1]))
+        if path.startswith('/_bench/img/'):
+            return self.send_image(path.rsplit('/', 1)[1])
+        if path == '/_bench/seed':
+            self.catalogue.seed = int(query['value'])
+            return self.send_body(b'ok', 'text/plain')
+        self.send_error(404)
+
+    def oliveyoung_listing(self, category, page_number):
+        offset = (page_number - 1) * OY_PAGE_SIZE
+        cards = ''.join(
+            OY_CARD.format(
+                category=category,
+                org=(f'<span class="tx_org"><span class="tx_num">{product["price"]:,}</span>원</span>'
+                     if product['price'] != product['sale_price'] else ''),
+                **product
+            )
+            for product in self.catalogue.page('oliveyoung', category, offset, OY_PAGE_SIZE)
+        )
+        has_next = offset + OY_PAGE_SIZE < self.catalogue.products
+        paging = '<div class="pageing"><a class="next" href="#">다음</a></div>' if has_next else '<div class="pageing"></div>'
+        return html_page(f'<ul class="cate_prd_list">{cards}</ul>{paging}', '올리브영')
+
+    def scroll_listing(self, site, template, category):
+        products = self.catalogue.page(site, category, 0, SCROLL_BATCH)
+        cards = ''.join(template.format(**product) for product in products)
+        script = SCROLL_SCRIPT % {
+            'offset': SCROLL_BATCH, 'total': self.catalogue.products,
+            'site': site, 'category': category, 'batch': SCROLL_BATCH,
+        }
+        return html_page(f'<div id="grid">{cards}</div>{script}', site)
+
+    def zigzag_detail(self, product_id):
+        product = self.catalogue.find('zigzag', product_id)
+        org = f'<span class="css-14j45be">{product["price"]:,}원</span>' if product['price'] != product['sale_price'] else ''
+        return html_page(f'<h1>{product["name"]}</h1>{org}<span>{product["sale_price"]:,}원</span>', product['name'])
+
+    def musinsa_detail(self, product_id):
+        product = self.catalogue.find('musinsa', product_id)
+        org = (
+            '<span class="text-xs font-medium mb-0.5 text-gray-500 font-pretendard" '
+            f'style="text-decoration-line: line-through;">{product["price"]:,}원</span>'
+            if product['price'] != product['sale_price'] else ''
+        )
+        return html_page(f'<h1>{product["name"]}</h1>{org}<span>{product["sale_price"]:,}원</span>', product['name'])
+
+    def send_image(self, name):
+        variant = sum(name.encode('utf-8')) % IMAGE_VARIANTS
+        etag = f'"img-{variant}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_body(self.image_bytes + str(variant).encode('ascii'), 'image/jpeg', {'ETag': etag})
+
+    def send_html(self, html):
+        self.send_body(html.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def send_body(self, body, content_type, headers=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, products, latency_ms=0, jitter_ms=0, image_kb=20, seed=0, change_rate=0.1):
+    Handler.catalogue = Catalogue(products, seed=seed, change_rate=change_rate)
+    Handler.latency = latency_ms / 1000
+    Handler.jitter = jitter_ms / 1000
+    Handler.image_bytes = b'\xff\xd8' + b'\0' * (image_kb * 1024)
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='크롤러 벤치마크용 로컬 대역 서버')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--products', type=int, default=120, help='카테고리당 상품 수')
+    parser.add_argument('--latency-ms', type=float, default=0, help='요청마다 더할 응답 지연(ms)')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='응답 지연에 더할 무작위 값의 최대(ms)')
+    parser.add_argument('--image-kb', type=int, default=20, help='상품 이미지 한 장의 크기(KB)')
+    parser.add_argument('--seed', type=int, default=0, help='가격 seed (바꾸면 change-rate 만큼 가격이 바뀐다)')
+    parser.add_argument('--change-rate', type=float, default=0.1, help='seed 에 따라 가격이 바뀌는 상품 비율')
+    args = parser.parse_args()
+
+    server = serve(args.port, args.products, args.latency_ms, args.jitter_ms, args.image_kb, args.seed, args.change_rate)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -89,6 +90,19 @@ DATABASES = {
     }
 }
 
+# API 응답 캐시. 키에 catalog_version 이 들어가므로 크롤링이 데이터를 바꾸면 이전 항목은
+# 더 이상 읽히지 않고, MAX_ENTRIES 를 넘으면 오래된 것부터 버린다 (프로세스별 메모리 캐시).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'c3-api',
+        'TIMEOUT': int(os.environ.get('API_CACHE_TIMEOUT', '600')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('API_CACHE_MAX_ENTRIES', '5000')),
+        },
+    }
+}
+
 
 
 # Password validation
@@ -131,3 +145,66 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Crawling
+# 크롤러가 접속할 사이트 주소. 로컬 대역 서버로 돌릴 때 환경변수로 바꿔 끼운다.
+
+OLIVEYOUNG_BASE_URL = os.environ.get('OLIVEYOUNG_BASE_URL', 'https://www.oliveyoung.co.kr')
+ZIGZAG_BASE_URL = os.environ.get('ZIGZAG_BASE_URL', 'https://zigzag.kr')
+MUSINSA_BASE_URL = os.environ.get('MUSINSA_BASE_URL', 'https://www.musinsa.com')
+
+# 크롤링 명령의 --browser-profile lean 에서 사이트별로 더 막을 URL 패턴(block)과
+# 공통 차단 목록(이미지/폰트/추적 스크립트)에 걸려도 받아야 하는 스크립트 호스트(script_hosts).
+# 사이트가 lean 으로 깨지면 여기서 조정한다 (crawling.browser.blocked_urls). 예: 'script_hosts': ['cdn.amplitude.com']
+# 명령의 기본값은 full 이고, 사이트마다 lean 으로 목록/상세를 읽어 확인한 뒤 lean 으로 돌린다.
+BROWSER_SITE_PROFILES = {
+    'oliveyoung': {
+        'block': ['*.mp4*', '*.m3u8*'],  # 상품 영상
+        'script_hosts': [],
+    },
+    'zigzag': {
+        'block': ['*.mp4*', '*.m3u8*'],
+        'script_hosts': [],
+    },
+    'musinsa': {
+        'block': ['*.mp4*', '*.m3u8*'],
+        'script_hosts': [],
+    },
+}
+
+# 실행마다 단계별 지표를 JSON 요약과 Prometheus textfile 로 남길 디렉터리 (node exporter 의 textfile 디렉터리)
+CRAWL_METRICS_DIR = os.environ.get('CRAWL_METRICS_DIR')
+
+# mirror_images 가 받은 상품 이미지를 내용 해시(SHA-256)로 나눠 담는 디렉터리
+IMAGE_STORE_DIR = os.environ.get('IMAGE_STORE_DIR', str(BASE_DIR / 'images'))
+
+# 크롤링/배치 명령은 시작할 때 루트 로거에 사이트별 파일 핸들러를 단다 (crawling.logs.install_crawl_logging).
+# 로그는 큐에 넣기만 하고 파일 쓰기는 백그라운드 스레드가 한다. 웹 프로세스에는 달리지 않는다.
+CRAWL_LOG_DIR = os.environ.get('CRAWL_LOG_DIR', '.')
+CRAWL_LOG_FILES = {
+    'oliveyoung': 'oy_crawling.log',
+    'zigzag': 'zz_crawling.log',
+    'musinsa': 'musinsa_crawling.log',
+}
+# 사이트가 정해지지 않은 명령(match_products 등)의 로그
+CRAWL_LOG_DEFAULT_FILE = 'crawling.log'
+CRAWL_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(processName)s - %(message)s'
+# 상품별 저장 로그(새 상품/업데이트)는 이 건수마다 한 건만 남긴다. 1이면 모두 남긴다.
+CRAWL_LOG_SAMPLE_EVERY = int(os.environ.get('CRAWL_LOG_SAMPLE_EVERY', '100'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sample_products': {
+            '()': 'c3_crawling_app.crawling.logs.SampleFilter',
+            'every': CRAWL_LOG_SAMPLE_EVERY,
+        },
+    },
+    'loggers': {
+        'c3_crawling.products': {
+            'filters': ['sample_products'],
+        },
+    },
+}
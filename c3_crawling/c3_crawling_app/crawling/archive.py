@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+
+class PageArchive:
+    """크롤링하면서 본 원본 HTML 을 날짜별 디렉터리에 압축해서 남긴다.
+
+    <root>/<site>/<YYYY-MM-DD>/<pid>-<시각>.pages.gz 에 페이지마다 gzip 멤버를 하나씩 이어 붙이고,
+    같은 이름의 .index.jsonl 에 (사이트, 종류, 카테고리, 페이지, URL, 시각, 오프셋, 길이)를 적는다.
+    오프셋으로 페이지 하나만 바로 풀 수 있고, 파일 전체는 일반 gzip 으로도 풀린다.
+    프로세스마다 파일을 따로 쓰므로 워커 프로세스끼리 겹치지 않는다. root 가 없으면 아무것도 하지 않는다.
+    """
+
+    def __init__(self, root, site, day):
+        self.enabled = root is not None
+        self.site = site
+        self.lock = threading.Lock()
+        self.pages_file = None
+        self.index_file = None
+        if self.enabled:
+            directory = Path(root) / site / day.isoformat()
+            directory.mkdir(parents=True, exist_ok=True)
+            stem = f'{os.getpid()}-{datetime.now():%H%M%S}'
+            self.pages_path = directory / f'{stem}.pages.gz'
+            self.index_path = directory / f'{stem}.index.jsonl'
+
+    def __enter__(self):
+        if self.enabled:
+            self.pages_file = open(self.pages_path, 'ab')
+            self.index_file = open(self.index_path, 'a', encoding='utf-8')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def add(self, kind, category_name, category_code, page, url, html):
+        if not self.enabled:
+            return
+        data = gzip.compress(html.encode('utf-8'))
+        with self.lock:
+            offset = self.pages_file.tell()
+            self.pages_file.write(data)
+            self.pages_file.flush()
+            self.index_file.write(json.dumps({
+                'site': self.site,
+                'kind': kind,
+                'category': category_name,
+                'category_code': category_code,
+                'page': page,
+                'url': url,
+                'fetched_at': datetime.now().isoformat(timespec='seconds'),
+                'file': self.pages_path.name,
+                'offset': offset,
+                'length': len(data),
+            }, ensure_ascii=False) + '\n')
+            self.index_file.flush()
+
+    def close(self):
+        with self.lock:
+            for file in (self.pages_file, self.index_file):
+                if file is not None:
+                    file.close()
+            self.pages_file = None
+            self.index_file = None
+
+
+def archive_directory(root, site, day):
+    return Path(root) / site / day.isoformat()
+
+
+def read_index(directory):
+    """디렉터리 안의 모든 인덱스 항목을 수집 시각 순으로 돌려준다."""
+    entries = []
+    for index_path in sorted(Path(directory).glob('*.index.jsonl')):
+        with open(index_path, encoding='utf-8') as index_file:
+            entries.extend(json.loads(line) for line in index_file if line.strip())
+    entries.sort(key=lambda entry: entry['fetched_at'])
+    return entries
+
+
+def read_page(directory, entry):
+    with open(Path(directory) / entry['file'], 'rb') as pages_file:
+        pages_file.seek(entry['offset'])
+        return gzip.decompress(pages_file.read(entry['length'])).decode('utf-8')
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """초당 rate 개씩 토큰이 차는 버킷. 토큰이 없으면 찰 때까지 기다린다."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    """호스트별 동시 요청 수 제한과 토큰 버킷 속도 제한을 거쳐 페이지를 받는다.
+
+    실제 요청은 HttpClient(requests)로 스레드에서 보내고, 이벤트 루프는 대기만 한다.
+    metrics 를 넘기면 제한을 기다린 시간(throttle)과 요청 시간(fetch)을 따로 남긴다.
+    """
+
+    def __init__(self, client, per_host=4, rate=2.0, metrics=None):
+        self.client = client
+        self.metrics = metrics
+        self.per_host = per_host
+        self.rate = rate
+        self.semaphores = {}
+        self.buckets = {}
+
+    async def fetch(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.per_host)
+            self.buckets[host] = TokenBucket(self.rate)
+
+        started = time.monotonic()
+        async with self.semaphores[host]:
+            await self.buckets[host].acquire()
+            requested = time.monotonic()
+            try:
+                return await asyncio.to_thread(self.client.fetch, url)
+            finally:
+                if self.metrics is not None:
+                    self.metrics.observe('throttle', requested - started)
+                    self.metrics.observe('fetch', time.monotonic() - requested)
+
+
+async def crawl_pages(fetcher, page_url, handle_page, prefetch=1, start_page=1, retries=0, on_retry=None):
+    """start_page 부터 순서대로 처리하면서 뒤따르는 prefetch 개 페이지를 미리 받아둔다.
+
+    handle_page(page_number, url, html)가 False 를 돌려주면(빈 페이지, 마지막 페이지)
+    아직 진행 중인 선행 요청은 모두 취소한다. 받기나 처리에 실패한 페이지는 retries 번까지
+    on_retry(page_number, failures, exc) 를 부르고 다시 받아 처리하며, 그래도 안 되면 예외를 올린다.
+    """
+    pending = {}
+    page_number = start_page
+    failures = 0
+    try:
+        while True:
+            for number in range(page_number, page_number + prefetch + 1):
+                if number not in pending:
+                    url = page_url(number)
+                    pending[number] = (url, asyncio.create_task(fetcher.fetch(url)))
+
+            url, task = pending.pop(page_number)
+            try:
+                html = await task
+                has_more = await handle_page(page_number, url, html)
+            except Exception as e:
+                failures += 1
+                if failures > retries:
+                    raise
+                if on_retry is not None:
+                    on_retry(page_number, failures, e)
+                # 다음 바퀴에서 이 페이지를 다시 요청한다 (동기 엔진의 crawl_category_pages 와 같은 대기)
+                await asyncio.sleep(failures)
+                continue
+
+            failures = 0
+            if not has_more:
+                break
+            page_number += 1
+    finally:
+        tasks = [task for _, task in pending.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
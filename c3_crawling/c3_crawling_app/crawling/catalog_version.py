@@ -0,0 +1,37 @@
+from django.db import connection
+from django.utils import timezone
+
+BUMP_SQL = {
+    'mysql': """
+        INSERT INTO catalog_version (scope, version, updated_at) VALUES (%s, 1, %s)
+        ON DUPLICATE KEY UPDATE version = version + 1, updated_at = VALUES(updated_at)
+    """,
+    'sqlite': """
+        INSERT INTO catalog_version (scope, version, updated_at) VALUES (%s, 1, %s)
+        ON CONFLICT (scope) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+    """,
+}
+
+
+def bump_version(*scopes):
+    """범위별 버전을 1씩 올린다. 데이터를 바꾼 트랜잭션이 커밋된 뒤에 부른다.
+
+    커밋 전에 올리면 다른 연결이 새 버전으로 이전 데이터를 캐시할 수 있고,
+    데이터 트랜잭션 안에서 올리면 워커들이 버전 행 잠금을 두고 줄을 선다.
+    """
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for scope in scopes:
+            cursor.execute(BUMP_SQL[connection.vendor], [scope, now])
+
+
+def current_versions(scopes):
+    """{scope: version}. 한 번도 올린 적 없는 범위는 0 이다."""
+    placeholders = ', '.join(['%s'] * len(scopes))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT scope, version FROM catalog_version WHERE scope IN ({placeholders})",
+            list(scopes)
+        )
+        versions = dict(cursor.fetchall())
+    return {scope: versions.get(scope, 0) for scope in scopes}
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+
+from django.utils import timezone
+
+from c3_crawling_app.crawling.identity import url_hash
+from c3_crawling_app.models import CrawlCheckpoint
+
+
+def new_run_id():
+    # 같은 초에 연달아 시작한 실행끼리 겹치지 않도록 밀리초까지 넣는다 (문자열 정렬 = 시간 순)
+    return timezone.localtime().strftime('%Y%m%d-%H%M%S.%f')[:19]
+
+
+def resolve_run_id(site, resume, category_codes):
+    """--resume 이면 가장 최근 실행이 끝나지 않았을 때만 이어 받고, 아니면 새 실행 ID 를 만든다.
+
+    category_codes 가 모두 완료로 남은 실행은 끝난 것으로 본다. 끝난 실행보다 오래된 실행은 이어 받지 않는다.
+    """
+    if resume:
+        run_id = (
+            CrawlCheckpoint.objects.filter(site=site)
+            .order_by('-run_id').values_list('run_id', flat=True).first()
+        )
+        if run_id is None:
+            logging.info(f'{site} 이어서 할 실행이 없어 새로 시작')
+        else:
+            completed = set(
+                CrawlCheckpoint.objects.filter(site=site, run_id=run_id, completed=True)
+                .values_list('category_code', flat=True)
+            )
+            if not set(category_codes) <= completed:
+                return run_id
+            logging.info(f'{site} 가장 최근 실행 {run_id} 은(는) 이미 끝나서 새로 시작')
+    return new_run_id()
+
+
+def product_key(product_url):
+    return url_hash(product_url)[:16]
+
+
+class CheckpointStore:
+    """실행 하나의 카테고리 코드별 진행 상황을 들고 있다가 묶어서 저장한다.
+
+    진행 상황은 마지막 페이지(스크롤 횟수)와 저장까지 끝난 상품 키 목록이다.
+    호출하는 쪽은 ProductWriter 를 flush(파이프라인이면 drain)한 직후에만 flush() 를 불러서,
+    체크포인트가 실제로 저장된 상품보다 앞서 나가지 않게 한다.
+    저장은 interval 초에 한 번만 하고, 카테고리가 끝날 때는 바로 한다.
+    """
+
+    def __init__(self, site, run_id, interval=30):
+        self.site = site
+        self.run_id = run_id
+        self.interval = interval
+        self.states = {}
+        self.dirty = set()
+        self.lock = threading.Lock()
+        self.flushed_at = time.monotonic()
+
+    @classmethod
+    def load(cls, site, run_id, interval=30):
+        store = cls(site, run_id, interval)
+        rows = CrawlCheckpoint.objects.filter(site=site, run_id=run_id).values_list(
+            'category_code', 'category', 'last_page', 'processed_keys', 'completed'
+        )
+        for category_code, category, last_page, processed_keys, completed in rows:
+            store.states[category_code] = {
+                'category': category,
+                'last_page': last_page,
+                'keys': set(filter(None, processed_keys.split(','))),
+                'completed': completed,
+            }
+        done = sum(state['completed'] for state in store.states.values())
+        logging.info(f'{site} 체크포인트 {run_id}: 카테고리 {len(store.states)}개 (완료 {done}개)')
+        return store
+
+    def state(self, category_name, category_code):
+        return self.states.setdefault(category_code, {
+            'category': category_name, 'last_page': 0, 'keys': set(), 'completed': False,
+        })
+
+    def is_completed(self, category_code):
+        return category_code in self.states and self.states[category_code]['completed']
+
+    def last_page(self, category_code):
+        return self.states[category_code]['last_page'] if category_code in self.states else 0
+
+    def processed_keys(self, category_code):
+        return self.states[category_code]['keys'] if category_code in self.states else set()
+
+    def add_key(self, category_name, category_code, key):
+        with self.lock:
+            self.state(category_name, category_code)['keys'].add(key)
+            self.dirty.add(category_code)
+
+    def page_done(self, category_name, category_code, page):
+        with self.lock:
+            self.state(category_name, category_code)['last_page'] = page
+            self.dirty.add(category_code)
+
+    def category_done(self, category_name, category_code):
+        with self.lock:
+            state = self.state(category_name, category_code)
+            state['completed'] = True
+            # 끝난 카테고리는 키가 더 필요 없다
+            state['keys'] = set()
+            self.dirty.add(category_code)
+        self.flush()
+
+    def due(self):
+        return bool(self.dirty) and time.monotonic() - self.flushed_at >= self.interval
+
+    def flush(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            rows = [
+                CrawlCheckpoint(
+                    site=self.site,
+                    run_id=self.run_id,
+                    category_code=category_code,
+                    category=self.states[category_code]['category'],
+                    last_page=self.states[category_code]['last_page'],
+                    processed_keys=','.join(sorted(self.states[category_code]['keys'])),
+                    completed=self.states[category_code]['completed'],
+                )
+                for category_code in dirty
+            ]
+        self.flushed_at = time.monotonic()
+        if not rows:
+            return
+        CrawlCheckpoint.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['site', 'run_id', 'category_code'],
+            update_fields=['last_page', 'processed_keys', 'completed', 'updated_at'],
+        )
@@ -0,0 +1,109 @@
+from urllib.parse import urljoin
+
+import logging
+
+from selenium.webdriver.common.by import By
+
+from c3_crawling_app.crawling.prices import parse_price
+
+# 카드 목록 전체를 한 번의 execute_script 로 읽는다.
+# 카드마다 fields 를 차례로 찾고, 필수 필드가 없으면 그 카드만 오류로 돌려준다.
+EXTRACT_CARDS = """
+var cardSelector = arguments[0], fields = arguments[1], markAttribute = arguments[2];
+var selector = markAttribute ? cardSelector + ':not([' + markAttribute + '])' : cardSelector;
+var cards = document.querySelectorAll(selector);
+var results = [];
+for (var i = 0; i < cards.length; i++) {
+    var card = cards[i];
+    if (markAttribute) {
+        card.setAttribute(markAttribute, '1');
+    }
+    try {
+        var data = {}, error = null;
+        for (var j = 0; j < fields.length; j++) {
+            var field = fields[j];
+            var nodes = card.querySelectorAll(field.selector);
+            if (!nodes.length) {
+                if (field.required) {
+                    error = field.name + ' 없음 (' + field.selector + ')';
+                    break;
+                }
+                data[field.name] = null;
+                continue;
+            }
+            var node = nodes[Math.min(field.index, nodes.length - 1)];
+            data[field.name] = field.attribute ? node[field.attribute] : (node.innerText || '').trim();
+        }
+        results.push(error ? {error: error} : {data: data});
+    } catch (e) {
+        results.push({error: String(e)});
+    }
+}
+return results;
+"""
+
+
+def field(name, selector, attribute=None, required=True, index=0):
+    """카드 안에서 읽을 필드. attribute 가 없으면 텍스트를, 있으면 그 속성(href, src 등)을 읽는다.
+
+    index 는 selector 에 걸리는 노드가 여러 개일 때 고를 순번이다 (부족하면 마지막 노드).
+    """
+    return {'name': name, 'selector': selector, 'attribute': attribute, 'required': required, 'index': index}
+
+
+def extract_cards(driver, card_selector, fields, mark_attribute=None):
+    """카드별 필드 dict 목록을 돌려준다. 추출에 실패한 카드는 로그를 남기고 None 으로 둔다.
+
+    mark_attribute 를 주면 그 속성이 없는 카드만 읽고, 읽은 카드에 속성을 남긴다.
+    """
+    results = driver.execute_script(EXTRACT_CARDS, card_selector, fields, mark_attribute)
+    cards = []
+    for index, result in enumerate(results):
+        if 'error' in result:
+            logging.error(f"데이터 추출 중 오류: 카드 {index}: {result['error']}")
+            cards.append(None)
+        else:
+            cards.append(result['data'])
+    return cards
+
+
+def extract_cards_from_html(soup, card_selector, fields, base_url):
+    """extract_cards 와 같은 필드 정의로 저장해 둔 HTML(BeautifulSoup)에서 카드를 읽는다.
+
+    속성은 브라우저의 href/src 처럼 base_url 기준 절대 주소로 바꾼다.
+    """
+    cards = []
+    for index, card in enumerate(soup.select(card_selector)):
+        data = {}
+        for spec in fields:
+            nodes = card.select(spec['selector'])
+            if not nodes:
+                if spec['required']:
+                    logging.error(f"데이터 추출 중 오류: 카드 {index}: {spec['name']} 없음 ({spec['selector']})")
+                    data = None
+                    break
+                data[spec['name']] = None
+                continue
+            node = nodes[min(spec['index'], len(nodes) - 1)]
+            if spec['attribute']:
+                value = node.get(spec['attribute'])
+                data[spec['name']] = urljoin(base_url, value) if value is not None else None
+            else:
+                data[spec['name']] = node.get_text(' ', strip=True)
+        cards.append(data)
+    return cards
+
+
+def read_strikethrough_price(driver, selectors, sale_price):
+    """상세 페이지의 취소선 정가.
+
+    취소선이 없으면 할인하지 않는 상품이므로 판매가를, 취소선은 있는데 숫자를 읽지 못하면 None 을 돌려준다.
+    """
+    found = False
+    for selector in selectors:
+        for node in driver.find_elements(By.CSS_SELECTOR, selector):
+            found = True
+            price = parse_price(node.text)
+            if price:
+                return price
+    return None if found else sale_price
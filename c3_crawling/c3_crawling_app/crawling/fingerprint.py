@@ -0,0 +1,66 @@
+import hashlib
+import json
+import logging
+import threading
+
+from c3_crawling_app.models import ListingFingerprint
+
+
+def page_fingerprint(cards, has_next):
+    """카드별 (상품 키, 브랜드, 상품명, 정가, 판매가) 튜플 목록과 다음 페이지 여부의 SHA-1."""
+    payload = json.dumps([list(card) for card in cards] + [has_next], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ListingFingerprints:
+    """(사이트, 카테고리 코드, 페이지)별로 지난 크롤링의 목록 페이지 지문을 들고 있다.
+
+    지문이 같으면 상품과 가격이 그대로라는 뜻이므로 그 페이지의 저장을 건너뛴다.
+    새 지문은 그 페이지 상품을 저장(writer flush)한 뒤에만 record() 해서, 저장하지 못한
+    페이지를 다음 실행이 건너뛰는 일이 없게 한다. force 면 비교하지 않고 모두 새로 기록한다.
+    """
+
+    def __init__(self, site, force=False):
+        self.site = site
+        self.force = force
+        self.fingerprints = {}
+        self.dirty = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, site, force=False):
+        store = cls(site, force)
+        if not force:
+            rows = ListingFingerprint.objects.filter(site=site).values_list('category_code', 'page', 'fingerprint')
+            store.fingerprints = {(category_code, page): value for category_code, page, value in rows}
+            logging.info(f'{site} 목록 페이지 지문 {len(store.fingerprints)}개')
+        return store
+
+    def unchanged(self, category_code, page, fingerprint):
+        if self.force:
+            return False
+        with self.lock:
+            return self.fingerprints.get((category_code, page)) == fingerprint
+
+    def record(self, category_code, page, fingerprint, card_count):
+        with self.lock:
+            if self.fingerprints.get((category_code, page)) == fingerprint and not self.force:
+                return
+            self.fingerprints[(category_code, page)] = fingerprint
+            self.dirty[(category_code, page)] = (fingerprint, card_count)
+
+    def flush(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, {}
+        if not dirty:
+            return
+        ListingFingerprint.objects.bulk_create(
+            [
+                ListingFingerprint(site=self.site, category_code=category_code, page=page,
+                                   fingerprint=fingerprint, card_count=card_count)
+                for (category_code, page), (fingerprint, card_count) in dirty.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['site', 'category_code', 'page'],
+            update_fields=['fingerprint', 'card_count', 'updated_at'],
+        )
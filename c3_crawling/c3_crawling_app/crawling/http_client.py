@@ -0,0 +1,45 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36'
+)
+
+
+class HttpClient:
+    """커넥션 풀을 재사용하는 requests.Session 래퍼.
+
+    브라우저 없이 서버 렌더링 페이지를 받아올 때 쓴다.
+    """
+
+    def __init__(self, pool_size=4, timeout=10, retries=3):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8',
+        })
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url):
+        response = self.get(url)
+        response.raise_for_status()
+        return response.text
+
+    def get(self, url, headers=None, stream=False):
+        # 상태 코드를 직접 보려는 호출(조건부 요청의 304 등)용. 예외로 바꾸지 않는다.
+        # stream=True 면 본문을 읽지 않고 돌려주므로 호출하는 쪽이 iter_content 로 읽고 닫는다
+        return self.session.get(url, timeout=self.timeout, headers=headers, stream=stream)
+
+    def close(self):
+        self.session.close()
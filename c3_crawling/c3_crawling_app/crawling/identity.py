@@ -0,0 +1,99 @@
+import hashlib
+import logging
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.db import transaction
+
+# 유입 경로 추적용이라 같은 상품이어도 목록마다 값이 달라지는 파라미터
+TRACKING_PARAMS = {
+    'trackingCd', 'curation', 'egcode', 'egrankcode', 'rccode',
+    'gclid', 'fbclid', 'NaPm', 'ref', 'referrer', 'source',
+}
+TRACKING_PREFIXES = ('utm_', 't_')
+
+# 경로별로 상품을 가리키는 파라미터만 남긴다
+IDENTITY_PARAMS = {
+    '/store/goods/getGoodsDetail.do': {'goodsNo'},
+}
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def normalize_url(url):
+    """같은 상품이면 항상 같은 문자열이 되도록 상품 URL을 정규화한다."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    keep = IDENTITY_PARAMS.get(path)
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if (key in keep if keep is not None else
+            key not in TRACKING_PARAMS and not key.startswith(TRACKING_PREFIXES))
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def url_hash(url):
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+def rehash_urls(model, chunk_size=1000, sleep=0):
+    """정규화 규칙이 바뀐 뒤 url_hash 를 PK 범위로 잘라 다시 계산하고 (바꾼 수, 건너뛴 충돌 수)를 돌려준다.
+
+    새 url_hash 가 다른 상품과 겹치는 상품은 그대로 두고 id 를 로그로 남긴다.
+    마이그레이션은 이 함수를 쓰지 않는다 (마이그레이션마다 그때의 규칙을 따로 들고 있다).
+    """
+    changed = 0
+    conflicts = 0
+    last_id = 0
+    while True:
+        # PK 범위로 잘라 읽어서 테이블 전체를 잠그거나 훑지 않는다
+        rows = list(
+            model.objects
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', 'cosmetic_url', 'url_hash')[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        hashes = {}
+        for product_id, cosmetic_url, old_hash in rows:
+            key = url_hash(cosmetic_url)
+            if key != old_hash:
+                hashes.setdefault(key, []).append(product_id)
+        taken = set(
+            model.objects.filter(url_hash__in=list(hashes)).values_list('url_hash', flat=True)
+        )
+        updates = [
+            model(id=product_ids[0], url_hash=key)
+            for key, product_ids in hashes.items()
+            if key not in taken and len(product_ids) == 1
+        ]
+        updated_ids = {row.id for row in updates}
+        skipped = [
+            product_id for product_ids in hashes.values() for product_id in product_ids
+            if product_id not in updated_ids
+        ]
+        if skipped:
+            logging.warning(f'{model._meta.db_table}: 새 url_hash 가 다른 상품과 겹쳐서 그대로 둔 상품 id {skipped}')
+
+        with transaction.atomic():
+            model.objects.bulk_update(updates, ['url_hash'])
+
+        changed += len(updates)
+        conflicts += len(skipped)
+        if sleep:
+            time.sleep(sleep)
+
+    return changed, conflicts
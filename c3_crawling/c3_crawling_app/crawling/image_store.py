@@ -0,0 +1,35 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+
+class ImageStore:
+    """이미지 내용의 SHA-256 을 이름으로 쓰는 디스크 저장소.
+
+    <root>/ab/cd/abcd... 처럼 해시 앞 4글자로 두 단계 나눠서 한 디렉터리에 파일이
+    몰리지 않게 한다. 같은 내용은 URL 이나 사이트가 달라도 한 파일로 저장된다.
+    여러 스레드가 같은 내용을 동시에 써도 임시 파일을 os.replace 로 바꿔 끼우므로 안전하다.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, sha256):
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def put(self, content):
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.path(sha256)
+        if path.exists():
+            return sha256
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return sha256
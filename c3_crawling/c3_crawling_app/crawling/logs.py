@@ -0,0 +1,118 @@
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+from pathlib import Path
+
+from django.conf import settings
+
+# 이 프로세스가 크롤링 중인 사이트. 사이트별 로그 파일을 고르는 데 쓴다.
+_site = None
+# 이 프로세스의 루트 로거에 단 SiteQueueHandler. fork 된 워커는 부모 것을 물려받는다
+_handler = None
+
+
+def install_crawl_logging():
+    """루트 로거에 사이트별 파일 핸들러를 단다. 크롤링/배치 명령에서만 불러서 웹 프로세스 로그는 건드리지 않는다."""
+    global _handler
+    if _handler is not None:
+        return
+    _handler = SiteQueueHandler(settings.CRAWL_LOG_DIR, settings.CRAWL_LOG_FILES, settings.CRAWL_LOG_DEFAULT_FILE)
+    _handler.setFormatter(logging.Formatter(settings.CRAWL_LOG_FORMAT))
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(logging.INFO)
+
+
+def set_site(site):
+    """이 프로세스의 로그를 어느 사이트 파일로 보낼지 정한다 (워커 프로세스는 setup_run 에서 다시 부른다)."""
+    global _site
+    _site = site
+    install_crawl_logging()
+
+
+class SiteRouter(logging.Handler):
+    """리스너 스레드에서 레코드의 site 에 맞는 파일 핸들러로 넘긴다."""
+
+    def __init__(self, handlers, default):
+        super().__init__()
+        self.handlers = handlers
+        self.default = default
+
+    def emit(self, record):
+        self.handlers.get(getattr(record, 'site', None), self.default).handle(record)
+
+    def close(self):
+        for handler in [*self.handlers.values(), self.default]:
+            handler.close()
+        super().close()
+
+
+class SiteQueueHandler(logging.handlers.QueueHandler):
+    """크롤링 스레드에서는 레코드를 큐에 넣기만 하고, 파일 쓰기는 리스너 스레드가 한다.
+
+    files 는 {사이트: 파일명}, 사이트가 정해지지 않은 레코드는 default_file 로 간다.
+    리스너는 처음 emit 할 때 띄우고, fork 된 워커 프로세스에서는 새로 띄운다.
+    close() (logging.shutdown) 때 큐에 남은 레코드를 모두 쓰고 멈춘다.
+    """
+
+    def __init__(self, directory, files, default_file):
+        super().__init__(queue.SimpleQueue())
+        self.directory = Path(directory)
+        self.files = files
+        self.default_file = default_file
+        self.listener = None
+        self.pid = None
+
+    def file_handler(self, filename):
+        # 파일은 실제로 쓸 일이 있을 때 연다
+        handler = logging.FileHandler(self.directory / filename, encoding='utf-8', delay=True)
+        handler.setFormatter(self.formatter)
+        return handler
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        router = SiteRouter(
+            {site: self.file_handler(filename) for site, filename in self.files.items()},
+            self.file_handler(self.default_file),
+        )
+        self.queue = queue.SimpleQueue()
+        self.listener = logging.handlers.QueueListener(self.queue, router)
+        self.listener.start()
+        self.pid = os.getpid()
+
+    def prepare(self, record):
+        # 같은 프로세스 안의 큐라서 pickle 을 위한 포맷팅은 리스너 스레드로 미루고 메시지만 확정해 둔다
+        record.site = _site
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        # handle() 이 핸들러 잠금을 잡은 채로 부르므로 리스너가 두 번 뜨지 않는다
+        if self.pid != os.getpid():
+            self.start()
+        super().emit(record)
+
+    def close(self):
+        if self.listener is not None and self.pid == os.getpid():
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+        self.listener = None
+        super().close()
+
+
+class SampleFilter(logging.Filter):
+    """INFO 이하 레코드는 every 건마다 한 건만 통과시킨다. 경고와 오류는 항상 남긴다."""
+
+    def __init__(self, every=100):
+        super().__init__()
+        self.every = max(1, int(every))
+        self.counter = itertools.count()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        return next(self.counter) % self.every == 0
@@ -0,0 +1,163 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+# 용량 표기 (50ml, 1.5 L, 30g, 10매, 2개입 ...). 다른 용량끼리는 같은 상품으로 보지 않는다.
+VOLUME_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(ml|l|g|kg|oz|매|개입|입|ea)(?![a-z])')
+# 기획/세트 표시. 세트와 단품은 서로 맺지 않는다.
+BUNDLE_PATTERN = re.compile(r'(\d\s*\+\s*\d|세트|기획|듀오|트리오|키트|증정|\b(?:set|duo|kit)\b|\bx\s*\d\b)')
+# 대괄호/괄호 안 문구([단독], (리뉴얼) 등)와 문장부호
+BRACKET_PATTERN = re.compile(r'\[[^\]]*\]|\([^)]*\)|【[^】]*】|<[^>]*>')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+
+def normalize_text(text):
+    # 전각/반각과 호환 문자를 합치고 소문자로
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def brand_key(brand):
+    return PUNCTUATION_PATTERN.sub('', normalize_text(brand)).replace(' ', '')
+
+
+def normalize_product(brand, name):
+    """(상품명 토큰, 용량, 세트 여부)를 돌려준다. 상품명 앞의 브랜드와 괄호 문구는 뺀다."""
+    text = normalize_text(name)
+    bundle = bool(BUNDLE_PATTERN.search(text))
+    text = BRACKET_PATTERN.sub(' ', text)
+    volumes = sorted({
+        f'{float(amount):g}{unit}' for amount, unit in VOLUME_PATTERN.findall(text)
+    })
+    text = VOLUME_PATTERN.sub(' ', text)
+    text = BUNDLE_PATTERN.sub(' ', text)
+    text = PUNCTUATION_PATTERN.sub(' ', text)
+
+    key = brand_key(brand)
+    tokens = [token for token in text.split() if token]
+    # 상품명이 브랜드로 시작하면 떼어 낸다 ('에스티 로더 더블웨어' → '더블웨어'). 띄어쓰기가 달라도 맞춘다.
+    prefix = ''
+    for count, token in enumerate(tokens, 1):
+        prefix += token
+        if prefix == key:
+            tokens = tokens[count:]
+            break
+        if not key.startswith(prefix):
+            break
+    return tokens, ','.join(volumes), bundle
+
+
+def features(tokens):
+    """토큰별 문자 바이그램. 한글은 띄어쓰기가 사이트마다 달라서 토큰 경계를 넘는 바이그램도 넣는다."""
+    joined = ''.join(tokens)
+    grams = {joined[index:index + 2] for index in range(len(joined) - 1)}
+    grams.update(token for token in tokens if len(token) >= 3)
+    if len(joined) == 1:
+        grams.add(joined)
+    return grams
+
+
+class ProductIndex:
+    """기준 사이트 상품들의 바이그램 역색인.
+
+    query() 는 질의 상품과 바이그램이 하나라도 겹치는 상품의 IDF 가중 코사인 유사도를
+    그 포스팅 목록만 모아 구한다 (쌍마다 비교하지 않고, 카탈로그 크기만큼의 배열도 만들지 않는다).
+    max_df 비율보다 흔한 바이그램은 후보를 거의 못 줄이므로 색인에서 뺀다.
+    포스팅 목록은 products 순서대로 쌓이므로 위치 오름차순이다.
+    """
+
+    def __init__(self, products, max_df=0.2):
+        # products: (product_id, brand, name) 를 id 순으로 내주는 iterable. 한 번만 훑으므로 generator 도 된다
+        ids = []
+        bundles = []
+        self.brands = []
+        self.volumes = []
+        postings = defaultdict(list)
+        for index, (product_id, brand, name) in enumerate(products):
+            tokens, volume, bundle = normalize_product(brand, name)
+            ids.append(product_id)
+            bundles.append(bundle)
+            self.brands.append(brand_key(brand))
+            self.volumes.append(volume)
+            for gram in features(tokens):
+                postings[gram].append(index)
+        self.ids = np.array(ids, dtype=np.int64)
+        self.bundles = np.array(bundles, dtype=bool)
+
+        size = max(1, len(ids))
+        self.idf = {}
+        self.postings = {}
+        for gram, indexes in postings.items():
+            if len(indexes) > max_df * size and size >= 50:
+                continue
+            self.idf[gram] = np.log(size / len(indexes)) + 1.0
+            self.postings[gram] = np.array(indexes, dtype=np.int32)
+
+        squared = np.zeros(len(ids), dtype=np.float64)
+        for gram, indexes in self.postings.items():
+            squared[indexes] += self.idf[gram] ** 2
+        self.norms = np.sqrt(squared)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, product_id):
+        """product_id 보다 id 가 큰 첫 상품의 위치. products 를 id 순으로 넘겼을 때 query(start=) 에 쓴다."""
+        return int(np.searchsorted(self.ids, product_id, side='right'))
+
+    def query(self, brand, name, top_k=5, start=0):
+        """유사도가 높은 순으로 [(기준 상품 위치, 상품명 유사도)]를 돌려준다. start 앞 위치의 상품은 보지 않는다."""
+        tokens, volume, bundle = normalize_product(brand, name)
+        grams = [gram for gram in features(tokens) if gram in self.postings]
+        if not grams:
+            return []
+        weights = np.array([self.idf[gram] ** 2 for gram in grams])
+        postings = [self.postings[gram] for gram in grams]
+        if start:
+            postings = [indexes[np.searchsorted(indexes, start):] for indexes in postings]
+        # 후보(포스팅에 한 번이라도 나온 위치)별로만 가중치를 더한다
+        candidates, inverse = np.unique(np.concatenate(postings), return_inverse=True)
+        if not len(candidates):
+            return []
+        dot = np.bincount(inverse, weights=np.repeat(weights, [len(p) for p in postings]))
+        scores = dot / (np.sqrt(weights.sum()) * np.maximum(self.norms[candidates], 1e-9))
+        # 세트/단품이 다르거나 용량이 둘 다 있는데 다르면 후보에서 뺀다
+        keep = self.bundles[candidates] == bundle
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > top_k * 4:
+            top = np.argpartition(-scores, top_k * 4)[:top_k * 4]
+            candidates, scores = candidates[top], scores[top]
+        results = []
+        for order in np.argsort(-scores):
+            index = candidates[order]
+            if volume and self.volumes[index] and volume != self.volumes[index]:
+                continue
+            results.append((int(index), float(scores[order])))
+            if len(results) >= top_k:
+                break
+        return results
+
+    def brand_similarity(self, index, brand):
+        """브랜드 키가 같으면 1, 한쪽이 다른 쪽을 포함하면 0.8, 아니면 바이그램 자카드."""
+        left, right = self.brands[index], brand_key(brand)
+        if not left or not right:
+            return 0.0
+        if left == right:
+            return 1.0
+        if left in right or right in left:
+            return 0.8
+        left_grams = {left[i:i + 2] for i in range(len(left) - 1)}
+        right_grams = {right[i:i + 2] for i in range(len(right) - 1)}
+        if not left_grams or not right_grams:
+            return 0.0
+        return len(left_grams & right_grams) / len(left_grams | right_grams)
+
+    def best_match(self, brand, name, threshold, brand_weight=0.25, start=0):
+        """(기준 상품 id, 점수) 또는 None. 점수는 상품명 유사도와 브랜드 유사도의 가중 합이다."""
+        best = None
+        for index, name_score in self.query(brand, name, start=start):
+            score = (1 - brand_weight) * name_score + brand_weight * self.brand_similarity(index, brand)
+            if score >= threshold and (best is None or score > best[1]):
+                best = (int(self.ids[index]), score)
+        return best
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# 단계별 소요 시간 히스토그램 경계(초). 마지막 +Inf 는 count 로 대신한다.
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+METRIC_PREFIX = 'c3_crawl'
+
+
+class RunMetrics:
+    """크롤링 한 번의 단계별 타이머와 카운터.
+
+    히스토그램은 (단계, 카테고리 코드)별로, 카운터는 (이름, 라벨)별로 모은다.
+    워커 프로세스마다 따로 모은 뒤 to_dict() 결과를 merge() 로 합칠 수 있다.
+    상세 워커 스레드에서도 부르므로 잠근다.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage, category=None):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started, category)
+
+    def observe(self, stage, seconds, category=None):
+        with self.lock:
+            histogram = self.histograms.get((stage, category))
+            if histogram is None:
+                histogram = self.histograms[(stage, category)] = {
+                    'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0, 'max': 0.0,
+                }
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][index] += 1
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+            histogram['max'] = max(histogram['max'], seconds)
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def error(self, exc, stage, category=None):
+        self.count('errors', stage=stage, type=type(exc).__name__, category=category or '')
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'site': self.site,
+                'histograms': [
+                    {'stage': stage, 'category': category, **histogram,
+                     'buckets': list(histogram['buckets'])}
+                    for (stage, category), histogram in self.histograms.items()
+                ],
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.counters.items()
+                ],
+            }
+
+    def merge(self, data):
+        with self.lock:
+            for item in data['histograms']:
+                key = (item['stage'], item['category'])
+                histogram = self.histograms.setdefault(key, {
+                    'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0, 'max': 0.0,
+                })
+                histogram['buckets'] = [a + b for a, b in zip(histogram['buckets'], item['buckets'])]
+                histogram['count'] += item['count']
+                histogram['sum'] += item['sum']
+                histogram['max'] = max(histogram['max'], item['max'])
+            for item in data['counters']:
+                key = (item['name'], tuple(sorted(item['labels'].items())))
+                self.counters[key] = self.counters.get(key, 0) + item['value']
+
+    def stage_totals(self):
+        """카테고리를 합친 단계별 (횟수, 합계 초)."""
+        totals = {}
+        with self.lock:
+            for (stage, _), histogram in self.histograms.items():
+                count, seconds = totals.get(stage, (0, 0.0))
+                totals[stage] = (count + histogram['count'], seconds + histogram['sum'])
+        return totals
+
+    def log_summary(self, label):
+        for stage, (count, seconds) in sorted(self.stage_totals().items(), key=lambda item: -item[1][1]):
+            logging.info(f'{label} 단계[{stage}] {count}회, 합계 {seconds:.1f}s, 평균 {seconds / count:.3f}s')
+
+
+def label_text(labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def prometheus_text(metrics, counts, started_at, seconds):
+    site = metrics.site
+    data = metrics.to_dict()
+    lines = [
+        f'# HELP {METRIC_PREFIX}_stage_seconds 크롤링 단계별 소요 시간',
+        f'# TYPE {METRIC_PREFIX}_stage_seconds histogram',
+    ]
+    for item in sorted(data['histograms'], key=lambda item: (item['stage'], item['category'] or '')):
+        labels = {'site': site, 'stage': item['stage'], 'category': item['category'] or ''}
+        for bound, value in zip(BUCKETS, item['buckets']):
+            lines.append(f'{METRIC_PREFIX}_stage_seconds_bucket{{{label_text({**labels, "le": bound})}}} {value}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_bucket{{{label_text({**labels, "le": "+Inf"})}}} {item["count"]}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_sum{{{label_text(labels)}}} {item["sum"]:.6f}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_count{{{label_text(labels)}}} {item["count"]}')
+
+    names = sorted({item['name'] for item in data['counters']})
+    for name in names:
+        lines.append(f'# TYPE {METRIC_PREFIX}_{name}_total counter')
+        for item in data['counters']:
+            if item['name'] == name:
+                lines.append(f'{METRIC_PREFIX}_{name}_total{{{label_text({"site": site, **item["labels"]})}}} {item["value"]}')
+
+    lines.append(f'# TYPE {METRIC_PREFIX}_products_total counter')
+    for status in ('inserted', 'updated', 'unchanged', 'cache_hits', 'cache_misses'):
+        if status in counts:
+            lines.append(f'{METRIC_PREFIX}_products_total{{{label_text({"site": site, "status": status})}}} {counts[status]}')
+    lines.extend([
+        f'# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge',
+        f'{METRIC_PREFIX}_last_run_timestamp_seconds{{{label_text({"site": site})}}} {started_at:.0f}',
+        f'# TYPE {METRIC_PREFIX}_run_duration_seconds gauge',
+        f'{METRIC_PREFIX}_run_duration_seconds{{{label_text({"site": site})}}} {seconds:.3f}',
+    ])
+    return '\n'.join(lines) + '\n'
+
+
+def write_atomic(path, text):
+    # node exporter 가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 바꿔치기한다
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    temporary.write_text(text, encoding='utf-8')
+    os.replace(temporary, path)
+
+
+def export_run_metrics(metrics, counts, started_at, seconds, directory):
+    """실행 요약을 <directory>/<site>_crawl.json 과 Prometheus textfile(<site>_crawl.prom)로 남긴다."""
+    metrics.log_summary(metrics.site)
+    if not directory:
+        return
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    summary = {
+        'site': metrics.site,
+        'started_at': started_at,
+        'seconds': seconds,
+        'counts': counts,
+        'buckets': BUCKETS,
+        **metrics.to_dict(),
+    }
+    write_atomic(directory / f'{metrics.site}_crawl.json', json.dumps(summary, ensure_ascii=False, indent=2))
+    write_atomic(directory / f'{metrics.site}_crawl.prom', prometheus_text(metrics, counts, started_at, seconds))
@@ -0,0 +1,35 @@
+from c3_crawling_app.crawling.dom_extract import field
+from c3_crawling_app.crawling.prices import parse_price
+
+# 무신사 상품 목록의 카드 하나
+CARD_SELECTOR = 'div.sc-fUnNpA.iCowMw'
+
+# 상세 페이지의 취소선 정가 (페이지 버전마다 클래스가 달라 차례로 시도)
+PRICE_SELECTORS = [
+    "span.text-xs.font-medium.mb-0\\.5.text-gray-500.font-pretendard[style='text-decoration-line: line-through;']",
+    "div.sc-xz8kdb-2.gyAydn span.text-xs.font-medium.mb-0\\.5.text-gray-500.font-pretendard[style='text-decoration-line: line-through;']",
+    "span.text-xs.font-medium.text-gray-500[style='text-decoration-line: line-through;']"
+]
+
+# --extraction script 에서 카드마다 읽을 필드 (판매가는 가격 span 이 둘 이상이면 두 번째)
+SCRIPT_FIELDS = [
+    field('brand', "span.text-etc_11px_semibold.sc-dcJtft.sc-iGgVNO.jEEFmT.laXDWb.font-pretendard"),
+    field('cosmetic_name', "span.text-body_13px_reg.sc-dcJtft.sc-gsFSjX.jEEFmT.eEPdZZ.font-pretendard"),
+    field('sale_price', "span.text-body_13px_semi.sc-fqkwJk.ioeSYE.font-pretendard", index=1),
+    field('cosmetic_url', "a.gtm-select-item", attribute='href'),
+    field('image_url', "img.max-w-full", attribute='src'),
+]
+
+
+def product_from_card(card, category_name):
+    """SCRIPT_FIELDS 로 읽은 카드를 상품 dict 로 바꾼다."""
+    if card is None:
+        return None
+    return {
+        'category': category_name,
+        'brand': card['brand'],
+        'cosmetic_name': card['cosmetic_name'],
+        'sale_price': parse_price(card['sale_price']),
+        'cosmetic_url': card['cosmetic_url'],
+        'image_url': card['image_url']
+    }
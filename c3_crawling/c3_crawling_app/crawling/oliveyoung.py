@@ -0,0 +1,161 @@
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+from c3_crawling_app.crawling.dom_extract import field
+from c3_crawling_app.crawling.fingerprint import page_fingerprint
+from c3_crawling_app.crawling.prices import parse_price
+import logging
+import re
+
+LISTING_PATH = (
+    "/store/display/getMCategoryList.do?dispCatNo={category_code}&isLoginCnt=0&aShowCnt=0&bShowCnt=0"
+    "&cShowCnt=0&pageIdx={page_number}&rowsPerPage=24&searchTypeSort=btn_thumb&plusButtonFlag=N"
+)
+
+# 판매 랭킹(베스트) 페이지. fltDispCatNo 가 비면 전체 랭킹이고 한 페이지에 100위까지 나온다
+BEST_PATH = (
+    "/store/main/getBestList.do?dispCatNo=900000100100001&fltDispCatNo={category_code}"
+    "&pageIdx=1&rowsPerPage=100"
+)
+
+# 랭킹을 받을 대분류 (상품 목록 CATEGORIES 코드의 앞 11자리)
+RANKING_CATEGORIES = {
+    "전체": "",
+    "스킨케어": "10000010001",
+    "메이크업": "10000010002",
+    "마스크팩": "10000010009",
+    "클렌징": "10000010010",
+    "선케어": "10000010011",
+}
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+def listing_url(category_code, page_number):
+    return settings.OLIVEYOUNG_BASE_URL + LISTING_PATH.format(
+        category_code=category_code, page_number=page_number
+    )
+
+
+# 상품 URL 의 상품 번호. 트래킹 파라미터는 매번 바뀌므로 지문에는 상품 번호만 넣는다
+GOODS_NO = re.compile(r'[?&]goodsNo=([^&#]+)')
+
+
+def listing_fingerprint(products, has_next):
+    """parse_listing / product_from_script 가 읽은 상품 목록의 지문. 건너뛰면 안 되는 페이지는 None.
+
+    저장할 값(상품 번호, 브랜드, 상품명, 정가, 판매가)만 넣어서 리뷰 수, 뱃지, 트래킹 파라미터가
+    바뀌어도 지문은 같다. 추출에 실패했거나 상품 번호나 판매가를 못 읽은 카드가 있으면 마크업이
+    바뀌었을 수 있으므로 지문을 만들지 않는다 (그 페이지는 매번 저장하고 지문도 남기지 않는다).
+    """
+    cards = []
+    for product in products:
+        goods_no = GOODS_NO.search(product['cosmetic_url']) if product else None
+        if goods_no is None or product['sale_price'] is None:
+            return None
+        cards.append((
+            goods_no.group(1),
+            ''.join(product['brand'].split()),
+            ''.join(product['cosmetic_name'].split()),
+            product['price'],
+            product['sale_price'],
+        ))
+    return page_fingerprint(cards, has_next)
+
+
+def best_url(category_code):
+    return settings.OLIVEYOUNG_BASE_URL + BEST_PATH.format(category_code=category_code)
+
+
+def node_text(node):
+    # 셀레니움 .text 처럼 공백을 한 칸으로 접고 앞뒤 공백을 없앤다
+    return ' '.join(node.get_text().split())
+
+
+def parse_listing(html, category_name, page_url):
+    """목록 페이지 HTML을 (카드별 상품 dict 목록, 다음 페이지 여부)로 바꾼다.
+
+    상품 dict는 셀레니움 경로의 extract_product_data 와 같은 형식이고,
+    추출에 실패한 카드는 None 으로 남는다.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    products = [
+        extract_card(card, category_name, page_url)
+        for card in soup.find_all(class_='prd_info')
+    ]
+    return products, has_next_page(soup)
+
+
+def parse_best_list(html, category_name, page_url):
+    """랭킹 페이지 HTML을 (순위, 상품 dict) 목록으로 바꾼다. 순위는 페이지에 나온 순서다.
+
+    추출에 실패한 카드도 순위를 차지하므로 상품 dict 자리에 None 을 남긴다.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    return [
+        (rank, extract_card(card, category_name, page_url))
+        for rank, card in enumerate(soup.find_all(class_='prd_info'), 1)
+    ]
+
+
+def extract_card(card, category_name, page_url):
+    try:
+        brand = node_text(card.find(class_='tx_brand'))
+        cosmetic_name = node_text(card.find(class_='tx_name'))
+        sale_price = parse_price(node_text(card.find(class_='tx_cur')))
+
+        price_node = card.find(class_='tx_org')
+        price = parse_price(node_text(price_node)) if price_node is not None else sale_price
+
+        thumb = card.find(class_='prd_thumb')
+        cosmetic_url = urljoin(page_url, thumb['href'])
+        image_url = urljoin(page_url, thumb.find('img')['src'])
+
+        return {
+            'category': category_name,
+            'brand': brand,
+            'cosmetic_name': cosmetic_name,
+            'price': price,
+            'sale_price': sale_price,
+            'cosmetic_url': cosmetic_url,
+            'image_url': image_url
+        }
+    except (AttributeError, KeyError, TypeError) as e:
+        logging.error(f'데이터 추출 중 오류: {str(e)}')
+        return None
+
+
+# selenium 엔진에서 dom_extract.extract_cards 로 한 번에 읽을 카드 필드
+SCRIPT_FIELDS = [
+    field('brand', '.tx_brand'),
+    field('cosmetic_name', '.tx_name'),
+    field('sale_price', '.tx_cur'),
+    field('price', '.tx_org', required=False),
+    field('cosmetic_url', '.prd_thumb', attribute='href'),
+    field('image_url', '.prd_thumb img', attribute='src'),
+]
+
+
+def product_from_script(card, category_name):
+    if card is None:
+        return None
+    sale_price = parse_price(card['sale_price'])
+    return {
+        'category': category_name,
+        'brand': card['brand'],
+        'cosmetic_name': card['cosmetic_name'],
+        'price': parse_price(card['price']) if card['price'] is not None else sale_price,
+        'sale_price': sale_price,
+        'cosmetic_url': card['cosmetic_url'],
+        'image_url': card['image_url']
+    }
+
+
+def has_next_page(soup):
+    next_button = soup.find(class_='next')
+    return next_button is not None and 'disabled' not in ' '.join(next_button.get('class', []))
@@ -0,0 +1,65 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+
+class PageMeter:
+    """페이지마다 전송된 바이트와 준비까지 걸린 시간을 잰다.
+
+    build_chrome_driver(measure=True) 로 켠 성능 로그의 Network 이벤트를 모아서 계산한다.
+    같은 명령을 --browser-profile full / lean 으로 각각 돌려서 요약을 비교하면 된다.
+    꺼져 있으면 아무것도 하지 않는다.
+    """
+
+    def __init__(self, enabled, profile):
+        self.enabled = enabled
+        self.profile = profile
+        self.pages = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def start(self, driver):
+        if self.enabled:
+            # 이전 페이지에서 쌓인 이벤트를 비운다
+            driver.get_log('performance')
+        return time.monotonic()
+
+    def finish(self, driver, kind, url, started):
+        if not self.enabled:
+            return
+        seconds = time.monotonic() - started
+        transferred = requests = blocked = 0
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            params = message.get('params', {})
+            if message['method'] == 'Network.loadingFinished':
+                transferred += params.get('encodedDataLength', 0)
+                requests += 1
+            elif message['method'] == 'Network.loadingFailed' and params.get('blockedReason'):
+                blocked += 1
+
+        with self.lock:
+            self.pages[kind].append((transferred, requests, blocked, seconds))
+        logging.info(
+            f'[측정 {self.profile}/{kind}] {url}: {transferred / 1024:.1f}KB, '
+            f'요청 {requests}개, 차단 {blocked}개, 준비 {seconds:.2f}s'
+        )
+
+    def log_summary(self, label):
+        if not self.enabled:
+            return
+        with self.lock:
+            pages = {kind: list(values) for kind, values in self.pages.items()}
+        for kind, values in pages.items():
+            count = len(values)
+            transferred = sum(value[0] for value in values)
+            requests = sum(value[1] for value in values)
+            blocked = sum(value[2] for value in values)
+            seconds = sorted(value[3] for value in values)
+            logging.info(
+                f'{label} 측정[{self.profile}/{kind}] {count}페이지, '
+                f'페이지당 {transferred / count / 1024:.1f}KB, 요청 {requests / count:.1f}개, '
+                f'차단 {blocked / count:.1f}개, 준비 p50 {seconds[count // 2]:.2f}s, 최대 {seconds[-1]:.2f}s, '
+                f'총 {transferred / 1024 / 1024:.1f}MB'
+            )
@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+import time
+
+from django.db import connections
+
+_STOP = object()
+_FLUSH = object()
+
+
+class DetailPipeline:
+    """목록 단계와 상세 페이지 단계를 나눠 돌리는 파이프라인.
+
+    목록 단계가 submit() 한 레코드(정가 없음)는 크기가 정해진 큐를 거쳐
+    상세 워커 스레드(각자 브라우저 하나)가 정가를 채우고, 저장 스레드가
+    ProductWriter 로 넘긴다. 큐가 차면 submit() 이 기다리므로 메모리가 늘지 않는다.
+    metrics(RunMetrics)를 넘기면 정가 추출 오류를 detail 단계 오류로 센다.
+    read_price 가 None 을 돌려주면(페이지 준비 안 됨, 오류) 지난번 저장한 정가를 쓰고 캐시에는 남기지 않는다.
+    저장 스레드의 writer.flush() 가 실패하면 그 예외를 drain()/close() 를 부른 쪽에서 다시 올린다.
+    """
+
+    def __init__(self, read_price, build_driver, writer, price_cache, workers=2, maxsize=50, metrics=None):
+        self.read_price = read_price
+        self.metrics = metrics
+        self.build_driver = build_driver
+        self.writer = writer
+        self.price_cache = price_cache
+        self.detail_queue = queue.Queue(maxsize=maxsize)
+        self.write_queue = queue.Queue(maxsize=maxsize)
+        self.flushed = threading.Event()
+        self.flush_error = None
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.submitted = 0
+        self.detailed = 0
+        self.written = 0
+        self.peak_depth = 0
+        self.detail_threads = [
+            threading.Thread(target=self.detail_worker, name=f'detail-worker-{index}', daemon=True)
+            for index in range(workers)
+        ]
+        self.write_thread = threading.Thread(target=self.write_worker, name='detail-writer', daemon=True)
+
+    def start(self):
+        for thread in self.detail_threads:
+            thread.start()
+        self.write_thread.start()
+        return self
+
+    def submit(self, product_data):
+        self.submitted += 1
+        price = self.price_cache.get(product_data['cosmetic_url'], product_data['sale_price'])
+        if price is not None:
+            product_data['price'] = price
+            self.write_queue.put(product_data)
+        else:
+            self.detail_queue.put(product_data)
+        self.peak_depth = max(self.peak_depth, self.detail_queue.qsize())
+
+    def drain(self):
+        """지금까지 넣은 레코드가 모두 저장될 때까지 기다린다."""
+        self.detail_queue.join()
+        self.flushed.clear()
+        self.write_queue.put(_FLUSH)
+        self.flushed.wait()
+        self.raise_flush_error()
+
+    def close(self):
+        for _ in self.detail_threads:
+            self.detail_queue.put(_STOP)
+        for thread in self.detail_threads:
+            thread.join()
+        self.write_queue.put(_STOP)
+        self.write_thread.join()
+        self.log_stats('종료')
+        self.raise_flush_error()
+
+    def raise_flush_error(self):
+        error, self.flush_error = self.flush_error, None
+        if error is not None:
+            raise error
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        return {
+            'submitted': self.submitted,
+            'detailed': self.detailed,
+            'written': self.written,
+            'detail_queue_depth': self.detail_queue.qsize(),
+            'write_queue_depth': self.write_queue.qsize(),
+            'detail_queue_peak': self.peak_depth,
+            'listing_per_sec': self.submitted / elapsed,
+            'detail_per_sec': self.detailed / elapsed,
+            'write_per_sec': self.written / elapsed,
+        }
+
+    def log_stats(self, label):
+        stats = self.stats()
+        logging.info(
+            f"파이프라인 {label}: 목록 {stats['submitted']}건({stats['listing_per_sec']:.1f}/s), "
+            f"상세 {stats['detailed']}건({stats['detail_per_sec']:.1f}/s), "
+            f"저장 {stats['written']}건({stats['write_per_sec']:.1f}/s), "
+            f"상세 대기 {stats['detail_queue_depth']}(최대 {stats['detail_queue_peak']}), "
+            f"저장 대기 {stats['write_queue_depth']}"
+        )
+
+    def detail_worker(self):
+        try:
+            driver = self.build_driver()
+        except Exception as e:
+            # 드라이버 없이도 큐는 계속 비워야 목록 단계가 멈추지 않는다 (정가는 지난번 저장한 값)
+            logging.error(f'상세 워커 드라이버 생성 실패: {str(e)}')
+            driver = None
+        try:
+            while True:
+                product_data = self.detail_queue.get()
+                try:
+                    if product_data is _STOP:
+                        return
+                    self.fill_price(driver, product_data)
+                    self.write_queue.put(product_data)
+                finally:
+                    self.detail_queue.task_done()
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    def fill_price(self, driver, product_data):
+        sale_price = product_data['sale_price']
+        try:
+            price = self.read_price(driver, product_data['cosmetic_url'], sale_price)
+        except Exception as e:
+            logging.error(f'정가 추출 중 오류: {str(e)}')
+            if self.metrics is not None:
+                self.metrics.error(e, 'detail')
+            price = None
+
+        if price is None:
+            product_data['price'] = self.writer.known_price(product_data['cosmetic_url'])
+        else:
+            product_data['price'] = price
+            self.price_cache.put(product_data['cosmetic_url'], price, sale_price)
+        with self.lock:
+            self.detailed += 1
+
+    def write_worker(self):
+        try:
+            while True:
+                product_data = self.write_queue.get()
+                if product_data is _STOP:
+                    self.flush()
+                    return
+                if product_data is _FLUSH:
+                    try:
+                        self.flush()
+                    finally:
+                        # 저장이 실패해도 drain() 이 멈춰 있지 않게 한다
+                        self.flushed.set()
+                    continue
+                try:
+                    self.writer.add(product_data)
+                except Exception as e:
+                    logging.error(f'상품 처리 중 오류: {str(e)}')
+                self.written += 1
+        finally:
+            # 저장 스레드가 연 DB 연결은 이 스레드에서 닫아야 한다
+            connections.close_all()
+
+    def flush(self):
+        # 실패하면 저장 스레드를 죽이지 않고 예외를 남겨 둔다 (drain/close 가 올린다)
+        try:
+            self.writer.flush()
+        except Exception as e:
+            logging.error(f'상품 저장 중 오류: {str(e)}')
+            if self.metrics is not None:
+                self.metrics.error(e, 'write')
+            self.flush_error = e
@@ -0,0 +1,71 @@
+import logging
+import multiprocessing
+import os
+import queue
+
+import django
+from django.db import connections
+
+
+def _crawl_worker(command_class, options, tasks, results, today):
+    # spawn 방식(Windows)으로 뜬 자식 프로세스는 Django를 다시 초기화해야 한다
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'c3_crawling.settings')
+    django.setup()
+
+    # 워커마다 자기 드라이버와 DB 연결을 따로 연다
+    command = command_class()
+    command.setup_run(options)
+    try:
+        results.put(command.crawl_work_items(iter(tasks.get, None), today))
+    finally:
+        connections.close_all()
+        # 자식 프로세스는 atexit 을 거치지 않으므로 로그 큐에 남은 레코드를 직접 비운다
+        logging.shutdown()
+
+
+def run_parallel(command_class, work_items, workers, today, options):
+    """(카테고리명, 카테고리 코드) 작업을 워커 프로세스 풀에 나눠 크롤링한다.
+
+    작업은 하나의 큐에서 꺼내 가므로 먼저 끝난 워커가 다음 카테고리를 가져간다.
+    각 워커는 커맨드를 새로 만들고 같은 options 로 setup_run 을 호출한다.
+    워커별 crawl_work_items 반환값을 목록으로 돌려준다.
+    """
+    work_items = list(work_items)
+    workers = max(1, min(workers, len(work_items)))
+
+    context = multiprocessing.get_context()
+    tasks = context.Queue()
+    results = context.Queue()
+    for item in work_items:
+        tasks.put(item)
+    for _ in range(workers):
+        tasks.put(None)
+
+    # fork 시 부모의 DB 소켓이 자식에게 공유되지 않도록 미리 닫아둔다
+    connections.close_all()
+
+    processes = [
+        context.Process(
+            target=_crawl_worker,
+            args=(command_class, options, tasks, results, today),
+            name=f'crawl-worker-{index}',
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    # 큐를 비우지 않고 join 하면 결과를 보내던 워커가 끝나지 못할 수 있다
+    collected = []
+    while any(process.is_alive() for process in processes) or not results.empty():
+        try:
+            collected.append(results.get(timeout=0.5))
+        except queue.Empty:
+            continue
+    for process in processes:
+        process.join()
+
+    failed = [process.name for process in processes if process.exitcode != 0]
+    if failed:
+        raise RuntimeError(f'비정상 종료된 워커: {", ".join(failed)}')
+    return collected
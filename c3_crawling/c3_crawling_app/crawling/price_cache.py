@@ -0,0 +1,91 @@
+import logging
+import threading
+
+from django.utils import timezone
+
+from c3_crawling_app.crawling.identity import url_hash
+from c3_crawling_app.models import DetailPriceCache
+
+
+class PriceCache:
+    """상품 URL별로 상세 페이지에서 읽은 정가를 보관하는 캐시.
+
+    시작할 때 사이트 단위로 한 번에 읽어 두고, 새로 읽은 정가는 flush() 때
+    모아서 저장한다. 목록의 판매가가 바뀌었거나 ttl 보다 오래된 항목은
+    미스로 보고 상세 페이지를 다시 읽게 한다.
+    """
+
+    def __init__(self, site, ttl):
+        self.site = site
+        self.ttl = ttl
+        self.entries = {}
+        self.dirty = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    @classmethod
+    def load(cls, site, ttl):
+        cache = cls(site, ttl)
+        rows = (
+            DetailPriceCache.objects
+            .filter(site=site, fetched_at__gte=timezone.now() - ttl)
+            .values_list('url_hash', 'list_price', 'sale_price', 'fetched_at')
+            .iterator(chunk_size=5000)
+        )
+        for key, list_price, sale_price, fetched_at in rows:
+            cache.entries[key] = (list_price, sale_price, fetched_at)
+        logging.info(f'{site} 정가 캐시 로딩: {len(cache.entries)}건')
+        return cache
+
+    def counts(self):
+        return {'cache_hits': self.hits, 'cache_misses': self.misses}
+
+    def get(self, product_url, sale_price):
+        entry = self.entries.get(url_hash(product_url))
+        if (entry is None
+                or entry[1] != sale_price
+                or entry[2] < timezone.now() - self.ttl):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, product_url, list_price, sale_price):
+        key = url_hash(product_url)
+        entry = (list_price, sale_price, timezone.now())
+        with self.lock:
+            self.entries[key] = entry
+            self.dirty[key] = entry
+
+    def flush(self):
+        # 상세 워커 스레드가 put 하는 중에도 안전하게 바꿔치기한다
+        with self.lock:
+            dirty, self.dirty = self.dirty, {}
+        if not dirty:
+            return
+        DetailPriceCache.objects.bulk_create(
+            [
+                DetailPriceCache(
+                    site=self.site,
+                    url_hash=key,
+                    list_price=list_price,
+                    sale_price=sale_price,
+                    fetched_at=fetched_at,
+                )
+                for key, (list_price, sale_price, fetched_at) in dirty.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['url_hash'],
+            update_fields=['list_price', 'sale_price', 'fetched_at'],
+        )
+
+
+def format_cache_counts(counts):
+    return f"정가 캐시 적중 {counts.get('cache_hits', 0)}건, 미스 {counts.get('cache_misses', 0)}건"
@@ -0,0 +1,73 @@
+from django.db import connection
+
+# 사이트 → 상품 테이블
+SITE_TABLES = {
+    'oliveyoung': 'oycosmetic',
+    'zigzag': 'zzcosmetic',
+    'musinsa': 'msscosmetic',
+}
+TABLE_SITES = {table: site for site, table in SITE_TABLES.items()}
+
+COLUMNS = ('site', 'product_id', 'day', 'price', 'sale_price')
+
+# 같은 날 가격이 또 바뀌면 그날의 마지막 가격만 남긴다
+UPSERT_SUFFIX = {
+    'mysql': """
+        ON DUPLICATE KEY UPDATE
+            price = VALUES(price),
+            sale_price = VALUES(sale_price)
+    """,
+    'sqlite': """
+        ON CONFLICT (site, product_id, day) DO UPDATE SET
+            price = excluded.price,
+            sale_price = excluded.sale_price
+    """,
+}
+
+
+def append_history(cursor, rows):
+    """(site, product_id, day, price, sale_price) 튜플들을 한 문장으로 넣는다."""
+    if not rows:
+        return
+    values = ', '.join(['(' + ', '.join(['%s'] * len(COLUMNS)) + ')'] * len(rows))
+    cursor.execute(
+        f"INSERT INTO price_history ({', '.join(COLUMNS)}) VALUES {values}"
+        + UPSERT_SUFFIX[connection.vendor],
+        [value for row in rows for value in row]
+    )
+
+
+def price_series(site, start, end, product_ids=None, category=None):
+    """상품별 가격 이력을 {product_id: [(day, price, sale_price), ...]} 로 돌려준다.
+
+    product_ids 나 category 중 하나로 상품을 고른다. 이력은 가격이 바뀐 날만
+    남으므로, start 당일에 유효했던 가격을 알 수 있게 start 이전의 마지막 행도
+    함께 돌려준다. (site, product_id, day) 인덱스 범위만 읽는다.
+    """
+    table = SITE_TABLES[site]
+    if product_ids is not None:
+        if not product_ids:
+            return {}
+        products_sql = ', '.join(['%s'] * len(product_ids))
+        products_params = list(product_ids)
+    else:
+        products_sql = f'SELECT id FROM {table} WHERE category = %s'
+        products_params = [category]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT h.product_id, h.day, h.price, h.sale_price
+            FROM price_history h
+            WHERE h.site = %s
+              AND h.product_id IN ({products_sql})
+              AND h.day <= %s
+              AND h.day >= COALESCE((
+                  SELECT MAX(p.day) FROM price_history p
+                  WHERE p.site = h.site AND p.product_id = h.product_id AND p.day <= %s
+              ), %s)
+            ORDER BY h.product_id, h.day
+        """, [site, *products_params, end, start, start])
+        series = {}
+        for product_id, day, price, sale_price in cursor.fetchall():
+            series.setdefault(product_id, []).append((day, price, sale_price))
+    return series
@@ -0,0 +1,11 @@
+def parse_price(text):
+    """가격 문구('12,900원')에서 숫자만 모아 원 단위 정수로. 숫자가 없으면 None."""
+    digits = ''.join(filter(str.isdigit, str(text or '')))
+    return int(digits) if digits else None
+
+
+def discount_rate(price, sale_price):
+    """정가 대비 할인율(%, 버림). 가격을 모르면 None, 판매가가 더 비싸면 0."""
+    if not price or sale_price is None:
+        return None
+    return max(0, (price - sale_price) * 100 // price)
@@ -0,0 +1,90 @@
+from django.db import connection, transaction
+from c3_crawling_app.crawling.catalog_version import bump_version
+from c3_crawling_app.crawling.price_history import SITE_TABLES
+from c3_crawling_app.models import RankingHistory, RankingStaging
+
+# 올리브영 상품과 맺는 사이트와 ranking 의 가격 컬럼
+MATCH_SITES = {
+    'zigzag': 'zz_price',
+    'musinsa': 'mss_price',
+}
+
+# ranking 과 ranking_staging 의 이름을 맞바꾼다. 인덱스와 제약 이름도 테이블을 따라간다.
+# MySQL 의 RENAME TABLE 은 여러 테이블을 한 문장으로 원자적으로 바꾸고, 행 잠금 없이
+# 메타데이터 잠금만 잠깐 잡으므로 읽는 쪽은 이전 스냅샷이나 새 스냅샷 중 하나만 본다.
+SWAP_SQL = {
+    'mysql': [
+        'RENAME TABLE ranking TO ranking_swap, ranking_staging TO ranking, ranking_swap TO ranking_staging',
+    ],
+    'sqlite': [
+        'ALTER TABLE ranking RENAME TO ranking_swap',
+        'ALTER TABLE ranking_staging RENAME TO ranking',
+        'ALTER TABLE ranking_swap RENAME TO ranking_staging',
+    ],
+}
+
+CLEAR_SQL = {
+    'mysql': 'TRUNCATE TABLE ranking_staging',
+    'sqlite': 'DELETE FROM ranking_staging',
+}
+
+
+def site_prices(oy_product_ids, chunk_size=1000):
+    """{올리브영 상품 id: {'zz_price': 판매가, 'mss_price': 판매가}} 를 product_match 에서 읽는다.
+
+    넘긴 올리브영 상품 id 의 매칭만 읽고, 한 올리브영 상품에 한 사이트 상품이 여럿 맺어졌으면
+    점수가 가장 높은 상품(같으면 id 가 작은 상품)의 가격을 쓴다.
+    """
+    oy_product_ids = sorted(oy_product_ids)
+    prices = {}
+    with connection.cursor() as cursor:
+        for site, column in MATCH_SITES.items():
+            for start in range(0, len(oy_product_ids), chunk_size):
+                chunk = oy_product_ids[start:start + chunk_size]
+                cursor.execute(f"""
+                    SELECT m.oy_product_id, t.sale_price
+                    FROM product_match m
+                    JOIN {SITE_TABLES[site]} t ON t.id = m.product_id
+                    WHERE m.site = %s AND m.oy_product_id IN ({', '.join(['%s'] * len(chunk))})
+                    ORDER BY m.oy_product_id, m.score DESC, m.product_id
+                """, [site, *chunk])
+                for oy_product_id, sale_price in cursor.fetchall():
+                    # 올리브영 상품마다 첫 행이 최고 점수 매칭이다
+                    matched = prices.setdefault(oy_product_id, {})
+                    if column not in matched:
+                        matched[column] = sale_price
+    return prices
+
+
+def lowest_price(*prices):
+    return min((price for price in prices if price is not None), default=None)
+
+
+def copy_row(model, row):
+    """랭킹 행을 같은 컬럼의 다른 모델(RankingStaging, RankingHistory) 행으로 옮긴다. id 는 새로 받는다."""
+    return model(**{
+        field.attname: getattr(row, field.attname)
+        for field in model._meta.concrete_fields if not field.primary_key
+    })
+
+
+def publish_snapshot(rows, batch_size=1000):
+    """RankingStaging 행들을 staging 테이블에 넣고 ranking 과 바꿔 끼운다.
+
+    라이브 테이블에는 쓰지 않으므로 적재 중에도 읽기가 막히지 않는다.
+    바꾼 뒤 staging 에는 이전 스냅샷이 남고, 다음 실행이 비우고 다시 쓴다.
+    같은 행을 ranking_history 에도 남겨서 지난 날짜의 랭킹을 볼 수 있게 한다.
+    같은 날 같은 대분류를 다시 올리면 그날 그 대분류의 행만 바꾼다.
+    """
+    with transaction.atomic():
+        for snapshot_date, category in {(row.snapshot_date, row.category) for row in rows}:
+            RankingHistory.objects.filter(snapshot_date=snapshot_date, category=category).delete()
+        RankingHistory.objects.bulk_create([copy_row(RankingHistory, row) for row in rows], batch_size=batch_size)
+
+    with connection.cursor() as cursor:
+        cursor.execute(CLEAR_SQL[connection.vendor])
+    RankingStaging.objects.bulk_create(rows, batch_size=batch_size)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for sql in SWAP_SQL[connection.vendor]:
+            cursor.execute(sql)
+    bump_version('ranking')
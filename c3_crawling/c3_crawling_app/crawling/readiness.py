@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+def js_condition(script, *args):
+    """execute_script 결과가 참이 될 때를 기다리는 WebDriverWait 조건."""
+    return lambda driver: driver.execute_script(script, *args)
+
+
+def selector_present(selector):
+    return js_condition("return document.querySelector(arguments[0]) !== null;", selector)
+
+
+def any_selector_present(selectors, fallback_script='return false;'):
+    # 선택자 중 하나라도 있거나, 없더라도 fallback 조건이 맞으면 준비된 것으로 본다
+    return js_condition(
+        "return arguments[0].some(function (s) { return document.querySelector(s) !== null; })"
+        " || (function () { " + fallback_script + " })();",
+        list(selectors)
+    )
+
+
+def grew_after_scroll(selector, card_count, height):
+    return js_condition(
+        "return document.querySelectorAll(arguments[0]).length > arguments[1]"
+        " || document.body.scrollHeight > arguments[2];",
+        selector, card_count, height
+    )
+
+
+SCROLL_TO_BOTTOM = """
+    var height = document.body.scrollHeight;
+    var count = document.querySelectorAll(arguments[0]).length;
+    window.scrollTo(0, height);
+    return [count, height];
+"""
+
+# 상세 페이지에서 가격 숫자가 그려졌는지 (취소선 정가가 없는 상품도 있어서 함께 본다)
+PRICE_TEXT_RENDERED = (
+    "return document.readyState === 'complete' && /[0-9][0-9,]*\\s*원/.test(document.body.innerText);"
+)
+
+
+class ReadinessWaiter:
+    """고정 sleep 대신 조건이 맞을 때까지 짧게 폴링하며 기다린다.
+
+    대기 이름별로 실제로 기다린 시간과 타임아웃 횟수를 모아서
+    타임아웃 값을 조정할 수 있게 한다. 상세 워커 스레드끼리 공유해도 된다.
+    """
+
+    def __init__(self, poll_frequency=0.1):
+        self.poll_frequency = poll_frequency
+        self.samples = defaultdict(list)
+        self.timeouts = Counter()
+        self.lock = threading.Lock()
+
+    def wait(self, driver, name, condition, timeout):
+        started = time.monotonic()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+            ready = True
+        except TimeoutException:
+            ready = False
+
+        with self.lock:
+            self.samples[name].append(time.monotonic() - started)
+            if not ready:
+                self.timeouts[name] += 1
+        return ready
+
+    def summary(self):
+        with self.lock:
+            samples = {name: sorted(values) for name, values in self.samples.items()}
+            timeouts = dict(self.timeouts)
+
+        def percentile(values, ratio):
+            return values[min(len(values) - 1, int(len(values) * ratio))]
+
+        return {
+            name: {
+                'count': len(values),
+                'timeouts': timeouts.get(name, 0),
+                'p50': percentile(values, 0.5),
+                'p90': percentile(values, 0.9),
+                'p99': percentile(values, 0.99),
+                'max': values[-1],
+                'total': sum(values),
+            }
+            for name, values in samples.items()
+        }
+
+    def log_summary(self, label):
+        for name, stats in self.summary().items():
+            logging.info(
+                f"{label} 대기[{name}] {stats['count']}회, 타임아웃 {stats['timeouts']}회, "
+                f"p50 {stats['p50']:.2f}s, p90 {stats['p90']:.2f}s, p99 {stats['p99']:.2f}s, "
+                f"최대 {stats['max']:.2f}s, 합계 {stats['total']:.1f}s"
+            )
@@ -0,0 +1,95 @@
+from django.db import connection
+from c3_crawling_app.crawling.matching import PUNCTUATION_PATTERN, normalize_text
+from c3_crawling_app.crawling.price_history import SITE_TABLES
+
+# 상품 테이블별 (brand, cosmetic_name) FULLTEXT 인덱스. ngram 파서가 2글자 단위로 잘라 색인하므로
+# 띄어쓰기가 없는 한국어 상품명도 부분 문자열로 찾는다. 크롤러가 행을 쓸 때 InnoDB 가 함께 갱신한다.
+SEARCH_INDEXES = {
+    'oycosmetic': 'oy_search_ngram',
+    'zzcosmetic': 'zz_search_ngram',
+    'msscosmetic': 'mss_search_ngram',
+}
+
+# ngram_token_size 기본값. 이보다 짧은 검색어는 색인에 없으므로 LIKE 로 찾는다
+MIN_TOKEN_LENGTH = 2
+
+RESULT_COLUMNS = ('site', 'id', 'category', 'brand', 'cosmetic_name', 'price', 'sale_price',
+                  'cosmetic_url', 'image_url', 'score')
+
+
+def search_terms(query):
+    """검색어를 정규화해 토큰으로 나눈다. 문장부호는 boolean 연산자라서 뺀다."""
+    text = PUNCTUATION_PATTERN.sub(' ', normalize_text(query))
+    return text.split()
+
+
+def like_conditions(terms):
+    # 토큰마다 브랜드+상품명에 부분 문자열로 들어 있어야 한다. MySQL 의 || 는 OR 라서 CONCAT 을 쓴다
+    if connection.vendor == 'mysql':
+        text = "CONCAT(brand, ' ', cosmetic_name)"
+    else:
+        text = "brand || ' ' || cosmetic_name"
+    conditions = [f'LOWER({text}) LIKE %s'] * len(terms)
+    return conditions, [f'%{term}%' for term in terms]
+
+
+def boolean_query(terms):
+    # 모든 토큰을 구(phrase)로 요구한다. ngram 에서 구는 이어진 바이그램이라 부분 문자열 일치가 된다
+    return ' '.join(f'+"{term}"' for term in terms)
+
+
+def search_products(query, sites=None, limit=20):
+    """세 상품 테이블에서 관련도 순으로 상품 dict 목록을 돌려준다.
+
+    MySQL 은 테이블마다 FULLTEXT 인덱스로 상위 limit 개만 고른 뒤 합쳐서 다시 정렬한다.
+    ngram 보다 짧은 토큰과 다른 DB(로컬 SQLite)는 LIKE 로 찾는다.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    sites = sites or list(SITE_TABLES)
+
+    parts = []
+    params = []
+    for site in sites:
+        table = SITE_TABLES[site]
+        if connection.vendor == 'mysql':
+            # 한 글자 토큰은 ngram 색인에 없으므로 FULLTEXT 로 좁힌 결과를 LIKE 로 한 번 더 거른다.
+            # 한 글자 토큰뿐이면 LIKE 로만 찾고 관련도는 모두 1 이다
+            indexed = [term for term in terms if len(term) >= MIN_TOKEN_LENGTH]
+            conditions, where_params = like_conditions([term for term in terms if len(term) < MIN_TOKEN_LENGTH])
+            score, score_params = '1.0', []
+            if indexed:
+                score = 'MATCH(brand, cosmetic_name) AGAINST (%s IN BOOLEAN MODE)'
+                score_params = [boolean_query(indexed)]
+                conditions = [score, *conditions]
+                where_params = score_params + where_params
+            parts.append(f"""
+                (SELECT %s AS site, id, category, brand, cosmetic_name, price, sale_price,
+                        cosmetic_url, image_url, {score} AS score
+                 FROM {table}
+                 WHERE {' AND '.join(conditions)}
+                 ORDER BY score DESC, id
+                 LIMIT %s)
+            """)
+            params.extend([site, *score_params, *where_params, limit])
+        else:
+            conditions, like_params = like_conditions(terms)
+            parts.append(f"""
+                SELECT * FROM (
+                    SELECT %s AS site, id, category, brand, cosmetic_name, price, sale_price,
+                           cosmetic_url, image_url, 1.0 AS score
+                    FROM {table}
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY id
+                    LIMIT %s
+                )
+            """)
+            params.extend([site, *like_params, limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            ' UNION ALL '.join(parts) + ' ORDER BY score DESC LIMIT %s',
+            params + [limit]
+        )
+        return [dict(zip(RESULT_COLUMNS, row)) for row in cursor.fetchall()]
@@ -0,0 +1,112 @@
+import logging
+import time
+
+from django.db import connection
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+_MISSING = 0
+_MAX_PRICE = 0xFFFFFFFE
+
+
+def _encode_price(value):
+    # 가격 없음(None)은 0, 나머지는 1을 더해 32비트에 넣는다
+    if value is None:
+        return _MISSING
+    return min(value + 1, _MAX_PRICE)
+
+
+def pack_prices(price, sale_price):
+    # (정가, 판매가)를 정수 하나로 합쳐 튜플/문자열 객체를 만들지 않는다
+    return (_encode_price(price) << 32) | _encode_price(sale_price)
+
+
+def hash_key(url_hash):
+    # SHA-1 hex 앞 64비트만 키로 쓴다 (10만 건 기준 충돌 확률은 무시할 수준)
+    return int(url_hash[:16], 16)
+
+
+def load_products(table, columns, chunk_size=10000):
+    """상품 테이블의 id 와 columns 를 PK 순서로 chunk_size 행씩 읽어 하나씩 내준다 (첫 컬럼은 id).
+
+    테이블 전체를 목록으로 들고 있지 않으므로 메모리에는 한 묶음만 남는다.
+    묶음마다 커서를 닫으니 돌려받은 쪽이 중간에 다른 쿼리를 해도 된다.
+    """
+    last_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT id, {', '.join(columns)}
+                FROM {table}
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+            """, [last_id, chunk_size])
+            rows = cursor.fetchall()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+class CatalogueSnapshot:
+    """상품 식별자(url_hash) → (정가, 판매가)를 메모리에 들고 있는 맵.
+
+    크롤링 시작 때 한 번 읽어 두고, 새 상품이나 가격이 바뀐 상품만 DB로 보낸다.
+    키와 값 모두 int 로 저장해 10만 건에 10MB 남짓이다.
+    """
+
+    def __init__(self):
+        self.prices = {}
+
+    def __len__(self):
+        return len(self.prices)
+
+    @classmethod
+    def load(cls, table, chunk_size=10000):
+        snapshot = cls()
+        started = time.monotonic()
+        last_id = 0
+        with connection.cursor() as cursor:
+            while True:
+                # 한 번에 다 가져오지 않고 PK 순서로 끊어 읽는다
+                cursor.execute(f"""
+                    SELECT id, url_hash, price, sale_price
+                    FROM {table}
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                """, [last_id, chunk_size])
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                for product_id, key, price, sale_price in rows:
+                    snapshot.prices[hash_key(key)] = pack_prices(price, sale_price)
+                last_id = rows[-1][0]
+
+        logging.info(
+            f'{table} 스냅샷 로딩: {len(snapshot)}건, {time.monotonic() - started:.1f}초'
+        )
+        return snapshot
+
+    def classify(self, product_data):
+        packed = self.prices.get(hash_key(product_data['url_hash']))
+        if packed is None:
+            return NEW
+        if packed != pack_prices(product_data['price'], product_data['sale_price']):
+            return CHANGED
+        return UNCHANGED
+
+    def known_price(self, url_hash):
+        """저장된 정가. 상품이 없거나 정가를 모르면 None."""
+        packed = self.prices.get(hash_key(url_hash))
+        if packed is None or packed >> 32 == _MISSING:
+            return None
+        return (packed >> 32) - 1
+
+    def update(self, product_data):
+        self.prices[hash_key(product_data['url_hash'])] = pack_prices(
+            product_data['price'], product_data['sale_price']
+        )
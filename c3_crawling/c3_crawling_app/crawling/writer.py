@@ -0,0 +1,266 @@
+import logging
+import signal
+import sys
+import time
+from collections import Counter
+
+from django.db import connection, transaction
+
+from c3_crawling_app.crawling.catalog_version import bump_version
+from c3_crawling_app.crawling.identity import url_hash
+from c3_crawling_app.crawling.metrics import RunMetrics
+from c3_crawling_app.crawling.price_history import TABLE_SITES, append_history
+from c3_crawling_app.crawling.prices import discount_rate
+from c3_crawling_app.crawling.snapshot import CHANGED, NEW, UNCHANGED
+
+# 상품 단위 로그. settings.LOGGING 에서 표본만 남기도록 거른다.
+product_log = logging.getLogger('c3_crawling.products')
+
+COLUMNS = (
+    'category', 'brand', 'cosmetic_name', 'price', 'sale_price', 'discount_rate',
+    'cosmetic_url', 'url_hash', 'image_url', 'created_at', 'updated_at',
+)
+
+# 가격이 그대로면 updated_at 도 그대로 둔다.
+# MySQL 은 SET 절을 왼쪽부터 적용하므로 updated_at 을 가격보다 먼저 계산한다.
+UPSERT_SUFFIX = {
+    'mysql': """
+        ON DUPLICATE KEY UPDATE
+            updated_at = IF(price <=> VALUES(price) AND sale_price <=> VALUES(sale_price),
+                            updated_at, VALUES(updated_at)),
+            price = VALUES(price),
+            sale_price = VALUES(sale_price),
+            discount_rate = VALUES(discount_rate)
+    """,
+    'sqlite': """
+        ON CONFLICT (url_hash) DO UPDATE SET
+            updated_at = CASE WHEN price IS excluded.price AND sale_price IS excluded.sale_price
+                              THEN updated_at ELSE excluded.updated_at END,
+            price = excluded.price,
+            sale_price = excluded.sale_price,
+            discount_rate = excluded.discount_rate
+    """,
+}
+
+
+def raise_on_sigterm():
+    # SIGTERM 으로 종료될 때도 with/finally 블록이 돌아서 버퍼가 저장되게 한다
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+
+def merge_counts(results):
+    merged = Counter()
+    metrics = None
+    for counts in results:
+        counts = dict(counts)
+        # 워커별 단계 지표(RunMetrics.to_dict)는 숫자가 아니라서 따로 합친다
+        worker_metrics = counts.pop('metrics', None)
+        if worker_metrics is not None:
+            metrics = metrics or RunMetrics(worker_metrics['site'])
+            metrics.merge(worker_metrics)
+        merged.update(counts)
+    merged = dict(merged)
+    if metrics is not None:
+        merged['metrics'] = metrics.to_dict()
+    return merged
+
+
+def format_counts(counts):
+    text = (
+        f"변경 없음 {counts.get('unchanged', 0)}건, "
+        f"가격 변경 {counts.get('updated', 0)}건, "
+        f"신규 {counts.get('inserted', 0)}건"
+    )
+    if 'pages_skipped' in counts:
+        text += f", 건너뛴 페이지 {counts['pages_skipped']}건"
+    return text
+
+
+class ProductWriter:
+    """상품 dict를 모아 두었다가 한 트랜잭션으로 저장하는 버퍼.
+
+    batch_size 개가 차거나 flush() 를 부를 때 저장하고, with 블록을 벗어날 때
+    남은 상품도 저장한다. 가격이 바뀐 상품만 updated_at 을 갱신한다.
+    snapshot(CatalogueSnapshot)을 넘기면 DB 조회 없이 메모리에서 비교해
+    가격이 그대로인 상품은 버퍼에 넣지도 않는다.
+    metrics(RunMetrics)를 넘기면 저장에 걸린 시간을 db_write 단계로 남긴다.
+    새 상품과 가격이 바뀐 상품은 같은 트랜잭션에서 price_history 에도 한 행씩 남긴다.
+    바뀐 상품이 있던 배치는 커밋 뒤에(상품별 재시도 바깥에서) 사이트의 catalog_version 을 올려
+    API 캐시를 무효화한다.
+    on_saved 를 넘기면 커밋했거나 가격이 그대로라 저장할 필요가 없는 상품마다 그 dict 로 부른다.
+    """
+
+    def __init__(self, table, today, batch_size=100, snapshot=None, metrics=None, on_saved=None):
+        self.table = table
+        self.site = TABLE_SITES[table]
+        self.today = today
+        self.batch_size = batch_size
+        self.snapshot = snapshot
+        self.metrics = metrics
+        self.on_saved = on_saved
+        self.buffer = {}
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        # 상품별로 다시 저장해도 실패한 건수. 호출하는 쪽이 전후를 비교해 페이지가 온전히 저장됐는지 본다
+        self.failed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def counts(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+        }
+
+    def known_price(self, product_url):
+        """지난번에 저장한 정가. 상세 페이지에서 정가를 읽지 못했을 때 판매가 대신 쓴다."""
+        key = url_hash(product_url)
+        if self.snapshot is not None:
+            return self.snapshot.known_price(key)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT price FROM {self.table} WHERE url_hash = %s", [key])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def add(self, product_data):
+        product_data['url_hash'] = url_hash(product_data['cosmetic_url'])
+        if self.snapshot is not None:
+            status = self.snapshot.classify(product_data)
+            if status == UNCHANGED:
+                self.unchanged += 1
+                if self.on_saved is not None:
+                    self.on_saved(product_data)
+                return
+            product_data['status'] = status
+
+        # 같은 배치에 같은 상품이 또 오면 마지막 값만 남긴다
+        self.buffer[product_data['url_hash']] = product_data
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        rows = list(self.buffer.values())
+        self.buffer = {}
+
+        started = time.monotonic()
+        written = self.inserted + self.updated
+        try:
+            self.write_rows(rows)
+        except Exception as e:
+            # 배치 중 한 건 때문에 전부 잃지 않도록 한 건씩 다시 저장한다
+            logging.error(f'배치 저장 중 오류, 상품별로 다시 저장: {str(e)}')
+            self.record_error(e)
+            for row in rows:
+                try:
+                    self.write_rows([row])
+                except Exception as e:
+                    logging.error(f'데이터베이스 저장 중 오류: {str(e)}')
+                    self.record_error(e)
+                    self.failed += 1
+        if self.metrics is not None:
+            self.metrics.observe('db_write', time.monotonic() - started)
+        if self.inserted + self.updated > written:
+            self.bump_version()
+
+    def bump_version(self):
+        # 상품은 이미 커밋됐으므로 버전 갱신이 실패해도 다시 저장하지 않는다. 다음 배치나 실행이 다시 올린다
+        try:
+            bump_version(self.site)
+        except Exception as e:
+            logging.error(f'catalog_version 갱신 중 오류: {str(e)}')
+            self.record_error(e)
+
+    def record_error(self, exc):
+        if self.metrics is not None:
+            self.metrics.error(exc, 'db_write')
+
+    def write_rows(self, rows):
+        with transaction.atomic(), connection.cursor() as cursor:
+            if self.snapshot is None:
+                self.classify_from_db(cursor, rows)
+
+            new_rows = [row for row in rows if row['status'] == NEW]
+            changed_rows = [row for row in rows if row['status'] == CHANGED]
+            if new_rows or changed_rows:
+                self.upsert(cursor, new_rows + changed_rows)
+                self.record_history(cursor, new_rows + changed_rows)
+
+        if self.snapshot is not None:
+            for row in rows:
+                self.snapshot.update(row)
+        if self.on_saved is not None:
+            for row in rows:
+                self.on_saved(row)
+
+        self.inserted += len(new_rows)
+        self.updated += len(changed_rows)
+        self.unchanged += len(rows) - len(new_rows) - len(changed_rows)
+        # 상품별 로그는 설정(CRAWL_LOG_SAMPLE_EVERY)에 따라 일부만 남고, 배치 요약은 항상 남긴다
+        for row in changed_rows:
+            product_log.info('상품 업데이트: %s', row['cosmetic_name'])
+        for row in new_rows:
+            product_log.info('새 상품 추가: %s', row['cosmetic_name'])
+        if new_rows or changed_rows:
+            logging.info(f'{self.table} 저장: 새 상품 {len(new_rows)}건, 업데이트 {len(changed_rows)}건')
+
+    def classify_from_db(self, cursor, rows):
+        placeholders = ', '.join(['%s'] * len(rows))
+        cursor.execute(f"""
+            SELECT url_hash, price, sale_price
+            FROM {self.table}
+            WHERE url_hash IN ({placeholders})
+        """, [row['url_hash'] for row in rows])
+        existing = {key: (price, sale_price) for key, price, sale_price in cursor.fetchall()}
+
+        for row in rows:
+            if row['url_hash'] not in existing:
+                row['status'] = NEW
+            elif existing[row['url_hash']] != (row['price'], row['sale_price']):
+                row['status'] = CHANGED
+            else:
+                row['status'] = UNCHANGED
+
+    def record_history(self, cursor, rows):
+        # upsert 로는 id 를 돌려받지 못하므로 url_hash 로 한 번에 다시 찾는다
+        placeholders = ', '.join(['%s'] * len(rows))
+        cursor.execute(
+            f"SELECT url_hash, id FROM {self.table} WHERE url_hash IN ({placeholders})",
+            [row['url_hash'] for row in rows]
+        )
+        product_ids = dict(cursor.fetchall())
+        append_history(cursor, [
+            (self.site, product_ids[row['url_hash']], self.today, row['price'], row['sale_price'])
+            for row in rows
+            if row['url_hash'] in product_ids
+        ])
+
+    def upsert(self, cursor, rows):
+        values = ', '.join(['(' + ', '.join(['%s'] * len(COLUMNS)) + ')'] * len(rows))
+        params = []
+        for row in rows:
+            params.extend([
+                row['category'],
+                row['brand'],
+                row['cosmetic_name'],
+                row['price'],
+                row['sale_price'],
+                discount_rate(row['price'], row['sale_price']),
+                row['cosmetic_url'],
+                row['url_hash'],
+                row['image_url'],
+                self.today,
+                self.today
+            ])
+        cursor.execute(
+            f"INSERT INTO {self.table} ({', '.join(COLUMNS)}) VALUES {values}"
+            + UPSERT_SUFFIX[connection.vendor],
+            params
+        )
@@ -0,0 +1,31 @@
+from c3_crawling_app.crawling.dom_extract import field
+from c3_crawling_app.crawling.prices import parse_price
+
+# 지그재그 상품 목록의 카드 하나
+CARD_SELECTOR = '.css-5hci9z'
+
+# 상세 페이지의 취소선 정가
+PRICE_SELECTORS = ['.css-14j45be']
+
+# --extraction script 에서 카드마다 읽을 필드 (elements 방식의 XPath 와 같은 정확한 class 일치)
+SCRIPT_FIELDS = [
+    field('brand', 'span[class="zds4_1kdomr8"]'),
+    field('cosmetic_name', 'p[class="zds4_1kdomrc zds4_1kdomra"]'),
+    field('sale_price', 'span[class="zds4_s96ru86 zds4_s96ru8w zds4_1jsf80i3 zds4_1jsf80i5"]'),
+    field('cosmetic_url', 'a[class="css-152zj1o product-card-link"]', attribute='href'),
+    field('image_url', 'img[class="zds4_11053yc2"]', attribute='src'),
+]
+
+
+def product_from_card(card, category_name):
+    """SCRIPT_FIELDS 로 읽은 카드를 상품 dict 로 바꾼다."""
+    if card is None:
+        return None
+    return {
+        'category': category_name,
+        'brand': card['brand'],
+        'cosmetic_name': card['cosmetic_name'],
+        'sale_price': parse_price(card['sale_price']),
+        'cosmetic_url': card['cosmetic_url'],
+        'image_url': card['image_url']
+    }
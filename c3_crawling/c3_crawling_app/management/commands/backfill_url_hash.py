@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from c3_crawling_app.crawling.identity import rehash_urls
+from c3_crawling_app.models import Msscosmetic, Oycosmetic, Zzcosmetic
+
+PRODUCT_MODELS = {
+    'oycosmetic': Oycosmetic,
+    'zzcosmetic': Zzcosmetic,
+    'msscosmetic': Msscosmetic,
+}
+
+class Command(BaseCommand):
+    help = ('normalize_url 규칙이 바뀐 뒤 상품 테이블의 url_hash 를 조금씩 나눠 다시 계산한다 '
+            '(빈 url_hash 는 마이그레이션 0004/0016 이 채운다)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table', choices=list(PRODUCT_MODELS), action='append',
+            help='채울 테이블 (여러 번 지정 가능, 기본값: 전체)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='한 트랜잭션에서 갱신할 최대 행 수'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='청크 사이에 쉬는 시간(초). 복제 지연과 잠금 경합을 줄인다'
+        )
+
+    def handle(self, *args, **options):
+        for table in options['table'] or PRODUCT_MODELS:
+            changed, conflicts = rehash_urls(
+                PRODUCT_MODELS[table], options['chunk_size'], options['sleep']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{table}: {changed}건 바꿈, 다른 상품과 겹쳐 {conflicts}건 건너뜀'
+            ))
@@ -0,0 +1,128 @@
+from django.core.management.base import BaseCommand
+from c3_crawling_app.crawling.catalog_version import bump_version
+from c3_crawling_app.crawling.matching import ProductIndex
+from c3_crawling_app.crawling.logs import install_crawl_logging
+from c3_crawling_app.crawling.price_history import SITE_TABLES
+from c3_crawling_app.crawling.ranking import MATCH_SITES, copy_row, lowest_price, publish_snapshot, site_prices
+from c3_crawling_app.crawling.snapshot import load_products
+from c3_crawling_app.models import MatchState, ProductMatch, Ranking, RankingStaging
+import logging
+import time
+
+
+class Command(BaseCommand):
+    help = '지그재그/무신사 상품을 올리브영 상품과 맺고 ranking 에 오른 상품의 사이트별 가격을 갱신한다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=float, default=0.6,
+            help='같은 상품으로 볼 최소 점수 (상품명 유사도 0.75 + 브랜드 유사도 0.25 가중 합)'
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='이미 본 상품까지 올리브영 전체와 다시 점수를 매긴다 (기본값: 새 상품만 전체와, 나머지는 새 올리브영 상품과만)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='product_match/ranking 에 한 번에 저장할 최대 행 수'
+        )
+
+    def handle(self, *args, **options):
+        install_crawl_logging()
+        started = time.monotonic()
+        self.batch_size = options['batch_size']
+        # 상품 행을 목록으로 모으지 않고 묶음으로 읽으면서 바로 색인한다
+        index = ProductIndex(load_products(SITE_TABLES['oliveyoung'], ['brand', 'cosmetic_name']))
+        logging.info(f'올리브영 상품 {len(index)}개 색인: {time.monotonic() - started:.1f}초')
+
+        last_oy_product_id = int(index.ids[-1]) if len(index) else 0
+        watermarks = dict(MatchState.objects.values_list('site', 'last_oy_product_id'))
+
+        for site in MATCH_SITES:
+            scored, rescored, matched = self.match_site(
+                site, index, options['threshold'], options['full'], watermarks.get(site, 0)
+            )
+            MatchState.objects.update_or_create(site=site, defaults={'last_oy_product_id': last_oy_product_id})
+            self.stdout.write(
+                f'{site}: {scored}개 점수 계산, 이미 본 상품 {rescored}개 새 올리브영 상품과 비교, {matched}개 맺음'
+            )
+
+        updated = self.refresh_ranking()
+        # ranking 은 스냅샷을 바꿔 끼울 때 publish_snapshot 이 버전을 올린다
+        bump_version('product_match')
+        self.stdout.write(self.style.SUCCESS(
+            f'ranking 가격 갱신 {updated}건 ({time.monotonic() - started:.1f}초)'
+        ))
+
+    def match_site(self, site, index, threshold, full, watermark):
+        """새 상품은 올리브영 전체와, 이미 본 상품은 watermark 뒤에 들어온 올리브영 상품과만 비교한다.
+
+        상품명은 처음 저장한 뒤 바뀌지 않으므로 이미 비교한 쌍은 다시 볼 필요가 없다.
+        전에 못 맺은 상품은 새 올리브영 상품과 맺어지면, 이미 맺은 상품은 새 올리브영 상품의
+        점수가 지금 짝보다 높으면 짝을 바꾼다.
+        (새로 점수를 매긴 수, 다시 비교한 이미 본 상품 수, 이번에 맺은 수)를 돌려준다.
+        """
+        previous = {
+            product_id: (oy_product_id, score)
+            for product_id, oy_product_id, score in
+            ProductMatch.objects.filter(site=site).values_list('product_id', 'oy_product_id', 'score')
+        }
+        start = index.position(watermark)
+        matches = []
+        scored = 0
+        rescored = 0
+        for product_id, brand, name in load_products(SITE_TABLES[site], ['brand', 'cosmetic_name']):
+            if full or product_id not in previous:
+                scored += 1
+                best = index.best_match(brand, name, threshold)
+            elif start < len(index):
+                rescored += 1
+                best = index.best_match(brand, name, threshold, start=start)
+                oy_product_id, score = previous[product_id]
+                if best is None or (oy_product_id is not None and best[1] <= score):
+                    continue
+            else:
+                continue
+            matches.append(ProductMatch(
+                site=site,
+                product_id=product_id,
+                oy_product_id=best[0] if best else None,
+                score=best[1] if best else None,
+            ))
+        self.save_matches(matches)
+        return scored, rescored, sum(1 for match in matches if match.oy_product_id is not None)
+
+    def save_matches(self, matches):
+        ProductMatch.objects.bulk_create(
+            matches,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['site', 'product_id'],
+            update_fields=['oy_product_id', 'score', 'matched_at'],
+        )
+
+    def refresh_ranking(self):
+        """현재 ranking 스냅샷의 다른 사이트 가격을 새 매칭 결과로 바꾼 스냅샷을 올린다. 바뀐 행 수를 돌려준다.
+
+        라이브 테이블을 고치지 않고 oy_ranking 과 같이 staging 에 채워 바꿔 끼우므로,
+        읽는 쪽은 절반만 갱신된 랭킹을 보지 않는다. 바뀐 행이 없으면 바꿔 끼우지 않는다.
+        """
+        rows = [copy_row(RankingStaging, row) for row in Ranking.objects.order_by('category', 'rank')]
+        prices = site_prices({row.oy_product_id for row in rows if row.oy_product_id})
+        changed = 0
+        for row in rows:
+            matched = prices.get(row.oy_product_id, {}) if row.oy_product_id else {}
+            values = {
+                'zz_price': matched.get('zz_price'),
+                'mss_price': matched.get('mss_price'),
+            }
+            values['lowest_price'] = lowest_price(row.oy_price, *values.values())
+            if any(getattr(row, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(row, field, value)
+                changed += 1
+
+        if changed:
+            publish_snapshot(rows, self.batch_size)
+        logging.info(f'ranking 가격 갱신: 랭킹 상품 {len(rows)}개 중 {changed}건')
+        return changed
@@ -0,0 +1,187 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from c3_crawling_app.crawling.http_client import HttpClient
+from c3_crawling_app.crawling.image_store import ImageStore
+from c3_crawling_app.crawling.logs import install_crawl_logging
+from c3_crawling_app.crawling.metrics import RunMetrics, export_run_metrics
+from c3_crawling_app.crawling.price_history import SITE_TABLES
+from c3_crawling_app.crawling.snapshot import load_products
+from c3_crawling_app.models import ProductImage
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import hashlib
+import logging
+import requests
+import time
+
+# 조건부 요청과 재사용에 쓰는 ProductImage 필드
+MIRROR_FIELDS = ('sha256', 'content_type', 'size', 'etag', 'last_modified')
+
+
+def image_url_hash(image_url):
+    # 리사이즈 파라미터 등이 다르면 다른 이미지이므로 URL 을 정규화하지 않고 그대로 해시한다
+    return hashlib.sha1(image_url.encode('utf-8')).hexdigest()
+
+
+class Command(BaseCommand):
+    help = '상품 이미지를 받아 내용 해시로 디스크에 저장하고, 상품별로 어떤 이미지인지 product_image 에 기록한다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site', choices=list(SITE_TABLES), action='append',
+            help='이미지를 받을 사이트 (여러 번 지정 가능, 기본값: 전체)'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='동시에 이미지를 받을 스레드 수 (커넥션 풀 크기도 같다)'
+        )
+        parser.add_argument(
+            '--refresh', action='store_true',
+            help='이미 받은 이미지도 조건부 요청(If-None-Match/If-Modified-Since)으로 바뀌었는지 확인한다'
+        )
+        parser.add_argument(
+            '--max-bytes', type=int, default=10 * 1024 * 1024,
+            help='이보다 큰 응답은 저장하지 않는다'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='한 번에 내려받고 product_image 에 저장할 최대 URL 수'
+        )
+        parser.add_argument(
+            '--store-dir', default=settings.IMAGE_STORE_DIR,
+            help='이미지 저장 디렉터리 (기본값 IMAGE_STORE_DIR 설정)'
+        )
+        parser.add_argument(
+            '--metrics-dir', default=settings.CRAWL_METRICS_DIR,
+            help='실행 요약(JSON)과 Prometheus textfile 을 남길 디렉터리 (기본값 CRAWL_METRICS_DIR 설정)'
+        )
+
+    def handle(self, *args, **options):
+        install_crawl_logging()
+        started_at = time.time()
+        self.store = ImageStore(options['store_dir'])
+        self.client = HttpClient(pool_size=options['workers'])
+        self.max_bytes = options['max_bytes']
+        self.metrics = RunMetrics('images')
+        counts = Counter()
+        try:
+            # 같은 URL 은 사이트가 달라도 한 번만 받는다
+            self.mirrored = {
+                row[0]: dict(zip(MIRROR_FIELDS, row[1:]))
+                for row in ProductImage.objects.filter(sha256__isnull=False)
+                .values_list('image_url_hash', *MIRROR_FIELDS)
+            }
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                for site in options['site'] or SITE_TABLES:
+                    site_counts = self.mirror_site(site, executor, options['refresh'], options['batch_size'])
+                    self.stdout.write(
+                        f"{site}: 받음 {site_counts['fetched']}건, 변경 없음(304) {site_counts['not_modified']}건, "
+                        f"재사용 {site_counts['reused']}건, 실패 {site_counts['failed']}건"
+                    )
+                    counts.update(site_counts)
+        finally:
+            self.client.close()
+        export_run_metrics(self.metrics, dict(counts), started_at, time.time() - started_at, options['metrics_dir'])
+        self.stdout.write(self.style.SUCCESS(f"이미지 미러링 완료 (상품 {counts['products']}개)"))
+
+    def mirror_site(self, site, executor, refresh, batch_size):
+        counts = Counter({'products': 0, 'fetched': 0, 'not_modified': 0, 'reused': 0, 'failed': 0})
+        existing = dict(
+            ProductImage.objects.filter(site=site, sha256__isnull=False)
+            .values_list('product_id', 'image_url_hash')
+        )
+
+        # 이미지 URL 이 그대로이고 이미 받은 상품은 건너뛴다. 같은 URL 을 쓰는 상품은 한 번만 받는다
+        pending = {}
+        for product_id, image_url in load_products(SITE_TABLES[site], ['image_url']):
+            if not image_url:
+                continue
+            url_hash = image_url_hash(image_url)
+            if not refresh and existing.get(product_id) == url_hash:
+                continue
+            pending.setdefault(image_url, []).append(product_id)
+        logging.info(f'{site} 이미지 미러링 대상: URL {len(pending)}개')
+
+        urls = list(pending)
+        for start in range(0, len(urls), batch_size):
+            chunk = urls[start:start + batch_size]
+            rows = []
+            for image_url, result in zip(chunk, executor.map(lambda url: self.mirror_url(url, refresh), chunk)):
+                counts[result.pop('outcome')] += 1
+                url_hash = image_url_hash(image_url)
+                if result['sha256']:
+                    self.mirrored[url_hash] = {field: result[field] for field in MIRROR_FIELDS}
+                rows.extend(
+                    ProductImage(site=site, product_id=product_id, image_url=image_url,
+                                 image_url_hash=url_hash, **result)
+                    for product_id in pending[image_url]
+                )
+            ProductImage.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['site', 'product_id'],
+                update_fields=['image_url', 'image_url_hash', *MIRROR_FIELDS, 'status', 'fetched_at'],
+            )
+            counts['products'] += len(rows)
+        return counts
+
+    def mirror_url(self, image_url, refresh):
+        """스레드에서 URL 하나를 받아 저장소에 넣고 ProductImage 필드 값과 결과 종류를 돌려준다."""
+        known = self.mirrored.get(image_url_hash(image_url))
+        if known and not refresh:
+            return {**known, 'status': 200, 'outcome': 'reused'}
+
+        headers = {}
+        if known and known['etag']:
+            headers['If-None-Match'] = known['etag']
+        if known and known['last_modified']:
+            headers['If-Modified-Since'] = known['last_modified']
+
+        try:
+            with self.metrics.timer('download'):
+                with self.client.get(image_url, headers=headers, stream=True) as response:
+                    content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+                    content = None
+                    if response.status_code == 200 and content_type.startswith('image/'):
+                        content = self.read_body(response)
+        except requests.RequestException as e:
+            logging.error(f'이미지 요청 실패 {image_url}: {str(e)}')
+            self.metrics.error(e, 'download')
+            return self.failed(known, None)
+
+        if response.status_code == 304 and known:
+            return {**known, 'status': 304, 'outcome': 'not_modified'}
+        if content is None:
+            logging.error(f'이미지 저장 안 함 {image_url}: {response.status_code} {content_type} '
+                          f"{response.headers.get('Content-Length', '?')}바이트 (최대 {self.max_bytes}바이트)")
+            return self.failed(known, response.status_code)
+
+        return {
+            'sha256': self.store.put(content),
+            'content_type': content_type,
+            'size': len(content),
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'status': 200,
+            'outcome': 'fetched',
+        }
+
+    def read_body(self, response):
+        """본문을 조각으로 읽다가 max_bytes 를 넘으면 그만 읽고 None 을 돌려준다."""
+        # Content-Length 가 있으면 받기 전에 거른다. 없거나 틀릴 수 있으므로 읽으면서도 센다
+        length = response.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) > self.max_bytes:
+            return None
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > self.max_bytes:
+                return None
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def failed(self, known, status):
+        # 전에 받은 이미지가 있으면 그대로 두고 응답 코드만 남긴다
+        values = known or {'sha256': None, 'content_type': '', 'size': None, 'etag': '', 'last_modified': ''}
+        return {**values, 'status': status, 'outcome': 'failed'}
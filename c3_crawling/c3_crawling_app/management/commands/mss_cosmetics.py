@@ -1,167 +1,329 @@
 from django.core.management.base import BaseCommand
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from django.utils import timezone
-from django.db import connection
-import time
+from django.conf import settings
+from c3_crawling_app.crawling.archive import PageArchive
+from c3_crawling_app.crawling.browser import PROFILES, build_chrome_driver
+from c3_crawling_app.crawling.checkpoint import CheckpointStore, product_key, resolve_run_id
+from c3_crawling_app.crawling.dom_extract import extract_cards, read_strikethrough_price
+from c3_crawling_app.crawling.logs import set_site
+from c3_crawling_app.crawling.metrics import RunMetrics, export_run_metrics
+from c3_crawling_app.crawling.page_meter import PageMeter
+from c3_crawling_app.crawling.pipeline import DetailPipeline
+from c3_crawling_app.crawling.pool import run_parallel
+from c3_crawling_app.crawling.prices import parse_price
+from c3_crawling_app.crawling.readiness import (
+    PRICE_TEXT_RENDERED, SCROLL_TO_BOTTOM, ReadinessWaiter, any_selector_present, grew_after_scroll, selector_present
+)
+from c3_crawling_app.crawling.price_cache import PriceCache, format_cache_counts
+from c3_crawling_app.crawling.snapshot import CatalogueSnapshot
+from c3_crawling_app.crawling.musinsa import CARD_SELECTOR, PRICE_SELECTORS, SCRIPT_FIELDS, product_from_card
+from c3_crawling_app.crawling.writer import ProductWriter, format_counts, merge_counts, raise_on_sigterm
+from datetime import timedelta
 import logging
+import time
+
+SEEN_ATTRIBUTE = 'data-c3-seen'
+
+DETAIL_READY = any_selector_present(PRICE_SELECTORS, PRICE_TEXT_RENDERED)
+
+CATEGORIES = {
+    "스킨케어": ["104001001", "104001002", "104001003", "104001004", 
+            "104001005", "104001006", "104001007", "104001008", 
+            "104001009", "104001010", "104001012"],
+    "마스크팩": ["104001011"],
+    "클렌징": ["104003"],
+    "선케어": ["104002"],
+    "베이스메이크업": ["104004001"],
+    "립메이크업": ["104004002"],
+    "아이메이크업": ["104004003"]
+}
 
-logging.basicConfig(
-    filename='musinsa_crawling.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8'
-)
 
 class Command(BaseCommand):
     help = '무신사 상품 크롤링'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='카테고리를 나눠 처리할 크롬 워커 프로세스 수 (기본값 1: 순차 실행)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='한 트랜잭션으로 묶어 저장할 최대 상품 수'
+        )
+        parser.add_argument(
+            '--price-cache-ttl', type=float, default=168,
+            help='상세 페이지 정가 캐시 유효 시간(시간). 0이면 항상 상세 페이지를 다시 읽는다'
+        )
+        parser.add_argument(
+            '--detail-workers', type=int, default=2,
+            help='상세 페이지만 읽는 브라우저 워커 수. 0이면 목록 브라우저의 새 탭에서 차례로 읽는다'
+        )
+        parser.add_argument(
+            '--detail-queue-size', type=int, default=50,
+            help='상세 페이지를 기다리는 상품 큐의 최대 길이 (가득 차면 목록 단계가 기다린다)'
+        )
+        parser.add_argument(
+            '--browser-profile', choices=PROFILES, default='full',
+            help='브라우저 프로필 (lean: 이미지/폰트/추적 스크립트 차단, 사이트별 조정은 BROWSER_SITE_PROFILES 설정. full: 모두 받음)'
+        )
+        parser.add_argument(
+            '--measure-pages', action='store_true',
+            help='페이지별 전송 바이트와 준비 시간을 로그로 남긴다 (full/lean 비교용)'
+        )
+        parser.add_argument(
+            '--extraction', choices=['script', 'elements'], default='script',
+            help='카드 추출 방식 (script: 페이지당 execute_script 한 번, elements: 필드마다 find_element)'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='본 원본 HTML 을 날짜별로 압축 보관할 디렉터리 (reparse 명령으로 다시 파싱할 수 있다)'
+        )
+        parser.add_argument(
+            '--metrics-dir', default=settings.CRAWL_METRICS_DIR,
+            help='실행 요약(JSON)과 Prometheus textfile 을 남길 디렉터리 (기본값 CRAWL_METRICS_DIR 설정)'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='가장 최근 실행의 체크포인트부터 이어서 크롤링 (끝난 카테고리는 건너뛰고, 저장한 상품은 다시 처리하지 않는다)'
+        )
+        parser.add_argument(
+            '--checkpoint-interval', type=float, default=30,
+            help='체크포인트를 DB 에 저장하는 최소 간격(초). 저장 전에 상세 파이프라인을 비운다'
+        )
+        parser.add_argument(
+            '--ready-timeout', type=float, default=10,
+            help='목록/상세 페이지가 준비되기를 기다리는 최대 시간(초)'
+        )
+        parser.add_argument(
+            '--scroll-timeout', type=float, default=4,
+            help='스크롤 뒤 새 카드가 붙기를 기다리는 최대 시간(초). 이 시간 안에 안 늘면 목록 끝으로 본다'
+        )
+
     def handle(self, *args, **options):
         try:
-            self.crawl_musinsa()
-            self.stdout.write(self.style.SUCCESS('크롤링 완료'))
-            logging.info('크롤링 작업 성공')
+            # 워커 프로세스도 같은 실행 ID 를 쓰도록 options 에 넣어서 넘긴다
+            options['run_id'] = resolve_run_id(
+                'musinsa', options['resume'], [code for codes in CATEGORIES.values() for code in codes]
+            )
+            self.setup_run(options)
+            started_at = time.time()
+            counts = self.crawl_musinsa(options)
+            metrics = RunMetrics('musinsa')
+            metrics.merge(counts.pop('metrics'))
+            export_run_metrics(metrics, counts, started_at, time.time() - started_at, options['metrics_dir'])
+            self.stdout.write(self.style.SUCCESS(f'크롤링 완료 ({format_counts(counts)})'))
+            self.stdout.write(format_cache_counts(counts))
+            logging.info(f'크롤링 작업 성공 ({format_counts(counts)})')
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'크롤링 실패: {str(e)}'))
             logging.error(f'크롤링 작업 실패: {str(e)}')
 
-    def crawl_musinsa(self):
-        categories = {
-            "스킨케어": ["104001001", "104001002", "104001003", "104001004", 
-                    "104001005", "104001006", "104001007", "104001008", 
-                    "104001009", "104001010", "104001012"],
-            "마스크팩": ["104001011"],
-            "클렌징": ["104003"],
-            "선케어": ["104002"],
-            "베이스메이크업": ["104004001"],
-            "립메이크업": ["104004002"],
-            "아이메이크업": ["104004003"]
-        }
-
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.implicitly_wait(5)
+    def setup_run(self, options):
+        set_site('musinsa')
+        self.batch_size = options['batch_size']
+        self.price_cache_ttl = timedelta(hours=options['price_cache_ttl'])
+        self.detail_workers = options['detail_workers']
+        self.detail_queue_size = options['detail_queue_size']
+        self.ready_timeout = options['ready_timeout']
+        self.archive_dir = options['archive_dir']
+        self.extraction = options['extraction']
+        self.browser_profile = options['browser_profile']
+        self.measure_pages = options['measure_pages']
+        self.scroll_timeout = options['scroll_timeout']
+        self.run_id = options['run_id']
+        self.checkpoint_interval = options['checkpoint_interval']
+
+    def build_driver(self):
+        return build_chrome_driver('musinsa', self.browser_profile, self.measure_pages)
 
+    def crawl_musinsa(self, options):
+        today = timezone.now().date()
+        work_items = []
+        for category_name, category_codes in CATEGORIES.items():
+            if isinstance(category_codes, list):
+                for code in category_codes:
+                    work_items.append((category_name, code))
+            else:
+                work_items.append((category_name, category_codes))
+
+        if options['workers'] > 1:
+            return merge_counts(
+                run_parallel(type(self), work_items, options['workers'], today, options)
+            )
+        return self.crawl_work_items(work_items, today)
+
+    def crawl_work_items(self, work_items, today):
+        raise_on_sigterm()
+        snapshot = CatalogueSnapshot.load('msscosmetic')
+        self.checkpoint = CheckpointStore.load('musinsa', self.run_id, self.checkpoint_interval)
+        # 목록에서 넘겼지만 아직 저장되지 않은 상품 URL → (카테고리, 카테고리 코드, 체크포인트 키)
+        self.pending_keys = {}
+        self.waiter = ReadinessWaiter()
+        self.metrics = RunMetrics('musinsa')
+        self.meter = PageMeter(self.measure_pages, self.browser_profile)
+        driver = self.build_driver()
         try:
-            today = timezone.now().date()
-            for category_name, category_codes in categories.items():
-                if isinstance(category_codes, list):
-                    for code in category_codes:
-                        self.crawl_category(driver, category_name, code, today)
-                else:
-                    self.crawl_category(driver, category_name, category_codes, today)
+            with PageArchive(self.archive_dir, 'musinsa', today) as archive, \
+                    ProductWriter('msscosmetic', today, batch_size=self.batch_size, snapshot=snapshot,
+                                  metrics=self.metrics, on_saved=self.product_saved) as writer, \
+                    PriceCache.load('musinsa', self.price_cache_ttl) as price_cache:
+                self.archive = archive
+                self.writer = writer
+                self.price_cache = price_cache
+                self.pipeline = None
+                if self.detail_workers > 0:
+                    self.pipeline = DetailPipeline(
+                        self.read_list_price, self.build_driver, writer, price_cache,
+                        workers=self.detail_workers, maxsize=self.detail_queue_size, metrics=self.metrics
+                    ).start()
+                try:
+                    for category_name, category_code in work_items:
+                        if self.checkpoint.is_completed(category_code):
+                            logging.info(f'{category_name}({category_code}) 이미 완료, 건너뜀')
+                            continue
+                        self.crawl_category(driver, category_name, category_code, today)
+                        self.save_progress()
+                        self.checkpoint.category_done(category_name, category_code)
+                finally:
+                    if self.pipeline is not None:
+                        self.pipeline.close()
         finally:
             driver.quit()
+            self.waiter.log_summary('무신사')
+            self.meter.log_summary('무신사')
+        return {**writer.counts(), **price_cache.counts(), 'metrics': self.metrics.to_dict()}
 
-    def crawl_category(self, driver, category_name, category_code, today):
-        url = f"https://www.musinsa.com/category/{category_code}?gf=A"
-        driver.get(url)
-        time.sleep(2)
+    def product_saved(self, product_data):
+        # 저장 스레드에서 불린다. 저장까지 끝난 상품만 체크포인트 키로 남겨서, 실패한 상품은 이어 할 때 다시 본다
+        pending = self.pending_keys.pop(product_data['cosmetic_url'], None)
+        if pending is not None:
+            self.checkpoint.add_key(*pending)
 
-        # 초기 상품 수집
-        try:
-            initial_products = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.sc-fUnNpA.iCowMw"))
-            )
-        
-            for product in initial_products:
-                try:
-                    product_data = self.extract_product_data(driver, product, category_name)
-                    if product_data:
-                        self.save_or_update_product(product_data, today)
-                except Exception as e:
-                    logging.error(f'상품 처리 중 오류: {str(e)}')
-                    continue
-        except Exception as e:
-            logging.error(f'초기 상품 목록 로딩 중 오류: {str(e)}')
+    def save_progress(self):
+        # 넘긴 상품이 모두 저장된 뒤에만 체크포인트를 남겨서, 이어 할 때 빠지는 상품이 없게 한다
+        if self.pipeline is not None:
+            self.pipeline.drain()
+        else:
+            self.writer.flush()
+        self.price_cache.flush()
+        self.checkpoint.flush()
+
+    def crawl_category(self, driver, category_name, category_code, today):
+        url = f"{settings.MUSINSA_BASE_URL}/category/{category_code}?gf=A"
+        started = self.meter.start(driver)
+        with self.metrics.timer('navigation', category_code):
+            driver.get(url)
+        with self.metrics.timer('wait', category_code):
+            listing_ready = self.waiter.wait(driver, 'listing', selector_present(CARD_SELECTOR), self.ready_timeout)
+        self.meter.finish(driver, 'listing', url, started)
+        if not listing_ready:
+            logging.error(f'초기 상품 목록 로딩 시간 초과: {category_name}({category_code})')
 
-        # 스크롤하면서 추가 상품 수집
-        scroll_pause_time = 2
-        last_height = driver.execute_script("return document.body.scrollHeight")
+        # 스크롤하면서 새로 붙은 상품만 수집
+        seen_urls = set()
+        scroll_count = 0
+        resumed = len(self.checkpoint.processed_keys(category_code))
+        if resumed:
+            logging.info(f'{category_name}({category_code}) 이어서 크롤링: 저장된 상품 {resumed}개는 건너뜀')
 
         while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(scroll_pause_time)
+            try:
+                new_cards = self.process_new_cards(driver, category_name, category_code, seen_urls)
+                if self.archive.enabled:
+                    self.archive.add('listing', category_name, category_code, scroll_count, url, driver.page_source)
+                logging.info(f'{category_name}({category_code}) 스크롤 {scroll_count}: 새 카드 {new_cards}개')
+                if self.pipeline is not None:
+                    self.pipeline.log_stats(f'{category_name}({category_code}) 스크롤 {scroll_count}')
+            except Exception as e:
+                logging.error(f'상품 목록 로딩 중 오류: {str(e)}')
+                self.metrics.error(e, 'listing', category_code)
 
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+            self.checkpoint.page_done(category_name, category_code, scroll_count)
+            if self.checkpoint.due():
+                self.save_progress()
+
+            # 스크롤 직전 카드 수와 높이를 기준으로, 둘 중 하나라도 늘 때까지만 기다린다
+            started = self.meter.start(driver)
+            with self.metrics.timer('scroll', category_code):
+                card_count, height = driver.execute_script(SCROLL_TO_BOTTOM, CARD_SELECTOR)
+                grew = self.waiter.wait(driver, 'scroll', grew_after_scroll(CARD_SELECTOR, card_count, height),
+                                        self.scroll_timeout)
+            self.meter.finish(driver, 'scroll', url, started)
+            self.metrics.count('scrolls', category=category_code)
+            if not grew:
                 break
-            last_height = new_height
+            scroll_count += 1
+
+        logging.info(f'{category_name}({category_code}) 완료: 상품 {len(seen_urls)}개, 스크롤 {scroll_count}회')
 
+    def process_new_cards(self, driver, category_name, category_code, seen_urls):
+        processed = self.checkpoint.processed_keys(category_code)
+        # 처리한 카드에 표시를 남겨서 스크롤 뒤에는 새로 붙은 카드만 가져온다
+        with self.metrics.timer('extraction', category_code):
+            if self.extraction == 'script':
+                products = [
+                    product_from_card(card, category_name)
+                    for card in extract_cards(driver, CARD_SELECTOR, SCRIPT_FIELDS, SEEN_ATTRIBUTE)
+                ]
+            else:
+                cards = driver.find_elements(By.CSS_SELECTOR, f'{CARD_SELECTOR}:not([{SEEN_ATTRIBUTE}])')
+                if cards:
+                    driver.execute_script(
+                        f"arguments[0].forEach(function (card) {{ card.setAttribute('{SEEN_ATTRIBUTE}', '1'); }});",
+                        cards
+                    )
+                products = [self.extract_listing_data(card, category_name) for card in cards]
+        if not products:
+            return 0
+        self.metrics.count('cards_seen', len(products), category=category_code)
+        failed = products.count(None)
+        if failed:
+            # 카드별 추출 오류는 이미 로그로 남았으니 개수만 센다
+            self.metrics.count('errors', failed, stage='extraction', type='CardExtraction', category=category_code)
+
+        for product_data in products:
             try:
-                products = WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.sc-fUnNpA.iCowMw"))
-                )
+                # 다시 그려진 카드라도 이미 본 상품이면 상세 페이지를 또 열지 않는다
+                if not product_data or product_data['cosmetic_url'] in seen_urls:
+                    continue
+                seen_urls.add(product_data['cosmetic_url'])
+                # 이어서 하는 실행이면 지난번에 저장까지 끝난 상품도 건너뛴다
+                key = product_key(product_data['cosmetic_url'])
+                if key in processed:
+                    continue
+                self.pending_keys[product_data['cosmetic_url']] = (category_name, category_code, key)
+
+                if self.pipeline is not None:
+                    self.pipeline.submit(product_data)
+                    continue
 
-                for product in products:
-                    try:
-                        product_data = self.extract_product_data(driver, product, category_name)
-                        if product_data:
-                            self.save_or_update_product(product_data, today)
-                    except Exception as e:
-                        logging.error(f'상품 처리 중 오류: {str(e)}')
-                        continue
+                product_data['price'] = self.lookup_list_price(
+                    driver, product_data['cosmetic_url'], product_data['sale_price']
+                )
+                self.writer.add(product_data)
             except Exception as e:
-                logging.error(f'상품 목록 로딩 중 오류: {str(e)}')
+                logging.error(f'상품 처리 중 오류: {str(e)}')
+                self.metrics.error(e, 'product', category_code)
                 continue
+        return len(products)
 
-
-    def extract_product_data(self, driver, product, category_name):
+    def extract_listing_data(self, product, category_name):
         try:
             brand = product.find_element(By.CSS_SELECTOR, "span.text-etc_11px_semibold.sc-dcJtft.sc-iGgVNO.jEEFmT.laXDWb.font-pretendard").text
             name = product.find_element(By.CSS_SELECTOR, "span.text-body_13px_reg.sc-dcJtft.sc-gsFSjX.jEEFmT.eEPdZZ.font-pretendard").text
             price_spans = product.find_elements(By.CSS_SELECTOR, "span.text-body_13px_semi.sc-fqkwJk.ioeSYE.font-pretendard")
             sale_price_raw = price_spans[1].text if len(price_spans) > 1 else price_spans[0].text
-            sale_price = ''.join(filter(str.isdigit, sale_price_raw))
+            sale_price = parse_price(sale_price_raw)
             
             product_url = product.find_element(By.CSS_SELECTOR, "a.gtm-select-item").get_attribute('href')
             image_url = product.find_element(By.CSS_SELECTOR, "img.max-w-full").get_attribute('src')
 
-            driver.execute_script("window.open('');")
-            driver.switch_to.window(driver.window_handles[-1])
-            driver.get(product_url)
-            time.sleep(1)
-
-            try:
-                price_selectors = [
-                "span.text-xs.font-medium.mb-0\\.5.text-gray-500.font-pretendard[style='text-decoration-line: line-through;']",
-                "div.sc-xz8kdb-2.gyAydn span.text-xs.font-medium.mb-0\\.5.text-gray-500.font-pretendard[style='text-decoration-line: line-through;']",
-                "span.text-xs.font-medium.text-gray-500[style='text-decoration-line: line-through;']"
-                ]
-    
-                price = None
-                for selector in price_selectors:
-                    try:
-                        price_raw = driver.find_element(By.CSS_SELECTOR, selector).text
-                        price = ''.join(filter(str.isdigit, price_raw))
-                        if price:  # 가격을 찾았다면 반복 중단
-                            break
-                    except:
-                        continue
-            
-                if not price:  # 모든 선택자로 시도했는데도 가격을 못 찾은 경우
-                    price = sale_price
-        
-            except Exception as e:
-                price = sale_price
-
-            except Exception as e:
-                logging.error(f'정가 추출 중 오류: {str(e)}')
-
-            driver.close()
-            driver.switch_to.window(driver.window_handles[0])
-
             return {
                 'category': category_name,
                 'brand': brand,
                 'cosmetic_name': name,
-                'price': price,
                 'sale_price': sale_price,
                 'cosmetic_url': product_url,
                 'image_url': image_url
@@ -171,55 +333,42 @@ class Command(BaseCommand):
             logging.error(f'데이터 추출 중 오류: {str(e)}')
             return None
 
+    def lookup_list_price(self, driver, product_url, sale_price):
+        price = self.price_cache.get(product_url, sale_price)
+        if price is None:
+            price = self.fetch_list_price(driver, product_url, sale_price)
+            if price is None:
+                # 상세 페이지에서 읽지 못했으면 지난번 저장한 정가를 쓰고 캐시에는 남기지 않는다
+                return self.writer.known_price(product_url)
+            self.price_cache.put(product_url, price, sale_price)
+        return price
 
-    def save_or_update_product(self, product_data, today):
-        with connection.cursor() as cursor:
-            try:
-                cursor.execute("""
-                    SELECT cosmetic_url, price, sale_price 
-                    FROM msscosmetic 
-                    WHERE cosmetic_url = %s
-                """, [product_data['cosmetic_url']])
-                
-                existing_product = cursor.fetchone()
-                
-                if existing_product:
-                    if (existing_product[1] != product_data['price'] or 
-                        existing_product[2] != product_data['sale_price']):
-                        cursor.execute("""
-                            UPDATE msscosmetic 
-                            SET price = %s, sale_price = %s, updated_at = %s
-                            WHERE cosmetic_url = %s
-                        """, [
-                            product_data['price'],
-                            product_data['sale_price'],
-                            today,
-                            product_data['cosmetic_url']
-                        ])
-                        logging.info(f"상품 업데이트: {product_data['cosmetic_name']}")
-                else:
-                    cursor.execute("""
-                        INSERT INTO msscosmetic (
-                            category, brand, cosmetic_name, price, 
-                            sale_price, cosmetic_url, image_url, 
-                            created_at, updated_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, [
-                        product_data['category'],
-                        product_data['brand'],
-                        product_data['cosmetic_name'],
-                        product_data['price'],
-                        product_data['sale_price'],
-                        product_data['cosmetic_url'],
-                        product_data['image_url'],
-                        today,
-                        today
-                    ])
-                    logging.info(f"새 상품 추가: {product_data['cosmetic_name']}")
-
-                connection.commit()
+    def fetch_list_price(self, driver, product_url, sale_price):
+        driver.execute_script("window.open('');")
+        driver.switch_to.window(driver.window_handles[-1])
+        try:
+            return self.read_list_price(driver, product_url, sale_price)
+        except Exception as e:
+            # 실패한 결과는 캐시에 남기지 않도록 None 을 돌려준다
+            logging.error(f'정가 추출 중 오류: {str(e)}')
+            self.metrics.error(e, 'detail')
+            return None
+        finally:
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
 
-            except Exception as e:
-                connection.rollback()
-                logging.error(f'데이터베이스 저장 중 오류: {str(e)}')
-                raise e
+    def read_list_price(self, driver, product_url, sale_price):
+        """상세 페이지의 정가. 페이지가 준비되지 않았거나 취소선 가격을 읽지 못하면 None."""
+        started = self.meter.start(driver)
+        # 상세 페이지는 워커 스레드에서도 읽으므로 카테고리 없이 단계만 모은다
+        with self.metrics.timer('detail'):
+            driver.get(product_url)
+            ready = self.waiter.wait(driver, 'detail', DETAIL_READY, self.ready_timeout)
+        self.meter.finish(driver, 'detail', product_url, started)
+        if self.archive.enabled:
+            self.archive.add('detail', None, None, None, product_url, driver.page_source)
+        if not ready:
+            # 덜 그려진 페이지에서 읽은 값은 캐시에 남으면 안 되므로 정가를 모른다고 돌려준다
+            logging.warning(f'상세 페이지 로딩 시간 초과: {product_url}')
+            return None
+        return read_strikethrough_price(driver, PRICE_SELECTORS, sale_price)
@@ -1,90 +1,419 @@
 from django.core.management.base import BaseCommand
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 from django.utils import timezone
-from django.db import connection
-import time
+from django.conf import settings
+from asgiref.sync import async_to_sync, sync_to_async
+from c3_crawling_app.crawling import oliveyoung
+from c3_crawling_app.crawling.async_engine import AsyncFetcher, crawl_pages
+from c3_crawling_app.crawling.archive import PageArchive
+from c3_crawling_app.crawling.browser import PROFILES, build_chrome_driver
+from c3_crawling_app.crawling.checkpoint import CheckpointStore, resolve_run_id
+from c3_crawling_app.crawling.dom_extract import extract_cards
+from c3_crawling_app.crawling.fingerprint import ListingFingerprints
+from c3_crawling_app.crawling.http_client import HttpClient
+from c3_crawling_app.crawling.logs import set_site
+from c3_crawling_app.crawling.metrics import RunMetrics, export_run_metrics
+from c3_crawling_app.crawling.page_meter import PageMeter
+from c3_crawling_app.crawling.pool import run_parallel
+from c3_crawling_app.crawling.prices import parse_price
+from c3_crawling_app.crawling.readiness import ReadinessWaiter, any_selector_present
+from c3_crawling_app.crawling.snapshot import CatalogueSnapshot
+from c3_crawling_app.crawling.writer import ProductWriter, format_counts, merge_counts, raise_on_sigterm
+import asyncio
 import logging
+import time
+
+CATEGORIES = {
+    "스킨케어": ["100000100010013", "100000100010014", "100000100010015", 
+              "100000100010016", "100000100010010", "100000100010017"],
+    "마스크팩": ["100000100090001", "100000100090004", "100000100090002", 
+              "100000100090005", "100000100090006"],
+    "클렌징": ["100000100100001", "100000100100004", "100000100100005", 
+            "100000100100007", "100000100100008", "100000100100006"],
+    "선케어": ["100000100110006", "100000100110003", "100000100110004", 
+            "100000100110005", "100000100110002"],
+    "립메이크업": ["100000100020006"],
+    "베이스메이크업": ["100000100020001"],
+    "아이메이크업": ["100000100020007"]
+}
 
-logging.basicConfig(
-    filename='oy_crawling.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8'
-)
+LISTING_READY = any_selector_present(['.prd_info'], "return document.readyState === 'complete';")
 
 class Command(BaseCommand):
     help = '올리브영 상품 크롤링'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='카테고리를 나눠 처리할 크롬 워커 프로세스 수 (기본값 1: 순차 실행)'
+        )
+        parser.add_argument(
+            '--engine', choices=['selenium', 'http', 'async'], default='selenium',
+            help='목록 페이지 수집 방식 (http: 브라우저 없이 HTML을 받아 파싱, async: http를 동시 요청으로)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='한 트랜잭션으로 묶어 저장할 최대 상품 수'
+        )
+        parser.add_argument(
+            '--browser-profile', choices=PROFILES, default='full',
+            help='브라우저 프로필 (lean: 이미지/폰트/추적 스크립트 차단, 사이트별 조정은 BROWSER_SITE_PROFILES 설정. full: 모두 받음)'
+        )
+        parser.add_argument(
+            '--measure-pages', action='store_true',
+            help='페이지별 전송 바이트와 준비 시간을 로그로 남긴다 (full/lean 비교용)'
+        )
+        parser.add_argument(
+            '--extraction', choices=['script', 'elements'], default='script',
+            help='카드 추출 방식 (script: 페이지당 execute_script 한 번, elements: 필드마다 find_element)'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help='본 원본 HTML 을 날짜별로 압축 보관할 디렉터리 (reparse 명령으로 다시 파싱할 수 있다)'
+        )
+        parser.add_argument(
+            '--ready-timeout', type=float, default=10,
+            help='selenium 엔진에서 목록 페이지가 준비되기를 기다리는 최대 시간(초)'
+        )
+        parser.add_argument(
+            '--metrics-dir', default=settings.CRAWL_METRICS_DIR,
+            help='실행 요약(JSON)과 Prometheus textfile 을 남길 디렉터리 (기본값 CRAWL_METRICS_DIR 설정)'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='가장 최근 실행의 체크포인트부터 이어서 크롤링 (끝난 카테고리는 건너뛴다)'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='지난 크롤링과 상품/가격이 같은 목록 페이지도 건너뛰지 않고 모두 추출해 저장한다'
+        )
+        parser.add_argument(
+            '--checkpoint-interval', type=float, default=30,
+            help='체크포인트를 DB 에 저장하는 최소 간격(초)'
+        )
+        parser.add_argument(
+            '--page-retries', type=int, default=2,
+            help='페이지 처리에 실패했을 때 같은 페이지를 다시 시도할 횟수'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='async 엔진에서 호스트당 동시에 보낼 최대 요청 수'
+        )
+        parser.add_argument(
+            '--rate', type=float, default=2.0,
+            help='async 엔진에서 호스트당 초당 요청 수 (토큰 버킷)'
+        )
+        parser.add_argument(
+            '--prefetch', type=int, default=1,
+            help='async 엔진에서 현재 페이지를 처리하는 동안 미리 받아둘 다음 페이지 수'
+        )
+
     def handle(self, *args, **options):
         try:
-            self.crawl_oliveyoung()
-            self.stdout.write(self.style.SUCCESS('크롤링 완료'))
-            logging.info('크롤링 작업 성공')
+            # 워커 프로세스도 같은 실행 ID 를 쓰도록 options 에 넣어서 넘긴다
+            options['run_id'] = resolve_run_id(
+                'oliveyoung', options['resume'], [code for codes in CATEGORIES.values() for code in codes]
+            )
+            self.setup_run(options)
+            started_at = time.time()
+            counts = self.crawl_oliveyoung(options)
+            metrics = RunMetrics('oliveyoung')
+            metrics.merge(counts.pop('metrics'))
+            export_run_metrics(metrics, counts, started_at, time.time() - started_at, options['metrics_dir'])
+            self.stdout.write(self.style.SUCCESS(f'크롤링 완료 ({format_counts(counts)})'))
+            logging.info(f'크롤링 작업 성공 ({format_counts(counts)})')
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'크롤링 실패: {str(e)}'))
             logging.error(f'크롤링 작업 실패: {str(e)}')
 
-    def crawl_oliveyoung(self):
-        categories = {
-            "스킨케어": ["100000100010013", "100000100010014", "100000100010015", 
-                      "100000100010016", "100000100010010", "100000100010017"],
-            "마스크팩": ["100000100090001", "100000100090004", "100000100090002", 
-                      "100000100090005", "100000100090006"],
-            "클렌징": ["100000100100001", "100000100100004", "100000100100005", 
-                    "100000100100007", "100000100100008", "100000100100006"],
-            "선케어": ["100000100110006", "100000100110003", "100000100110004", 
-                    "100000100110005", "100000100110002"],
-            "립메이크업": ["100000100020006"],
-            "베이스메이크업": ["100000100020001"],
-            "아이메이크업": ["100000100020007"]
-        }
-
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.implicitly_wait(5)
+    def setup_run(self, options):
+        set_site('oliveyoung')
+        self.engine = options['engine']
+        self.concurrency = options['concurrency']
+        self.rate = options['rate']
+        self.prefetch = options['prefetch']
+        self.batch_size = options['batch_size']
+        self.ready_timeout = options['ready_timeout']
+        self.archive_dir = options['archive_dir']
+        self.extraction = options['extraction']
+        self.browser_profile = options['browser_profile']
+        self.measure_pages = options['measure_pages']
+        self.run_id = options['run_id']
+        self.checkpoint_interval = options['checkpoint_interval']
+        self.page_retries = options['page_retries']
+        self.force = options['force']
+
+    def build_driver(self):
+        return build_chrome_driver('oliveyoung', self.browser_profile, self.measure_pages)
+
+    def crawl_oliveyoung(self, options):
+        today = timezone.now().date()
+        work_items = [
+            (category_name, category_code)
+            for category_name, subcategories in CATEGORIES.items()
+            for category_code in subcategories
+        ]
+
+        if options['workers'] > 1:
+            return merge_counts(
+                run_parallel(type(self), work_items, options['workers'], today, options)
+            )
+        return self.crawl_work_items(work_items, today)
+
+    def crawl_work_items(self, work_items, today):
+        raise_on_sigterm()
+        snapshot = CatalogueSnapshot.load('oycosmetic')
+        self.checkpoint = CheckpointStore.load('oliveyoung', self.run_id, self.checkpoint_interval)
+        self.metrics = RunMetrics('oliveyoung')
+        self.fingerprints = ListingFingerprints.load('oliveyoung', self.force)
+        self.pages_skipped = 0
+        self.cards_skipped = 0
+        work_items = self.pending_work_items(work_items)
+        with PageArchive(self.archive_dir, 'oliveyoung', today) as archive, \
+                ProductWriter('oycosmetic', today, batch_size=self.batch_size, snapshot=snapshot,
+                              metrics=self.metrics) as writer:
+            self.archive = archive
+            self.writer = writer
+            if self.engine == 'async':
+                # async_to_sync 로 돌리면 thread_sensitive 호출이 이 스레드로 돌아와서
+                # writer 와 DB 연결을 쓰는 일이 모두 한 스레드(한 연결)에서 일어난다
+                async_to_sync(self.crawl_work_items_async)(work_items, today)
+            elif self.engine == 'http':
+                self.crawl_work_items_http(work_items, today)
+            else:
+                self.crawl_work_items_selenium(work_items, today)
+        # writer 가 남은 상품까지 저장한 뒤에 체크포인트와 목록 지문을 남긴다
+        self.checkpoint.flush()
+        self.fingerprints.flush()
+        counts = writer.counts()
+        # 건너뛴 페이지의 상품도 변경 없음으로 센다
+        counts['unchanged'] += self.cards_skipped
+        return {**counts, 'pages_skipped': self.pages_skipped, 'metrics': self.metrics.to_dict()}
+
+    def pending_work_items(self, work_items):
+        for category_name, category_code in work_items:
+            if self.checkpoint.is_completed(category_code):
+                logging.info(f'{category_name}({category_code}) 이미 완료, 건너뜀')
+                continue
+            yield category_name, category_code
+
+    def crawl_category_pages(self, category_name, category_code, crawl_page):
+        """체크포인트 다음 페이지부터 crawl_page(page_number) 를 차례로 부른다.
+
+        crawl_page 는 그 페이지 상품을 저장(writer flush)까지 하고 다음 페이지가 있는지 돌려준다.
+        실패한 페이지는 page_retries 번까지 다시 시도하고, 그래도 안 되면 카테고리를
+        완료로 남기지 않고 넘어가서 --resume 때 그 페이지부터 다시 하게 한다.
+        """
+        page_number = self.checkpoint.last_page(category_code) + 1
+        if page_number > 1:
+            logging.info(f'{category_name}({category_code}) {page_number}페이지부터 이어서 크롤링')
+
+        failures = 0
+        while True:
+            try:
+                has_next = crawl_page(page_number)
+            except Exception as e:
+                self.metrics.error(e, 'page', category_code)
+                failures += 1
+                if failures > self.page_retries:
+                    logging.error(f'페이지 처리 중 오류, {category_name}({category_code}) 중단: {str(e)}')
+                    return
+                logging.error(
+                    f'페이지 처리 중 오류, {page_number}페이지 다시 시도 ({failures}/{self.page_retries}): {str(e)}'
+                )
+                time.sleep(failures)
+                continue
+
+            failures = 0
+            self.metrics.count('pages', category=category_code)
+            self.checkpoint.page_done(category_name, category_code, page_number)
+            if self.checkpoint.due():
+                self.checkpoint.flush()
+            if not has_next:
+                break
+            page_number += 1
+
+        self.checkpoint.category_done(category_name, category_code)
+        self.fingerprints.flush()
 
+    def skip_unchanged(self, category_code, page_number, fingerprint, card_count):
+        """목록 지문이 지난 크롤링과 같으면 건너뛴 페이지로 세고 참을 돌려준다. 지문이 None 이면 건너뛰지 않는다."""
+        if fingerprint is None or not card_count:
+            return False
+        if not self.fingerprints.unchanged(category_code, page_number, fingerprint):
+            return False
+        self.pages_skipped += 1
+        self.cards_skipped += card_count
+        self.metrics.count('pages_skipped', category=category_code)
+        self.metrics.count('cards_skipped', card_count, category=category_code)
+        return True
+
+    def crawl_work_items_http(self, work_items, today):
+        client = HttpClient()
+        try:
+            for category_name, category_code in work_items:
+                self.crawl_category_http(client, category_name, category_code, today)
+        finally:
+            client.close()
+
+    def crawl_work_items_selenium(self, work_items, today):
+        self.waiter = ReadinessWaiter()
+        self.meter = PageMeter(self.measure_pages, self.browser_profile)
+        driver = self.build_driver()
         try:
-            today = timezone.now().date()
-            for category_name, subcategories in categories.items():
-                for category_code in subcategories:
-                    self.crawl_category(driver, category_name, category_code, today)
+            for category_name, category_code in work_items:
+                self.crawl_category(driver, category_name, category_code, today)
         finally:
             driver.quit()
+            self.waiter.log_summary('올리브영')
+            self.meter.log_summary('올리브영')
 
     def crawl_category(self, driver, category_name, category_code, today):
-        page_number = 1
-        while True:
-            try:
-                search_url = f"https://www.oliveyoung.co.kr/store/display/getMCategoryList.do?dispCatNo={category_code}&isLoginCnt=0&aShowCnt=0&bShowCnt=0&cShowCnt=0&pageIdx={page_number}&rowsPerPage=24&searchTypeSort=btn_thumb&plusButtonFlag=N"
-                driver.get(search_url)
-                time.sleep(2)
-
-                products = driver.find_elements(By.CLASS_NAME, 'prd_info')
-                if not products:
-                    break
-
-                for product in products:
-                    try:
-                        product_data = self.extract_product_data(product, category_name)
-                        if product_data:
-                            self.save_or_update_product(product_data, today)
-                    except Exception as e:
-                        logging.error(f'상품 처리 중 오류: {str(e)}')
-                        continue
-
-                if not self.has_next_page(driver):
-                    break
-                page_number += 1
+        self.crawl_category_pages(
+            category_name, category_code,
+            lambda page_number: self.crawl_page(driver, category_name, category_code, page_number, today)
+        )
 
+    def crawl_page(self, driver, category_name, category_code, page_number, today):
+        search_url = oliveyoung.listing_url(category_code, page_number)
+        started = self.meter.start(driver)
+        with self.metrics.timer('navigation', category_code):
+            driver.get(search_url)
+        # 서버에서 그려 오는 목록이라 상품 목록이 있거나 문서 로딩이 끝나면 바로 읽는다
+        with self.metrics.timer('wait', category_code):
+            self.waiter.wait(driver, 'listing', LISTING_READY, self.ready_timeout)
+        self.meter.finish(driver, 'listing', search_url, started)
+        if self.archive.enabled:
+            self.archive.add('listing', category_name, category_code, page_number, search_url, driver.page_source)
+
+        has_next = bool(self.has_next_page(driver))
+        with self.metrics.timer('extraction', category_code):
+            if self.extraction == 'script':
+                products = [
+                    oliveyoung.product_from_script(card, category_name)
+                    for card in extract_cards(driver, '.prd_info', oliveyoung.SCRIPT_FIELDS)
+                ]
+            else:
+                products = [
+                    self.extract_product_data(product, category_name)
+                    for product in driver.find_elements(By.CLASS_NAME, 'prd_info')
+                ]
+        if not products:
+            return False
+
+        fingerprint = oliveyoung.listing_fingerprint(products, has_next)
+        if self.skip_unchanged(category_code, page_number, fingerprint, len(products)):
+            return has_next
+        if self.save_products(products, today, category_code) and fingerprint is not None:
+            self.fingerprints.record(category_code, page_number, fingerprint, len(products))
+        return has_next
+
+    def crawl_category_http(self, client, category_name, category_code, today):
+        self.crawl_category_pages(
+            category_name, category_code,
+            lambda page_number: self.crawl_page_http(client, category_name, category_code, page_number, today)
+        )
+
+    def crawl_page_http(self, client, category_name, category_code, page_number, today):
+        search_url = oliveyoung.listing_url(category_code, page_number)
+        with self.metrics.timer('fetch', category_code):
+            html = client.fetch(search_url)
+        self.archive.add('listing', category_name, category_code, page_number, search_url, html)
+
+        with self.metrics.timer('parse', category_code):
+            products, has_next = oliveyoung.parse_listing(html, category_name, search_url)
+        if not products:
+            return False
+
+        fingerprint = oliveyoung.listing_fingerprint(products, has_next)
+        if self.skip_unchanged(category_code, page_number, fingerprint, len(products)):
+            return has_next
+        if self.save_products(products, today, category_code) and fingerprint is not None:
+            self.fingerprints.record(category_code, page_number, fingerprint, len(products))
+        return has_next
+
+    async def crawl_work_items_async(self, work_items, today):
+        client = HttpClient(pool_size=self.concurrency)
+        fetcher = AsyncFetcher(client, per_host=self.concurrency, rate=self.rate, metrics=self.metrics)
+        save_products = sync_to_async(self.save_products, thread_sensitive=True)
+        try:
+            # 카테고리끼리도 동시에 돌리고, 전체 동시 요청 수는 호스트별 제한이 막는다
+            await asyncio.gather(*(
+                self.crawl_category_async(fetcher, save_products, category_name, category_code, today)
+                for category_name, category_code in work_items
+            ))
+        finally:
+            client.close()
+
+    async def crawl_category_async(self, fetcher, save_products, category_name, category_code, today):
+        async def handle_page(page_number, search_url, html):
+            await asyncio.to_thread(
+                self.archive.add, 'listing', category_name, category_code, page_number, search_url, html
+            )
+            started = time.monotonic()
+            products, has_next = await asyncio.to_thread(oliveyoung.parse_listing, html, category_name, search_url)
+            self.metrics.observe('parse', time.monotonic() - started, category_code)
+            fingerprint = oliveyoung.listing_fingerprint(products, has_next)
+            if self.skip_unchanged(category_code, page_number, fingerprint, len(products)):
+                has_more = has_next
+            else:
+                if products and await save_products(products, today, category_code) and fingerprint is not None:
+                    self.fingerprints.record(category_code, page_number, fingerprint, len(products))
+                has_more = bool(products) and has_next
+
+            self.metrics.count('pages', category=category_code)
+            self.checkpoint.page_done(category_name, category_code, page_number)
+            if self.checkpoint.due():
+                await sync_to_async(self.checkpoint.flush, thread_sensitive=True)()
+            return has_more
+
+        def retry_page(page_number, failures, exc):
+            self.metrics.error(exc, 'page', category_code)
+            logging.error(
+                f'페이지 처리 중 오류, {page_number}페이지 다시 시도 ({failures}/{self.page_retries}): {str(exc)}'
+            )
+
+        start_page = self.checkpoint.last_page(category_code) + 1
+        if start_page > 1:
+            logging.info(f'{category_name}({category_code}) {start_page}페이지부터 이어서 크롤링')
+        try:
+            await crawl_pages(
+                fetcher,
+                lambda page_number: oliveyoung.listing_url(category_code, page_number),
+                handle_page,
+                prefetch=self.prefetch,
+                start_page=start_page,
+                retries=self.page_retries,
+                on_retry=retry_page,
+            )
+        except Exception as e:
+            # 끝까지 못 간 카테고리는 완료로 남기지 않아서 --resume 때 이어서 한다
+            logging.error(f'페이지 처리 중 오류, {category_name}({category_code}) 중단: {str(e)}')
+            self.metrics.error(e, 'page', category_code)
+            return
+        await sync_to_async(self.checkpoint.category_done, thread_sensitive=True)(category_name, category_code)
+
+    def save_products(self, products, today, category_code):
+        """카드 추출과 저장이 모두 성공했으면 참. 그때만 목록 지문을 남겨서 실패한 상품을 다음에 다시 본다."""
+        cards = len(products)
+        failed = self.writer.failed
+        errors = 0
+        products = [product_data for product_data in products if product_data]
+        self.metrics.count('cards_seen', cards, category=category_code)
+        if cards > len(products):
+            # 카드별 추출 오류는 이미 로그로 남았으니 개수만 센다
+            self.metrics.count('errors', cards - len(products), stage='extraction', type='CardExtraction',
+                               category=category_code)
+        for product_data in products:
+            try:
+                self.writer.add(product_data)
             except Exception as e:
-                logging.error(f'페이지 처리 중 오류: {str(e)}')
-                break
+                logging.error(f'상품 처리 중 오류: {str(e)}')
+                self.metrics.error(e, 'product', category_code)
+                errors += 1
+        self.writer.flush()
+        return cards == len(products) and not errors and self.writer.failed == failed
 
     def extract_product_data(self, product, category_name):
         try:
@@ -92,11 +421,11 @@ class Command(BaseCommand):
             cosmetic_name = product.find_element(By.CLASS_NAME, 'tx_name').text
             
             sale_price_raw = product.find_element(By.CLASS_NAME, 'tx_cur').text
-            sale_price = ''.join(filter(str.isdigit, sale_price_raw))
+            sale_price = parse_price(sale_price_raw)
             
             try:
                 price_raw = product.find_element(By.CLASS_NAME, 'tx_org').text
-                price = ''.join(filter(str.isdigit, price_raw))
+                price = parse_price(price_raw)
             except NoSuchElementException:
                 price = sale_price
                 
@@ -116,58 +445,6 @@ class Command(BaseCommand):
             logging.error(f'데이터 추출 중 오류: {str(e)}')
             return None
 
-    def save_or_update_product(self, product_data, today):
-        with connection.cursor() as cursor:
-            try:
-                cursor.execute("""
-                    SELECT cosmetic_url, price, sale_price 
-                    FROM oycosmetic 
-                    WHERE cosmetic_url = %s
-                """, [product_data['cosmetic_url']])
-                
-                existing_product = cursor.fetchone()
-                
-                if existing_product:
-                    if (existing_product[1] != product_data['price'] or 
-                        existing_product[2] != product_data['sale_price']):
-                        cursor.execute("""
-                            UPDATE oycosmetic 
-                            SET price = %s, sale_price = %s, updated_at = %s
-                            WHERE cosmetic_url = %s
-                        """, [
-                            product_data['price'],
-                            product_data['sale_price'],
-                            today,
-                            product_data['cosmetic_url']
-                        ])
-                        logging.info(f"상품 업데이트: {product_data['cosmetic_name']}")
-                else:
-                    cursor.execute("""
-                        INSERT INTO oycosmetic (
-                            category, brand, cosmetic_name, price, 
-                            sale_price, cosmetic_url, image_url, 
-                            created_at, updated_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, [
-                        product_data['category'],
-                        product_data['brand'],
-                        product_data['cosmetic_name'],
-                        product_data['price'],
-                        product_data['sale_price'],
-                        product_data['cosmetic_url'],
-                        product_data['image_url'],
-                        today,
-                        today
-                    ])
-                    logging.info(f"새 상품 추가: {product_data['cosmetic_name']}")
-
-                connection.commit()
-
-            except Exception as e:
-                connection.rollback()
-                logging.error(f'데이터베이스 저장 중 오류: {str(e)}')
-                raise e
-
     def has_next_page(self, driver):
         next_button = driver.find_elements(By.CLASS_NAME, 'next')
         return next_button and 'disabled' not in next_button[0].get_attribute('class')
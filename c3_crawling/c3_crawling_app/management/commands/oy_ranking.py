@@ -1,174 +1,115 @@
 from django.core.management.base import BaseCommand
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-from django.utils import timezone
+from django.conf import settings
 from django.db import connection
-import time
+from django.utils import timezone
+from c3_crawling_app.crawling import oliveyoung
+from c3_crawling_app.crawling.http_client import HttpClient
+from c3_crawling_app.crawling.identity import url_hash
+from c3_crawling_app.crawling.logs import set_site
+from c3_crawling_app.crawling.metrics import RunMetrics, export_run_metrics
+from c3_crawling_app.crawling.ranking import lowest_price, publish_snapshot, site_prices
+from c3_crawling_app.models import RankingStaging
 import logging
+import time
 
-logging.basicConfig(
-    filename='oy_crawling.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8'
-)
 
 class Command(BaseCommand):
-    help = '올리브영 상품 크롤링'
+    help = '올리브영 판매 랭킹을 하루 한 번 수집해 ranking 스냅샷을 통째로 바꾼다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category', action='append', choices=list(oliveyoung.RANKING_CATEGORIES),
+            help='수집할 랭킹 대분류 (여러 번 지정 가능, 기본값: 전체)'
+        )
+        parser.add_argument(
+            '--min-products', type=int, default=10,
+            help='한 대분류에서 이보다 적게 읽히면 페이지가 깨진 것으로 보고 스냅샷을 바꾸지 않는다'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='ranking_staging 에 한 번에 넣을 최대 행 수'
+        )
+        parser.add_argument(
+            '--metrics-dir', default=settings.CRAWL_METRICS_DIR,
+            help='실행 요약(JSON)과 Prometheus textfile 을 남길 디렉터리 (기본값 CRAWL_METRICS_DIR 설정)'
+        )
 
     def handle(self, *args, **options):
+        set_site('oliveyoung')
+        started_at = time.time()
+        self.metrics = RunMetrics('oliveyoung_ranking')
         try:
-            self.crawl_oliveyoung()
-            self.stdout.write(self.style.SUCCESS('크롤링 완료'))
-            logging.info('크롤링 작업 성공')
+            categories = options['category'] or list(oliveyoung.RANKING_CATEGORIES)
+            snapshot_date = timezone.now().date()
+            rows = self.collect(categories, snapshot_date, options['min_products'])
+            self.fill_prices(rows)
+            with self.metrics.timer('publish'):
+                publish_snapshot(rows, options['batch_size'])
+            counts = {'ranked': len(rows), 'matched': sum(1 for row in rows if row.oy_product_id)}
+            export_run_metrics(self.metrics, counts, started_at, time.time() - started_at, options['metrics_dir'])
+            self.stdout.write(self.style.SUCCESS(
+                f'랭킹 스냅샷 교체 완료 ({snapshot_date}, {len(categories)}개 대분류, {len(rows)}건)'
+            ))
+            logging.info(f'랭킹 크롤링 작업 성공 ({snapshot_date}, {len(rows)}건)')
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'크롤링 실패: {str(e)}'))
-            logging.error(f'크롤링 작업 실패: {str(e)}')
-
-    def crawl_oliveyoung(self):
-        categories = {
-            "스킨케어": ["100000100010013", "100000100010014", "100000100010015", 
-                      "100000100010016", "100000100010010", "100000100010017"],
-            "마스크팩": ["100000100090001", "100000100090004", "100000100090002", 
-                      "100000100090005", "100000100090006"],
-            "클렌징": ["100000100100001", "100000100100004", "100000100100005", 
-                    "100000100100007", "100000100100008", "100000100100006"],
-            "선케어": ["100000100110006", "100000100110003", "100000100110004", 
-                    "100000100110005", "100000100110002"],
-            "립메이크업": ["100000100020006"],
-            "베이스메이크업": ["100000100020001"],
-            "아이메이크업": ["100000100020007"]
-        }
-
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.implicitly_wait(5)
+            self.stdout.write(self.style.ERROR(f'랭킹 크롤링 실패: {str(e)}'))
+            logging.error(f'랭킹 크롤링 작업 실패: {str(e)}')
 
+    def collect(self, categories, snapshot_date, min_products):
+        """대분류별 랭킹 페이지를 받아 RankingStaging 행 목록을 만든다. 하나라도 깨지면 예외."""
+        client = HttpClient(pool_size=1)
+        rows = []
         try:
-            today = timezone.now().date()
-            for category_name, subcategories in categories.items():
-                for category_code in subcategories:
-                    self.crawl_category(driver, category_name, category_code, today)
+            for category_name in categories:
+                category_code = oliveyoung.RANKING_CATEGORIES[category_name]
+                url = oliveyoung.best_url(category_code)
+                with self.metrics.timer('navigation', category_code):
+                    html = client.fetch(url)
+                with self.metrics.timer('extraction', category_code):
+                    ranked = oliveyoung.parse_best_list(html, category_name, url)
+
+                products = [(rank, product) for rank, product in ranked if product]
+                self.metrics.count('cards_seen', len(ranked), category=category_code)
+                if len(products) < min_products:
+                    raise RuntimeError(f'{category_name} 랭킹 상품이 {len(products)}개뿐이라 스냅샷을 바꾸지 않습니다')
+                logging.info(f'{category_name} 랭킹 {len(products)}개 수집')
+                rows.extend(
+                    RankingStaging(
+                        snapshot_date=snapshot_date,
+                        category=category_name,
+                        rank=rank,
+                        brand=product['brand'],
+                        cosmetic_name=product['cosmetic_name'],
+                        price=product['price'],
+                        sale_price=product['sale_price'],
+                        cosmetic_url=product['cosmetic_url'],
+                        image_url=product['image_url'],
+                        oy_price=product['sale_price'],
+                    )
+                    for rank, product in products
+                )
         finally:
-            driver.quit()
-
-    def crawl_category(self, driver, category_name, category_code, today):
-        page_number = 1
-        while True:
-            try:
-                search_url = f"https://www.oliveyoung.co.kr/store/display/getMCategoryList.do?dispCatNo={category_code}&isLoginCnt=0&aShowCnt=0&bShowCnt=0&cShowCnt=0&pageIdx={page_number}&rowsPerPage=24&searchTypeSort=btn_thumb&plusButtonFlag=N"
-                driver.get(search_url)
-                time.sleep(2)
-
-                products = driver.find_elements(By.CLASS_NAME, 'prd_info')
-                if not products:
-                    break
-
-                for product in products:
-                    try:
-                        product_data = self.extract_product_data(product, category_name)
-                        if product_data:
-                            self.save_or_update_product(product_data, today)
-                    except Exception as e:
-                        logging.error(f'상품 처리 중 오류: {str(e)}')
-                        continue
-
-                if not self.has_next_page(driver):
-                    break
-                page_number += 1
+            client.close()
+        return rows
 
-            except Exception as e:
-                logging.error(f'페이지 처리 중 오류: {str(e)}')
-                break
-
-    def extract_product_data(self, product, category_name):
-        try:
-            brand = product.find_element(By.CLASS_NAME, 'tx_brand').text
-            cosmetic_name = product.find_element(By.CLASS_NAME, 'tx_name').text
-            
-            sale_price_raw = product.find_element(By.CLASS_NAME, 'tx_cur').text
-            sale_price = ''.join(filter(str.isdigit, sale_price_raw))
-            
-            try:
-                price_raw = product.find_element(By.CLASS_NAME, 'tx_org').text
-                price = ''.join(filter(str.isdigit, price_raw))
-            except NoSuchElementException:
-                price = sale_price
-                
-            cosmetic_url = product.find_element(By.CLASS_NAME, 'prd_thumb').get_attribute('href')
-            image_url = product.find_element(By.CLASS_NAME, 'prd_thumb').find_element(By.TAG_NAME, 'img').get_attribute('src')
-
-            return {
-                'category': category_name,
-                'brand': brand,
-                'cosmetic_name': cosmetic_name,
-                'price': price,
-                'sale_price': sale_price,
-                'cosmetic_url': cosmetic_url,
-                'image_url': image_url
-            }
-        except Exception as e:
-            logging.error(f'데이터 추출 중 오류: {str(e)}')
-            return None
-
-    def save_or_update_product(self, product_data, today):
+    def fill_prices(self, rows):
+        """oycosmetic 의 상품 id 를 url_hash 로 찾고, product_match 로 다른 사이트 가격을 채운다."""
+        hashes = list({url_hash(row.cosmetic_url) for row in rows})
+        product_ids = {}
         with connection.cursor() as cursor:
-            try:
-                cursor.execute("""
-                    SELECT cosmetic_url, price, sale_price 
-                    FROM oycosmetic 
-                    WHERE cosmetic_url = %s
-                """, [product_data['cosmetic_url']])
-                
-                existing_product = cursor.fetchone()
-                
-                if existing_product:
-                    if (existing_product[1] != product_data['price'] or 
-                        existing_product[2] != product_data['sale_price']):
-                        cursor.execute("""
-                            UPDATE oycosmetic 
-                            SET price = %s, sale_price = %s, updated_at = %s
-                            WHERE cosmetic_url = %s
-                        """, [
-                            product_data['price'],
-                            product_data['sale_price'],
-                            today,
-                            product_data['cosmetic_url']
-                        ])
-                        logging.info(f"상품 업데이트: {product_data['cosmetic_name']}")
-                else:
-                    cursor.execute("""
-                        INSERT INTO oycosmetic (
-                            category, brand, cosmetic_name, price, 
-                            sale_price, cosmetic_url, image_url, 
-                            created_at, updated_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, [
-                        product_data['category'],
-                        product_data['brand'],
-                        product_data['cosmetic_name'],
-                        product_data['price'],
-                        product_data['sale_price'],
-                        product_data['cosmetic_url'],
-                        product_data['image_url'],
-                        today,
-                        today
-                    ])
-                    logging.info(f"새 상품 추가: {product_data['cosmetic_name']}")
-
-                connection.commit()
-
-            except Exception as e:
-                connection.rollback()
-                logging.error(f'데이터베이스 저장 중 오류: {str(e)}')
-                raise e
-
-    def has_next_page(self, driver):
-        next_button = driver.find_elements(By.CLASS_NAME, 'next')
-        return next_button and 'disabled' not in next_button[0].get_attribute('class')
-
+            for start in range(0, len(hashes), 1000):
+                chunk = hashes[start:start + 1000]
+                cursor.execute(
+                    f"SELECT url_hash, id FROM oycosmetic WHERE url_hash IN ({', '.join(['%s'] * len(chunk))})",
+                    chunk
+                )
+                product_ids.update(cursor.fetchall())
+
+        for row in rows:
+            row.oy_product_id = product_ids.get(url_hash(row.cosmetic_url))
+        prices = site_prices({row.oy_product_id for row in rows if row.oy_product_id})
+        for row in rows:
+            matched = prices.get(row.oy_product_id, {})
+            row.zz_price = matched.get('zz_price')
+            row.mss_price = matched.get('mss_price')
+            row.lowest_price = lowest_price(row.oy_price, row.zz_price, row.mss_price)
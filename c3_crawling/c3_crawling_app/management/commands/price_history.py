@@ -0,0 +1,112 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from c3_crawling_app.crawling.identity import url_hash
+from c3_crawling_app.crawling.logs import install_crawl_logging
+from c3_crawling_app.crawling.price_history import SITE_TABLES, append_history, price_series
+from datetime import date, timedelta
+import csv
+import logging
+
+
+class Command(BaseCommand):
+    help = '상품 또는 카테고리의 기간별 가격 이력을 CSV 로 출력한다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--site', choices=sorted(SITE_TABLES), required=True, help='사이트')
+        parser.add_argument(
+            '--product-id', type=int, action='append',
+            help='상품 테이블의 id (여러 번 지정 가능)'
+        )
+        parser.add_argument(
+            '--url', action='append',
+            help='상품 URL (여러 번 지정 가능, 정규화한 url_hash 로 찾는다)'
+        )
+        parser.add_argument('--category', help='이 카테고리의 상품 전체')
+        parser.add_argument(
+            '--start', type=date.fromisoformat,
+            help='시작 날짜 YYYY-MM-DD (기본값: 끝 날짜 90일 전)'
+        )
+        parser.add_argument(
+            '--end', type=date.fromisoformat,
+            help='끝 날짜 YYYY-MM-DD (기본값: 오늘)'
+        )
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='이력이 없는 상품의 현재 가격을 마지막 갱신일 기준으로 한 번 채운다 (도입 직후 한 번 실행)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='--seed 에서 한 트랜잭션으로 넣을 최대 행 수'
+        )
+
+    def handle(self, *args, **options):
+        install_crawl_logging()
+        site = options['site']
+        if options['seed']:
+            seeded = self.seed(site, options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f'{site}: 가격 이력 {seeded}건 채움'))
+            return
+
+        end = options['end'] or timezone.now().date()
+        start = options['start'] or end - timedelta(days=90)
+        if options['category']:
+            series = price_series(site, start, end, category=options['category'])
+        elif options['product_id'] or options['url']:
+            series = price_series(site, start, end, product_ids=self.product_ids(site, options))
+        else:
+            raise CommandError('--product-id, --url, --category 중 하나는 지정해야 합니다')
+
+        writer = csv.writer(self.stdout)
+        writer.writerow(['product_id', 'day', 'price', 'sale_price'])
+        for product_id, points in series.items():
+            for day, price, sale_price in points:
+                writer.writerow([product_id, day, price, sale_price])
+        logging.info(f'{site} 가격 이력 조회 {start}~{end}: 상품 {len(series)}개')
+
+    def product_ids(self, site, options):
+        product_ids = list(options['product_id'] or [])
+        urls = options['url'] or []
+        if urls:
+            placeholders = ', '.join(['%s'] * len(urls))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT id FROM {SITE_TABLES[site]} WHERE url_hash IN ({placeholders})",
+                    [url_hash(url) for url in urls]
+                )
+                product_ids.extend(product_id for (product_id,) in cursor.fetchall())
+        return product_ids
+
+    def seed(self, site, chunk_size):
+        table = SITE_TABLES[site]
+        seeded = 0
+        last_id = 0
+        while True:
+            # PK 범위로 잘라 읽고, 이미 이력이 있는 상품은 건너뛴다
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT t.id, t.updated_at, t.price, t.sale_price
+                    FROM {table} t
+                    WHERE t.id > %s
+                      AND NOT EXISTS (
+                          SELECT 1 FROM price_history h WHERE h.site = %s AND h.product_id = t.id
+                      )
+                    ORDER BY t.id
+                    LIMIT %s
+                """, [last_id, site, chunk_size])
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                append_history(cursor, [
+                    (site, product_id, self.as_date(updated_at), price, sale_price)
+                    for product_id, updated_at, price, sale_price in rows
+                ])
+            seeded += len(rows)
+            last_id = rows[-1][0]
+        return seeded
+
+    def as_date(self, value):
+        # 올리브영 테이블만 updated_at 이 DATETIME 이다
+        if hasattr(value, 'date'):
+            return value.date()
+        return value
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from c3_crawling_app.crawling.logs import install_crawl_logging
+from c3_crawling_app.crawling.search import SEARCH_INDEXES
+import logging
+import time
+
+
+class Command(BaseCommand):
+    help = '상품 검색용 FULLTEXT ngram 인덱스를 새로 만들어 기존 인덱스와 바꿔 끼운다 (MySQL 전용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table', choices=list(SEARCH_INDEXES), action='append',
+            help='다시 만들 테이블 (여러 번 지정 가능, 기본값: 전체)'
+        )
+
+    def handle(self, *args, **options):
+        install_crawl_logging()
+        if connection.vendor != 'mysql':
+            raise CommandError('FULLTEXT ngram 인덱스는 MySQL 에서만 만들 수 있습니다')
+
+        for table in options['table'] or SEARCH_INDEXES:
+            started = time.monotonic()
+            self.rebuild(table, SEARCH_INDEXES[table])
+            seconds = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f'{table}: 검색 인덱스 재생성 ({seconds:.1f}초)'))
+            logging.info(f'{table} 검색 인덱스 재생성: {seconds:.1f}초')
+
+    def index_exists(self, cursor, table, index):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, [table, index])
+        return cursor.fetchone()[0] > 0
+
+    def rebuild(self, table, index):
+        # 행마다 쌓인 삭제/갱신 기록을 버리고 정렬된 상태로 다시 만든다.
+        # 같은 컬럼에 새 인덱스를 먼저 다 만든 뒤 기존 인덱스를 지우고 이름을 바꾸므로, 그동안에도
+        # MATCH 검색은 둘 중 하나의 인덱스로 계속 돈다. 만드는 동안 상품 쓰기는 기다린다(LOCK=SHARED).
+        building = f'{index}_rebuild'
+        with connection.cursor() as cursor:
+            # 지난번에 중간에 멈췄다면 만들다 만 인덱스부터 지운다
+            if self.index_exists(cursor, table, building):
+                cursor.execute(f'ALTER TABLE {table} DROP INDEX {building}')
+            cursor.execute(
+                f'ALTER TABLE {table} ADD FULLTEXT INDEX {building} (brand, cosmetic_name) WITH PARSER ngram'
+            )
+            if self.index_exists(cursor, table, index):
+                cursor.execute(f'ALTER TABLE {table} DROP INDEX {index}')
+            cursor.execute(f'ALTER TABLE {table} RENAME INDEX {building} TO {index}')
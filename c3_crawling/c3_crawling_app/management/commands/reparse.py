@@ -0,0 +1,136 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from bs4 import BeautifulSoup
+from c3_crawling_app.crawling import musinsa, oliveyoung, zigzag
+from c3_crawling_app.crawling.archive import archive_directory, read_index, read_page
+from c3_crawling_app.crawling.dom_extract import extract_cards_from_html
+from c3_crawling_app.crawling.logs import set_site
+from c3_crawling_app.crawling.price_cache import PriceCache
+from c3_crawling_app.crawling.prices import parse_price
+from c3_crawling_app.crawling.snapshot import CatalogueSnapshot
+from c3_crawling_app.crawling.writer import ProductWriter, format_counts
+from datetime import date, timedelta
+import multiprocessing
+import logging
+import os
+
+# 사이트별 저장 테이블과 카드/상세 가격 선택자 (올리브영 목록은 oliveyoung.parse_listing 으로 읽는다)
+SITES = {
+    'oliveyoung': {'table': 'oycosmetic'},
+    'zigzag': {
+        'table': 'zzcosmetic',
+        'module': zigzag,
+    },
+    'musinsa': {
+        'table': 'msscosmetic',
+        'module': musinsa,
+    },
+}
+
+
+def parse_entry(task):
+    """보관된 페이지 하나를 파싱한다. 워커 프로세스에서 돌아서 네트워크도 DB 도 쓰지 않는다."""
+    site, directory, entry = task
+    try:
+        html = read_page(directory, entry)
+        if site == 'oliveyoung':
+            products, _ = oliveyoung.parse_listing(html, entry['category'], entry['url'])
+            return entry['kind'], products
+
+        module = SITES[site]['module']
+        soup = BeautifulSoup(html, oliveyoung.HTML_PARSER)
+        if entry['kind'] == 'detail':
+            # 상세 페이지는 (URL, 정가) 하나를 돌려준다. 정가가 없으면 None
+            for selector in module.PRICE_SELECTORS:
+                node = soup.select_one(selector)
+                price = parse_price(node.get_text()) if node is not None else None
+                if price:
+                    return entry['kind'], (entry['url'], price)
+            return entry['kind'], (entry['url'], None)
+
+        cards = extract_cards_from_html(soup, module.CARD_SELECTOR, module.SCRIPT_FIELDS, entry['url'])
+        return entry['kind'], [module.product_from_card(card, entry['category']) for card in cards]
+    except Exception as e:
+        logging.error(f"보관 페이지 파싱 중 오류 ({entry['file']}@{entry['offset']} {entry['url']}): {str(e)}")
+        return entry['kind'], None
+
+
+class Command(BaseCommand):
+    help = '보관해 둔 원본 HTML 을 다시 파싱해서 저장 (네트워크/브라우저 없이)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--site', choices=sorted(SITES), required=True, help='다시 파싱할 사이트')
+        parser.add_argument('--archive-dir', required=True, help='크롤링 때 --archive-dir 로 준 디렉터리')
+        parser.add_argument(
+            '--date', type=date.fromisoformat,
+            help='보관 날짜 (YYYY-MM-DD, 기본값 오늘). 저장할 때의 날짜로도 쓴다'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='파싱 프로세스 수 (기본값 CPU 수)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='한 트랜잭션으로 묶어 저장할 최대 상품 수'
+        )
+        parser.add_argument(
+            '--price-cache-ttl', type=float, default=168,
+            help='보관된 상세 페이지가 없는 상품에 쓸 정가 캐시의 유효 시간(시간)'
+        )
+
+    def handle(self, *args, **options):
+        site = options['site']
+        set_site(site)
+        day = options['date'] or timezone.now().date()
+        directory = archive_directory(options['archive_dir'], site, day)
+        entries = read_index(directory)
+        if not entries:
+            raise CommandError(f'보관된 페이지가 없습니다: {directory}')
+
+        list_prices, products = self.parse_entries(site, directory, entries, options['workers'])
+        logging.info(f'{site} {day} 보관 페이지 {len(entries)}개 파싱: 상품 {len(products)}개')
+
+        snapshot = CatalogueSnapshot.load(SITES[site]['table'])
+        # 정가는 보관된 상세 페이지 → 정가 캐시 → 지난번 저장한 정가 순으로 찾는다. 판매가로 채우지 않는다
+        price_cache = PriceCache.load(site, timedelta(hours=options['price_cache_ttl']))
+        with ProductWriter(SITES[site]['table'], day, batch_size=options['batch_size'], snapshot=snapshot) as writer:
+            for product_data in products.values():
+                if 'price' not in product_data:
+                    product_data['price'] = self.list_price(product_data, list_prices, price_cache, writer)
+                writer.add(product_data)
+        self.stdout.write(self.style.SUCCESS(f'다시 파싱 완료 ({format_counts(writer.counts())})'))
+
+    def list_price(self, product_data, list_prices, price_cache, writer):
+        url = product_data['cosmetic_url']
+        price = list_prices.get(url)
+        if price is None:
+            price = price_cache.get(url, product_data['sale_price'])
+        if price is None:
+            price = writer.known_price(url)
+        return price
+
+    def parse_entries(self, site, directory, entries, workers):
+        """상세 페이지의 (URL → 정가)와 URL 로 중복을 없앤 상품 목록을 돌려준다.
+
+        스크롤 목록은 스크롤마다 누적 HTML 을 남기므로 같은 상품이 여러 번 나온다. 나중 것이 이긴다.
+        """
+        tasks = [(site, str(directory), entry) for entry in entries]
+        list_prices = {}
+        products = {}
+
+        # 자식 프로세스가 부모의 DB 연결을 물려받지 않도록 먼저 닫는다
+        connections.close_all()
+        with multiprocessing.Pool(max(1, workers)) as pool:
+            for kind, result in pool.imap(parse_entry, tasks, chunksize=8):
+                if result is None:
+                    continue
+                if kind == 'detail':
+                    url, price = result
+                    if price:
+                        list_prices[url] = price
+                    continue
+                for product_data in result:
+                    if product_data:
+                        products[product_data['cosmetic_url']] = product_data
+        return list_prices, products
@@ -0,0 +1,221 @@
+# Generated by Django 4.2 on 2026-10-18 11:02
+
+import hashlib
+import logging
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import migrations, models, transaction
+
+
+PRODUCT_MODELS = ('Oycosmetic', 'Zzcosmetic', 'Msscosmetic')
+SITES = {'Oycosmetic': 'oliveyoung', 'Zzcosmetic': 'zigzag', 'Msscosmetic': 'musinsa'}
+
+# 이 마이그레이션을 만들 때의 crawling.identity URL 정규화 규칙을 그대로 옮겨 둔다.
+# 크롤러 쪽 규칙이 바뀌어도 새 DB 에서 이 마이그레이션이 만드는 url_hash 는 달라지지 않는다.
+TRACKING_PARAMS = {
+    'trackingCd', 'curation', 'egcode', 'egrankcode', 'rccode',
+    'gclid', 'fbclid', 'NaPm', 'ref', 'referrer', 'source',
+}
+TRACKING_PREFIXES = ('utm_', 't_')
+IDENTITY_PARAMS = {
+    '/store/goods/getGoodsDetail.do': {'goodsNo'},
+}
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def create_missing_tables(apps, schema_editor):
+    # 운영 DB에는 크롤러가 쓰던 테이블이 이미 있으므로 없는 경우(새 DB)에만 만든다
+    existing = schema_editor.connection.introspection.table_names()
+    for model_name in PRODUCT_MODELS:
+        model = apps.get_model('c3_crawling_app', model_name)
+        if model._meta.db_table not in existing:
+            schema_editor.create_model(model)
+
+
+def rename_sale_price_column(apps, schema_editor):
+    # 크롤러는 처음부터 sale_price 컬럼에 써 왔고, 모델만 sale_price_price 로 잘못 선언돼 있었다.
+    # 모델 선언대로 만들어진 테이블(새 DB)만 컬럼 이름을 바꾸고, 운영 테이블은 그대로 둔다
+    model = apps.get_model('c3_crawling_app', 'Oycosmetic')
+    with schema_editor.connection.cursor() as cursor:
+        columns = {
+            column.name
+            for column in schema_editor.connection.introspection.get_table_description(cursor, model._meta.db_table)
+        }
+    if 'sale_price_price' in columns and 'sale_price' not in columns:
+        old_field = model._meta.get_field('sale_price_price')
+        new_field = old_field.clone()
+        new_field.set_attributes_from_name('sale_price')
+        schema_editor.alter_field(model, old_field, new_field)
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    keep = IDENTITY_PARAMS.get(path)
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if (key in keep if keep is not None else
+            key not in TRACKING_PARAMS and not key.startswith(TRACKING_PREFIXES))
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def url_hash(url):
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+def model_with_field(apps, model_name, field_name):
+    # 이 함수는 0016 에서도 부르므로, 그 시점 상태에만 있는 모델/컬럼은 있을 때만 쓴다
+    try:
+        model = apps.get_model('c3_crawling_app', model_name)
+        model._meta.get_field(field_name)
+    except (LookupError, FieldDoesNotExist):
+        return None
+    return model
+
+
+def merge_duplicates(apps, model_name, duplicates):
+    """duplicates: {지울 상품 id: 남길 상품 id}. 지울 상품을 가리키던 행을 정리하고 상품을 지운다.
+
+    사이트별 이력/매칭/이미지는 다음 크롤링과 match_products, mirror_images 가 남길 상품으로 다시 쌓는다.
+    랭킹과 매칭의 올리브영 상품 id 는 남길 상품으로 옮긴다.
+    """
+    site = SITES[model_name]
+    for related_name in ('PriceHistory', 'ProductMatch', 'ProductImage'):
+        related = model_with_field(apps, related_name, 'product_id')
+        if related is not None:
+            related.objects.filter(site=site, product_id__in=list(duplicates)).delete()
+    if model_name == 'Oycosmetic':
+        for related_name in ('ProductMatch', 'Ranking', 'RankingStaging', 'RankingHistory'):
+            related = model_with_field(apps, related_name, 'oy_product_id')
+            if related is None:
+                continue
+            for duplicate_id, kept_id in duplicates.items():
+                related.objects.filter(oy_product_id=duplicate_id).update(oy_product_id=kept_id)
+    apps.get_model('c3_crawling_app', model_name).objects.filter(id__in=list(duplicates)).delete()
+
+
+def fill_missing_url_hashes(apps, schema_editor, chunk_size=1000):
+    """비어 있는 url_hash 를 PK 범위로 잘라 채운다.
+
+    정규화한 URL 이 겹치는 상품은 url_hash 가 이미 있는 상품(크롤러가 갱신하는 행)을, 없으면 id 가
+    가장 작은 상품을 남기고 나머지는 지운다. 비워 두면 크롤러가 못 보고 같은 상품을 또 넣기 때문이다.
+    """
+    for model_name in PRODUCT_MODELS:
+        model = apps.get_model('c3_crawling_app', model_name)
+        last_id = 0
+        while True:
+            rows = list(
+                model.objects
+                .filter(id__gt=last_id, url_hash__isnull=True)
+                .order_by('id')
+                .values_list('id', 'cosmetic_url')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            groups = {}
+            for product_id, cosmetic_url in rows:
+                groups.setdefault(url_hash(cosmetic_url), []).append(product_id)
+            taken = dict(model.objects.filter(url_hash__in=list(groups)).values_list('url_hash', 'id'))
+            updates = []
+            duplicates = {}
+            for key, product_ids in groups.items():
+                kept_id = taken.get(key)
+                if kept_id is None:
+                    kept_id, *product_ids = product_ids
+                    updates.append(model(id=kept_id, url_hash=key))
+                duplicates.update({product_id: kept_id for product_id in product_ids})
+
+            with transaction.atomic():
+                model.objects.bulk_update(updates, ['url_hash'])
+                if duplicates:
+                    logging.warning(
+                        f'{model._meta.db_table}: 정규화 URL 이 겹치는 상품 {len(duplicates)}건 삭제 '
+                        f'(지운 id → 남긴 id: {duplicates})'
+                    )
+                    merge_duplicates(apps, model_name, duplicates)
+
+
+def product_fields(date_field, sale_price='sale_price'):
+    return [
+        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+        ('category', models.CharField(max_length=255)),
+        ('brand', models.CharField(max_length=255)),
+        ('cosmetic_name', models.CharField(max_length=255)),
+        ('price', models.CharField(max_length=255)),
+        (sale_price, models.CharField(max_length=255)),
+        ('cosmetic_url', models.TextField()),
+        ('image_url', models.TextField()),
+        ('created_at', date_field(auto_now_add=True)),
+        ('updated_at', date_field(auto_now=True)),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0003_alter_ranking_brand_alter_ranking_cosmetic_name_and_more'),
+    ]
+
+    operations = [
+        # 크롤러가 만든 기존 테이블을 마이그레이션 상태에만 등록한다
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Oycosmetic',
+                    fields=product_fields(models.DateTimeField, sale_price='sale_price_price'),
+                    options={'db_table': 'oycosmetic'},
+                ),
+                migrations.CreateModel(
+                    name='Zzcosmetic',
+                    fields=product_fields(models.DateField),
+                    options={'db_table': 'zzcosmetic'},
+                ),
+                migrations.CreateModel(
+                    name='Msscosmetic',
+                    fields=product_fields(models.DateField),
+                    options={'db_table': 'msscosmetic'},
+                ),
+            ],
+        ),
+        migrations.RunPython(create_missing_tables, migrations.RunPython.noop),
+        # Oycosmetic.sale_price_price → sale_price. 실제 컬럼 이름에 맞추는 별도 단계
+        migrations.RunPython(rename_sale_price_column, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='oycosmetic',
+                    old_name='sale_price_price',
+                    new_name='sale_price',
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='oycosmetic',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=40, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='zzcosmetic',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=40, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='msscosmetic',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=40, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_missing_url_hashes, migrations.RunPython.noop),
+]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0004_product_tables_url_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetailPriceCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(db_index=True, max_length=20)),
+                ('url_hash', models.CharField(max_length=40, unique=True)),
+                ('list_price', models.CharField(max_length=255)),
+                ('sale_price', models.CharField(max_length=255)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'detail_price_cache',
+            },
+        ),
+    ]
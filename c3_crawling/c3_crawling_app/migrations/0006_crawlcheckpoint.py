@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0005_detailpricecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(max_length=20)),
+                ('run_id', models.CharField(max_length=20)),
+                ('category_code', models.CharField(max_length=20)),
+                ('category', models.CharField(max_length=255)),
+                ('last_page', models.IntegerField(default=0)),
+                ('processed_keys', models.TextField(blank=True, default='')),
+                ('completed', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'crawl_checkpoint',
+                'unique_together': {('site', 'run_id', 'category_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0006_crawlcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(max_length=20)),
+                ('product_id', models.IntegerField()),
+                ('day', models.DateField()),
+                ('price', models.PositiveIntegerField(null=True)),
+                ('sale_price', models.PositiveIntegerField(null=True)),
+            ],
+            options={
+                'db_table': 'price_history',
+                'unique_together': {('site', 'product_id', 'day')},
+            },
+        ),
+    ]
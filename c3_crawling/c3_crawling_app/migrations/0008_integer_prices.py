@@ -0,0 +1,143 @@
+# Generated by Django 4.2 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+# 모델별 {정수 가격 필드: 원래 문자열 컬럼}. 정수 컬럼(<이름>_value)을 옆에 만들어 채운 뒤 바꿔 끼운다.
+PRICE_FIELDS = {
+    'Oycosmetic': {'price': 'price', 'sale_price': 'sale_price'},
+    'Zzcosmetic': {'price': 'price', 'sale_price': 'sale_price'},
+    'Msscosmetic': {'price': 'price', 'sale_price': 'sale_price'},
+    'Ranking': {'price': 'price', 'oy_price': 'oy_price', 'zz_price': 'zz_price'},
+    'DetailPriceCache': {'list_price': 'list_price', 'sale_price': 'sale_price'},
+}
+NULLABLE_SOURCES = {('Ranking', 'price'), ('Ranking', 'zz_price')}
+PRODUCT_MODELS = ('Oycosmetic', 'Zzcosmetic', 'Msscosmetic')
+CHUNK_SIZE = 2000
+
+
+def parse_price(text):
+    digits = ''.join(filter(str.isdigit, text or ''))
+    return int(digits) if digits else None
+
+
+def discount_rate(price, sale_price):
+    if not price or sale_price is None:
+        return None
+    return max(0, (price - sale_price) * 100 // price)
+
+
+def chunks(model, fields):
+    # PK 순서로 끊어 읽어서 큰 테이블도 메모리에 다 올리지 않는다
+    last_id = 0
+    while True:
+        rows = list(model.objects.filter(id__gt=last_id).order_by('id').only('id', *fields)[:CHUNK_SIZE])
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def parse_prices(apps, schema_editor):
+    for model_name, fields in PRICE_FIELDS.items():
+        model = apps.get_model('c3_crawling_app', model_name)
+        update_fields = [f'{name}_value' for name in fields]
+        if model_name in PRODUCT_MODELS:
+            update_fields.append('discount_rate')
+        for rows in chunks(model, fields.values()):
+            for row in rows:
+                for name, source in fields.items():
+                    setattr(row, f'{name}_value', parse_price(getattr(row, source)))
+                if model_name in PRODUCT_MODELS:
+                    row.discount_rate = discount_rate(row.price_value, row.sale_price_value)
+                if model_name == 'Ranking':
+                    # 모델의 sale_price 는 마이그레이션 상태에 없던 필드다. 크롤러가 oy_price 에 쓰던 올리브영 판매가로 채운다
+                    row.sale_price = row.oy_price_value
+            model.objects.bulk_update(rows, update_fields + (['sale_price'] if model_name == 'Ranking' else []))
+
+
+def format_prices(apps, schema_editor):
+    for model_name, fields in PRICE_FIELDS.items():
+        model = apps.get_model('c3_crawling_app', model_name)
+        for rows in chunks(model, [f'{name}_value' for name in fields]):
+            for row in rows:
+                for name, source in fields.items():
+                    value = getattr(row, f'{name}_value')
+                    if value is not None:
+                        value = str(value)
+                    elif (model_name, source) not in NULLABLE_SOURCES:
+                        value = ''
+                    setattr(row, source, value)
+            model.objects.bulk_update(rows, list(fields.values()))
+
+
+def add_value_fields():
+    return [
+        migrations.AddField(
+            model_name=model_name.lower(),
+            name=f'{name}_value',
+            field=models.PositiveIntegerField(null=True),
+        )
+        for model_name, fields in PRICE_FIELDS.items()
+        for name in fields
+    ]
+
+
+def swap_value_fields():
+    operations = []
+    for model_name, fields in PRICE_FIELDS.items():
+        for name, source in fields.items():
+            if (model_name, source) not in NULLABLE_SOURCES:
+                # 되돌릴 때 NOT NULL 문자열 컬럼을 다시 만들 수 있도록 지우기 전에 기본값을 준다
+                operations.append(migrations.AlterField(
+                    model_name=model_name.lower(),
+                    name=source,
+                    field=models.CharField(max_length=255, default=''),
+                ))
+            operations.extend([
+                migrations.RemoveField(model_name=model_name.lower(), name=source),
+                migrations.RenameField(model_name=model_name.lower(), old_name=f'{name}_value', new_name=name),
+            ])
+    return operations
+
+
+def add_discount_indexes(model_name, prefix):
+    return [
+        migrations.AddIndex(
+            model_name=model_name,
+            index=models.Index(fields=['category', 'sale_price'], name=f'{prefix}_category_sale_price'),
+        ),
+        migrations.AddIndex(
+            model_name=model_name,
+            index=models.Index(fields=['category', 'discount_rate'], name=f'{prefix}_category_discount'),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0007_pricehistory'),
+    ]
+
+    operations = [
+        *add_value_fields(),
+        *[
+            migrations.AddField(
+                model_name=model_name.lower(),
+                name='discount_rate',
+                field=models.PositiveSmallIntegerField(null=True),
+            )
+            for model_name in PRODUCT_MODELS
+        ],
+        migrations.AddField(
+            model_name='ranking',
+            name='sale_price',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(parse_prices, format_prices),
+        *swap_value_fields(),
+        *add_discount_indexes('oycosmetic', 'oy'),
+        *add_discount_indexes('zzcosmetic', 'zz'),
+        *add_discount_indexes('msscosmetic', 'mss'),
+    ]
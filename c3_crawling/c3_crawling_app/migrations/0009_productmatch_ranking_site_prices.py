@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0008_integer_prices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ranking',
+            name='oy_product_id',
+            field=models.IntegerField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ranking',
+            name='mss_price',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='ranking',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ProductMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(max_length=20)),
+                ('product_id', models.IntegerField()),
+                ('oy_product_id', models.IntegerField(null=True)),
+                ('score', models.FloatField(null=True)),
+                ('matched_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'product_match',
+                'unique_together': {('site', 'product_id')},
+                'indexes': [models.Index(fields=['oy_product_id'], name='product_match_oy_product')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MatchState',
+            fields=[
+                ('site', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('last_oy_product_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'match_state',
+            },
+        ),
+    ]
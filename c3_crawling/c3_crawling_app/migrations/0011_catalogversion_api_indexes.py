@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0010_ranking_snapshot_staging'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('scope', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'catalog_version',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='msscosmetic',
+            index=models.Index(fields=['category', 'id'], name='mss_category_id'),
+        ),
+        migrations.AddIndex(
+            model_name='msscosmetic',
+            index=models.Index(fields=['brand', 'id'], name='mss_brand_id'),
+        ),
+        migrations.AddIndex(
+            model_name='oycosmetic',
+            index=models.Index(fields=['category', 'id'], name='oy_category_id'),
+        ),
+        migrations.AddIndex(
+            model_name='oycosmetic',
+            index=models.Index(fields=['brand', 'id'], name='oy_brand_id'),
+        ),
+        migrations.AddIndex(
+            model_name='zzcosmetic',
+            index=models.Index(fields=['category', 'id'], name='zz_category_id'),
+        ),
+        migrations.AddIndex(
+            model_name='zzcosmetic',
+            index=models.Index(fields=['brand', 'id'], name='zz_brand_id'),
+        ),
+    ]
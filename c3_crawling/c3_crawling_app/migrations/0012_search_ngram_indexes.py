@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 17:05
+
+from django.db import migrations
+
+# 상품명/브랜드 검색용 FULLTEXT ngram 인덱스 (MySQL 전용, ngram_token_size 기본값 2 기준).
+# Django 모델로는 표현할 수 없어 SQL 로만 만들고 마이그레이션 상태는 바꾸지 않는다.
+SEARCH_INDEXES = {
+    'oycosmetic': 'oy_search_ngram',
+    'zzcosmetic': 'zz_search_ngram',
+    'msscosmetic': 'mss_search_ngram',
+}
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, index in SEARCH_INDEXES.items():
+        schema_editor.execute(
+            f'ALTER TABLE {table} ADD FULLTEXT INDEX {index} (brand, cosmetic_name) WITH PARSER ngram'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, index in SEARCH_INDEXES.items():
+        schema_editor.execute(f'ALTER TABLE {table} DROP INDEX {index}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0011_catalogversion_api_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, drop_search_indexes),
+    ]
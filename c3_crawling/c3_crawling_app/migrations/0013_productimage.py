@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0012_search_ngram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(max_length=20)),
+                ('product_id', models.IntegerField()),
+                ('image_url', models.TextField()),
+                ('image_url_hash', models.CharField(max_length=40)),
+                ('sha256', models.CharField(max_length=64, null=True)),
+                ('content_type', models.CharField(default='', max_length=100)),
+                ('size', models.PositiveIntegerField(null=True)),
+                ('etag', models.CharField(default='', max_length=255)),
+                ('last_modified', models.CharField(default='', max_length=64)),
+                ('status', models.PositiveSmallIntegerField(null=True)),
+                ('fetched_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'product_image',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='productimage',
+            index=models.Index(fields=['image_url_hash'], name='product_image_url_hash'),
+        ),
+        migrations.AddIndex(
+            model_name='productimage',
+            index=models.Index(fields=['sha256'], name='product_image_sha256'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productimage',
+            unique_together={('site', 'product_id')},
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0013_productimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(max_length=20)),
+                ('category_code', models.CharField(max_length=20)),
+                ('page', models.PositiveIntegerField()),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('card_count', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'listing_fingerprint',
+                'unique_together': {('site', 'category_code', 'page')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0014_listingfingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField(null=True)),
+                ('category', models.CharField(default='', max_length=255)),
+                ('rank', models.PositiveSmallIntegerField(null=True)),
+                ('brand', models.CharField(max_length=255)),
+                ('cosmetic_name', models.CharField(max_length=255)),
+                ('price', models.PositiveIntegerField(null=True)),
+                ('sale_price', models.PositiveIntegerField(null=True)),
+                ('cosmetic_url', models.TextField()),
+                ('image_url', models.TextField()),
+                ('oy_product_id', models.IntegerField(db_index=True, null=True)),
+                ('oy_price', models.PositiveIntegerField(null=True)),
+                ('zz_price', models.PositiveIntegerField(null=True)),
+                ('mss_price', models.PositiveIntegerField(null=True)),
+                ('lowest_price', models.PositiveIntegerField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+            ],
+            options={
+                'db_table': 'ranking_history',
+                'abstract': False,
+                'unique_together': {('snapshot_date', 'category', 'rank')},
+            },
+        ),
+    ]
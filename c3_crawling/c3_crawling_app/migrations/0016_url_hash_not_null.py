@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-18 19:40
+
+import importlib
+
+from django.db import migrations, models
+
+# 0004 가 url_hash 를 채우기 전에 적용된 DB 에는 빈 url_hash 와 겹치는 상품이 남아 있을 수 있다.
+# 그때의 정규화 규칙으로 채우고 겹치는 상품을 정리하는 0004 의 함수를 다시 부른 뒤 NOT NULL 로 바꾼다.
+url_hash_migration = importlib.import_module('c3_crawling_app.migrations.0004_product_tables_url_hash')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0015_rankinghistory'),
+    ]
+
+    operations = [
+        migrations.RunPython(url_hash_migration.fill_missing_url_hashes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='oycosmetic',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=40, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='zzcosmetic',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=40, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='msscosmetic',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=40, unique=True),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('c3_crawling_app', '0016_url_hash_not_null'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='msscosmetic',
+            index=models.Index(fields=['sale_price', 'id'], name='mss_sale_price_id'),
+        ),
+        migrations.AddIndex(
+            model_name='msscosmetic',
+            index=models.Index(fields=['discount_rate', 'id'], name='mss_discount_id'),
+        ),
+        migrations.AddIndex(
+            model_name='msscosmetic',
+            index=models.Index(fields=['brand', 'sale_price', 'id'], name='mss_brand_sale_price'),
+        ),
+        migrations.AddIndex(
+            model_name='msscosmetic',
+            index=models.Index(fields=['brand', 'discount_rate', 'id'], name='mss_brand_discount'),
+        ),
+        migrations.AddIndex(
+            model_name='oycosmetic',
+            index=models.Index(fields=['sale_price', 'id'], name='oy_sale_price_id'),
+        ),
+        migrations.AddIndex(
+            model_name='oycosmetic',
+            index=models.Index(fields=['discount_rate', 'id'], name='oy_discount_id'),
+        ),
+        migrations.AddIndex(
+            model_name='oycosmetic',
+            index=models.Index(fields=['brand', 'sale_price', 'id'], name='oy_brand_sale_price'),
+        ),
+        migrations.AddIndex(
+            model_name='oycosmetic',
+            index=models.Index(fields=['brand', 'discount_rate', 'id'], name='oy_brand_discount'),
+        ),
+        migrations.AddIndex(
+            model_name='zzcosmetic',
+            index=models.Index(fields=['sale_price', 'id'], name='zz_sale_price_id'),
+        ),
+        migrations.AddIndex(
+            model_name='zzcosmetic',
+            index=models.Index(fields=['discount_rate', 'id'], name='zz_discount_id'),
+        ),
+        migrations.AddIndex(
+            model_name='zzcosmetic',
+            index=models.Index(fields=['brand', 'sale_price', 'id'], name='zz_brand_sale_price'),
+        ),
+        migrations.AddIndex(
+            model_name='zzcosmetic',
+            index=models.Index(fields=['brand', 'discount_rate', 'id'], name='zz_brand_discount'),
+        ),
+    ]
@@ -1,50 +1,286 @@
 from django.db import models
+from c3_crawling_app.crawling import identity
 
-class Ranking(models.Model):
+class RankingRow(models.Model):
+    """올리브영 판매 랭킹 스냅샷 한 행. ranking 과 ranking_staging 이 같은 컬럼을 쓴다."""
+    snapshot_date = models.DateField(null=True)  # 랭킹을 수집한 날
+    category = models.CharField(max_length=255, default='')  # 랭킹 대분류 ('전체', '스킨케어' ...)
+    rank = models.PositiveSmallIntegerField(null=True)  # 대분류 안의 순위 (1부터)
     brand = models.CharField(max_length=255)
     cosmetic_name = models.CharField(max_length=255)
-    price = models.CharField(max_length=255)
-    sale_price = models.CharField(max_length=255)
+    price = models.PositiveIntegerField(null=True)  # 정가 (원)
+    sale_price = models.PositiveIntegerField(null=True)  # 올리브영 판매가 (원)
     cosmetic_url = models.TextField()  # URL이 길 수 있으므로 TextField 사용
     image_url = models.TextField()  # URL이 길 수 있으므로 TextField 사용
+    # 올리브영 상품 테이블의 id 와 사이트별 판매가. 다른 사이트 가격은 product_match 로 채운다
+    oy_product_id = models.IntegerField(null=True, db_index=True)
+    oy_price = models.PositiveIntegerField(null=True)
+    zz_price = models.PositiveIntegerField(null=True)
+    mss_price = models.PositiveIntegerField(null=True)
+    lowest_price = models.PositiveIntegerField(null=True)  # 사이트별 판매가 중 최저가 (원)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
 
     class Meta:
-        db_table = 'ranking'
+        abstract = True
+        unique_together = [('category', 'rank')]
 
     def __str__(self):
         return f"{self.brand} - {self.cosmetic_name}"
 
 
-class Oycosmetic(models.Model):
+class Ranking(RankingRow):
+    class Meta(RankingRow.Meta):
+        db_table = 'ranking'
+
+
+class RankingStaging(RankingRow):
+    # oy_ranking 이 새 스냅샷을 채운 뒤 ranking 과 테이블 이름을 맞바꾼다
+    class Meta(RankingRow.Meta):
+        db_table = 'ranking_staging'
+
+
+class RankingHistory(RankingRow):
+    # 날짜별 랭킹 스냅샷. publish_snapshot 이 ranking 을 바꿔 끼울 때 그날 그 대분류의 행을 새로 쓴다
+    class Meta(RankingRow.Meta):
+        db_table = 'ranking_history'
+        unique_together = [('snapshot_date', 'category', 'rank')]
+
+
+class ProductIdentity:
+    """상품 테이블 공통. ORM 으로 저장할 때 url_hash 가 비어 있으면 cosmetic_url 로 채운다 (ProductWriter 는 직접 넣는다)."""
+
+    def save(self, *args, **kwargs):
+        if not self.url_hash:
+            self.url_hash = identity.url_hash(self.cosmetic_url)
+        super().save(*args, **kwargs)
+
+
+class Oycosmetic(ProductIdentity, models.Model):
     category = models.CharField(max_length=255)
     brand = models.CharField(max_length=255)
     cosmetic_name = models.CharField(max_length=255)
-    price = models.CharField(max_length=255)
-    sale_price_price = models.CharField(max_length=255)
+    price = models.PositiveIntegerField(null=True)  # 정가 (원)
+    sale_price = models.PositiveIntegerField(null=True)  # 판매가 (원)
+    discount_rate = models.PositiveSmallIntegerField(null=True)  # 정가 대비 할인율(%), 저장할 때 계산
     cosmetic_url = models.TextField()  # URL이 길 수 있으므로 TextField 사용
+    url_hash = models.CharField(max_length=40, unique=True, editable=False)  # 정규화한 URL의 SHA-1
     image_url = models.TextField()  # URL이 길 수 있으므로 TextField 사용
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'oycosmetic'
+        # 카테고리 안에서 최저가/할인율 순 정렬과 범위 조회가 인덱스만 타도록
+        indexes = [
+            models.Index(fields=['category', 'sale_price'], name='oy_category_sale_price'),
+            models.Index(fields=['category', 'discount_rate'], name='oy_category_discount'),
+            # API 목록의 기본 정렬(id)을 카테고리/브랜드 안에서 인덱스 순서대로 읽는다
+            models.Index(fields=['category', 'id'], name='oy_category_id'),
+            models.Index(fields=['brand', 'id'], name='oy_brand_id'),
+            # 카테고리 없이, 또는 브랜드로 거른 목록을 가격/할인율 순으로 읽을 때
+            models.Index(fields=['sale_price', 'id'], name='oy_sale_price_id'),
+            models.Index(fields=['discount_rate', 'id'], name='oy_discount_id'),
+            models.Index(fields=['brand', 'sale_price', 'id'], name='oy_brand_sale_price'),
+            models.Index(fields=['brand', 'discount_rate', 'id'], name='oy_brand_discount'),
+        ]
 
     def __str__(self):
         return f"{self.brand} - {self.cosmetic_name}"
     
-class Zzcosmetic(models.Model):
+class Zzcosmetic(ProductIdentity, models.Model):
     category = models.CharField(max_length=255)
     brand = models.CharField(max_length=255)
     cosmetic_name = models.CharField(max_length=255)
-    price = models.CharField(max_length=255)
-    sale_price = models.CharField(max_length=255)
+    price = models.PositiveIntegerField(null=True)  # 정가 (원)
+    sale_price = models.PositiveIntegerField(null=True)  # 판매가 (원)
+    discount_rate = models.PositiveSmallIntegerField(null=True)  # 정가 대비 할인율(%), 저장할 때 계산
     cosmetic_url = models.TextField()
+    url_hash = models.CharField(max_length=40, unique=True, editable=False)
     image_url = models.TextField()
     created_at = models.DateField(auto_now_add=True)
     updated_at = models.DateField(auto_now=True)
 
     class Meta:
         db_table = 'zzcosmetic'
+        # 카테고리 안에서 최저가/할인율 순 정렬과 범위 조회가 인덱스만 타도록
+        indexes = [
+            models.Index(fields=['category', 'sale_price'], name='zz_category_sale_price'),
+            models.Index(fields=['category', 'discount_rate'], name='zz_category_discount'),
+            # API 목록의 기본 정렬(id)을 카테고리/브랜드 안에서 인덱스 순서대로 읽는다
+            models.Index(fields=['category', 'id'], name='zz_category_id'),
+            models.Index(fields=['brand', 'id'], name='zz_brand_id'),
+            # 카테고리 없이, 또는 브랜드로 거른 목록을 가격/할인율 순으로 읽을 때
+            models.Index(fields=['sale_price', 'id'], name='zz_sale_price_id'),
+            models.Index(fields=['discount_rate', 'id'], name='zz_discount_id'),
+            models.Index(fields=['brand', 'sale_price', 'id'], name='zz_brand_sale_price'),
+            models.Index(fields=['brand', 'discount_rate', 'id'], name='zz_brand_discount'),
+        ]
+
+    def __str__(self):
+        return f"{self.brand} - {self.cosmetic_name}"
+
+
+class Msscosmetic(ProductIdentity, models.Model):
+    category = models.CharField(max_length=255)
+    brand = models.CharField(max_length=255)
+    cosmetic_name = models.CharField(max_length=255)
+    price = models.PositiveIntegerField(null=True)  # 정가 (원)
+    sale_price = models.PositiveIntegerField(null=True)  # 판매가 (원)
+    discount_rate = models.PositiveSmallIntegerField(null=True)  # 정가 대비 할인율(%), 저장할 때 계산
+    cosmetic_url = models.TextField()
+    url_hash = models.CharField(max_length=40, unique=True, editable=False)
+    image_url = models.TextField()
+    created_at = models.DateField(auto_now_add=True)
+    updated_at = models.DateField(auto_now=True)
+
+    class Meta:
+        db_table = 'msscosmetic'
+        # 카테고리 안에서 최저가/할인율 순 정렬과 범위 조회가 인덱스만 타도록
+        indexes = [
+            models.Index(fields=['category', 'sale_price'], name='mss_category_sale_price'),
+            models.Index(fields=['category', 'discount_rate'], name='mss_category_discount'),
+            # API 목록의 기본 정렬(id)을 카테고리/브랜드 안에서 인덱스 순서대로 읽는다
+            models.Index(fields=['category', 'id'], name='mss_category_id'),
+            models.Index(fields=['brand', 'id'], name='mss_brand_id'),
+            # 카테고리 없이, 또는 브랜드로 거른 목록을 가격/할인율 순으로 읽을 때
+            models.Index(fields=['sale_price', 'id'], name='mss_sale_price_id'),
+            models.Index(fields=['discount_rate', 'id'], name='mss_discount_id'),
+            models.Index(fields=['brand', 'sale_price', 'id'], name='mss_brand_sale_price'),
+            models.Index(fields=['brand', 'discount_rate', 'id'], name='mss_brand_discount'),
+        ]
+
+    def __str__(self):
+        return f"{self.brand} - {self.cosmetic_name}"
+
+
+class DetailPriceCache(models.Model):
+    site = models.CharField(max_length=20, db_index=True)
+    url_hash = models.CharField(max_length=40, unique=True)
+    list_price = models.PositiveIntegerField(null=True)  # 상세 페이지의 정가
+    sale_price = models.PositiveIntegerField(null=True)  # 정가를 읽을 당시 목록의 판매가
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'detail_price_cache'
+
+    def __str__(self):
+        return f"{self.site} - {self.url_hash}"
+
+
+class CrawlCheckpoint(models.Model):
+    site = models.CharField(max_length=20)
+    run_id = models.CharField(max_length=20)  # 실행 시작 시각 (YYYYMMDD-HHMMSS.mmm)
+    category_code = models.CharField(max_length=20)
+    category = models.CharField(max_length=255)
+    last_page = models.IntegerField(default=0)  # 올리브영은 마지막으로 저장한 페이지, 스크롤 사이트는 스크롤 횟수
+    processed_keys = models.TextField(blank=True, default='')  # 저장까지 끝난 상품 url_hash 앞 16자리, 쉼표 구분
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'crawl_checkpoint'
+        unique_together = ('site', 'run_id', 'category_code')
+
+    def __str__(self):
+        return f"{self.site} {self.run_id} - {self.category_code}"
+
+
+class ListingFingerprint(models.Model):
+    site = models.CharField(max_length=20)
+    category_code = models.CharField(max_length=20)
+    page = models.PositiveIntegerField()
+    fingerprint = models.CharField(max_length=40)  # 카드별 상품 키/브랜드/상품명/가격과 다음 페이지 여부의 SHA-1
+    card_count = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)  # 지문이 마지막으로 바뀐 시각
+
+    class Meta:
+        db_table = 'listing_fingerprint'
+        unique_together = ('site', 'category_code', 'page')
+
+    def __str__(self):
+        return f"{self.site} {self.category_code} p{self.page}"
+
+
+class PriceHistory(models.Model):
+    site = models.CharField(max_length=20)
+    product_id = models.IntegerField()  # 사이트별 상품 테이블의 id
+    day = models.DateField()
+    price = models.PositiveIntegerField(null=True)  # 정가 (원)
+    sale_price = models.PositiveIntegerField(null=True)  # 판매가 (원)
+
+    class Meta:
+        db_table = 'price_history'
+        # 가격이 바뀐 날만 한 행씩 쌓인다. 상품별 기간 조회가 이 인덱스 범위만 읽는다.
+        unique_together = ('site', 'product_id', 'day')
+
+    def __str__(self):
+        return f"{self.site} {self.product_id} - {self.day}"
+
+
+class ProductMatch(models.Model):
+    site = models.CharField(max_length=20)
+    product_id = models.IntegerField()  # 사이트별 상품 테이블의 id
+    oy_product_id = models.IntegerField(null=True)  # 맺어진 올리브영 상품 id, 못 찾았으면 NULL
+    score = models.FloatField(null=True)
+    matched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'product_match'
+        unique_together = ('site', 'product_id')
+        indexes = [models.Index(fields=['oy_product_id'], name='product_match_oy_product')]
+
+    def __str__(self):
+        return f"{self.site} {self.product_id} -> {self.oy_product_id}"
+
+
+class MatchState(models.Model):
+    """사이트별로 어느 올리브영 상품까지 매칭 대상으로 봤는지 남기는 워터마크."""
+    site = models.CharField(max_length=20, primary_key=True)
+    last_oy_product_id = models.BigIntegerField(default=0)  # 지난 실행 때 색인에 있던 가장 큰 올리브영 상품 id
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'match_state'
+
+    def __str__(self):
+        return f"{self.site} <= {self.last_oy_product_id}"
+
+
+class CatalogVersion(models.Model):
+    """크롤링이 데이터를 바꿀 때마다 올리는 범위별 버전. API 캐시 키와 ETag 에 들어간다."""
+    scope = models.CharField(max_length=20, primary_key=True)  # 사이트 이름, 'ranking', 'product_match'
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_version'
+
+    def __str__(self):
+        return f"{self.scope} v{self.version}"
+
+
+class ProductImage(models.Model):
+    """상품 이미지와 디스크에 저장한 이미지(내용 해시)의 연결. mirror_images 가 채운다."""
+    site = models.CharField(max_length=20)
+    product_id = models.IntegerField()  # 사이트별 상품 테이블의 id
+    image_url = models.TextField()  # 받아 온 원본 URL
+    image_url_hash = models.CharField(max_length=40)  # image_url 의 SHA-1. URL 이 바뀌었는지 비교한다
+    sha256 = models.CharField(max_length=64, null=True)  # 저장한 이미지 내용의 SHA-256, 받지 못했으면 NULL
+    content_type = models.CharField(max_length=100, default='')
+    size = models.PositiveIntegerField(null=True)
+    # 다음 조건부 요청(If-None-Match / If-Modified-Since)에 쓸 응답 헤더
+    etag = models.CharField(max_length=255, default='')
+    last_modified = models.CharField(max_length=64, default='')
+    status = models.PositiveSmallIntegerField(null=True)  # 마지막 응답 코드, 연결 오류면 NULL
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'product_image'
+        unique_together = ('site', 'product_id')
+        indexes = [
+            models.Index(fields=['image_url_hash'], name='product_image_url_hash'),
+            models.Index(fields=['sha256'], name='product_image_sha256'),
+        ]
 
     def __str__(self):
-        return f"{self.brand} - {self.cosmetic_name}"
\ No newline at end of file
+        return f"{self.site} {self.product_id} -> {self.sha256}"
@@ -0,0 +1,8 @@
+from pathlib import Path
+
+# 사이트 페이지 구조를 그대로 둔 채 카드 몇 개만 남긴 HTML
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text(encoding='utf-8')
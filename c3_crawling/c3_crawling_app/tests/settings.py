@@ -0,0 +1,18 @@
+# 테스트 전용 설정. 운영 MySQL 대신 SQLite 를 쓰고, 테스트 러너가 메모리 DB 를 만든다.
+#
+#     python manage.py test c3_crawling_app --settings=c3_crawling_app.tests.settings
+import tempfile
+
+from c3_crawling.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# 크롤링 로그와 이미지는 임시 디렉터리에 남긴다
+CRAWL_LOG_DIR = tempfile.mkdtemp(prefix='c3-test-logs-')
+IMAGE_STORE_DIR = tempfile.mkdtemp(prefix='c3-test-images-')
+CRAWL_METRICS_DIR = None
@@ -0,0 +1,94 @@
+import gzip
+import tempfile
+from datetime import date
+
+from django.test import SimpleTestCase
+from c3_crawling_app.crawling.archive import PageArchive, archive_directory, read_index, read_page
+from c3_crawling_app.management.commands.reparse import parse_entry
+from c3_crawling_app.tests import read_fixture
+
+DAY = date(2026, 10, 18)
+
+
+class PageArchiveTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+
+    def archive(self, site, pages):
+        with PageArchive(self.root.name, site, DAY) as archive:
+            for kind, category, url, html in pages:
+                archive.add(kind, category, 'code', 1, url, html)
+        return archive_directory(self.root.name, site, DAY)
+
+    def test_reads_back_each_page_by_offset(self):
+        directory = self.archive('oliveyoung', [
+            ('listing', '스킨케어', 'https://www.oliveyoung.co.kr/1', '<p>첫 페이지</p>'),
+            ('listing', '스킨케어', 'https://www.oliveyoung.co.kr/2', '<p>둘째 페이지</p>'),
+        ])
+        entries = read_index(directory)
+
+        self.assertEqual([entry['url'] for entry in entries],
+                         ['https://www.oliveyoung.co.kr/1', 'https://www.oliveyoung.co.kr/2'])
+        self.assertEqual(read_page(directory, entries[1]), '<p>둘째 페이지</p>')
+        self.assertEqual(entries[0]['category'], '스킨케어')
+
+    def test_pages_file_is_plain_gzip(self):
+        directory = self.archive('zigzag', [
+            ('listing', '스킨케어', 'u1', 'a'),
+            ('detail', '스킨케어', 'u2', 'b'),
+        ])
+        entry = read_index(directory)[0]
+        with gzip.open(directory / entry['file'], 'rt', encoding='utf-8') as pages_file:
+            self.assertEqual(pages_file.read(), 'ab')
+
+    def test_disabled_without_root(self):
+        with PageArchive(None, 'zigzag', DAY) as archive:
+            archive.add('listing', '스킨케어', 'code', 1, 'u', 'html')
+        self.assertFalse(archive.enabled)
+
+
+class ReparseEntryTests(SimpleTestCase):
+    """보관한 페이지를 reparse 워커가 읽는 경로 (network/DB 없이 HTML 만)."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+
+    def parse(self, site, kind, url, fixture):
+        with PageArchive(self.root.name, site, DAY) as archive:
+            archive.add(kind, '스킨케어', 'code', 1, url, read_fixture(fixture))
+        directory = archive_directory(self.root.name, site, DAY)
+        return parse_entry((site, str(directory), read_index(directory)[-1]))
+
+    def test_oliveyoung_listing(self):
+        with self.assertLogs(level='ERROR'):
+            kind, products = self.parse('oliveyoung', 'listing', 'https://www.oliveyoung.co.kr/x',
+                                        'oliveyoung_listing.html')
+        self.assertEqual(kind, 'listing')
+        self.assertEqual([product and product['sale_price'] for product in products], [24900, 28000, 17900, None])
+
+    def test_zigzag_listing_and_detail(self):
+        with self.assertLogs(level='ERROR'):
+            _, products = self.parse('zigzag', 'listing', 'https://zigzag.kr/categories/1098', 'zigzag_listing.html')
+        self.assertEqual(products[0]['cosmetic_url'], 'https://zigzag.kr/catalog/products/137552391')
+        self.assertEqual([product and product['sale_price'] for product in products], [24750, 26600, None])
+
+        kind, (url, price) = self.parse('zigzag', 'detail', 'https://zigzag.kr/catalog/products/137552391',
+                                        'zigzag_detail.html')
+        self.assertEqual((kind, url, price), ('detail', 'https://zigzag.kr/catalog/products/137552391', 33000))
+
+    def test_musinsa_listing_and_detail(self):
+        _, products = self.parse('musinsa', 'listing', 'https://www.musinsa.com/category/104001', 'musinsa_listing.html')
+        # 할인율 span 이 앞에 있으면 두 번째 span 이 판매가다
+        self.assertEqual([(product['brand'], product['sale_price']) for product in products],
+                         [('라운드랩', 23900), ('토리든', 18000)])
+
+        _, (_, price) = self.parse('musinsa', 'detail', 'https://www.musinsa.com/products/3945528',
+                                   'musinsa_detail.html')
+        self.assertEqual(price, 33000)
+
+    def test_detail_without_strikethrough_has_no_price(self):
+        _, (_, price) = self.parse('zigzag', 'detail', 'https://zigzag.kr/catalog/products/1',
+                                   'musinsa_detail.html')
+        self.assertIsNone(price)
@@ -0,0 +1,18 @@
+from django.test import SimpleTestCase, override_settings
+from c3_crawling_app.crawling.browser import BLOCKED_URLS, blocked_urls
+
+SITE_PROFILES = {
+    'zigzag': {'block': ['*.mp4*'], 'script_hosts': ['cdn.amplitude.com']},
+}
+
+
+@override_settings(BROWSER_SITE_PROFILES=SITE_PROFILES)
+class BlockedUrlsTests(SimpleTestCase):
+    def test_adds_site_patterns_and_keeps_allowed_script_hosts(self):
+        patterns = blocked_urls('zigzag')
+        self.assertIn('*.mp4*', patterns)
+        self.assertNotIn('*amplitude.com*', patterns)
+        self.assertIn('*googletagmanager.com*', patterns)
+
+    def test_site_without_profile_uses_common_list(self):
+        self.assertEqual(blocked_urls('musinsa'), BLOCKED_URLS)
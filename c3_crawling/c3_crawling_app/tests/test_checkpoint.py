@@ -0,0 +1,70 @@
+from django.test import TestCase
+from c3_crawling_app.crawling.checkpoint import CheckpointStore, product_key, resolve_run_id
+from c3_crawling_app.models import CrawlCheckpoint
+
+URL = 'https://zigzag.kr/catalog/products/137552391'
+
+
+class CheckpointStoreTests(TestCase):
+    def test_round_trips_progress(self):
+        store = CheckpointStore('zigzag', '20261018-030000.000')
+        store.page_done('스킨케어', '1100', 3)
+        store.add_key('스킨케어', '1100', product_key(URL))
+        store.add_key('스킨케어', '1100', product_key(URL + '?utm_source=ad'))
+        store.flush()
+
+        loaded = CheckpointStore.load('zigzag', '20261018-030000.000')
+        self.assertEqual(loaded.last_page('1100'), 3)
+        self.assertEqual(loaded.processed_keys('1100'), {product_key(URL)})
+        self.assertFalse(loaded.is_completed('1100'))
+        self.assertEqual(loaded.last_page('1106'), 0)
+        self.assertEqual(loaded.processed_keys('1106'), set())
+
+    def test_flush_writes_only_dirty_categories(self):
+        store = CheckpointStore('zigzag', 'run')
+        store.page_done('스킨케어', '1100', 1)
+        store.flush()
+        CrawlCheckpoint.objects.filter(category_code='1100').update(last_page=99)
+
+        store.page_done('마스크팩', '1106', 2)
+        store.flush()
+        pages = dict(CrawlCheckpoint.objects.values_list('category_code', 'last_page'))
+        self.assertEqual(pages, {'1100': 99, '1106': 2})
+        with self.assertNumQueries(0):
+            store.flush()
+
+    def test_category_done_saves_immediately_and_drops_keys(self):
+        store = CheckpointStore('zigzag', 'run', interval=3600)
+        store.add_key('스킨케어', '1100', 'abc')
+        self.assertFalse(store.due())
+        store.category_done('스킨케어', '1100')
+
+        row = CrawlCheckpoint.objects.get(category_code='1100')
+        self.assertTrue(row.completed)
+        self.assertEqual(row.processed_keys, '')
+        self.assertTrue(CheckpointStore.load('zigzag', 'run').is_completed('1100'))
+
+    def test_due_after_interval(self):
+        store = CheckpointStore('zigzag', 'run', interval=0)
+        self.assertFalse(store.due())
+        store.page_done('스킨케어', '1100', 1)
+        self.assertTrue(store.due())
+
+
+class ResolveRunIdTests(TestCase):
+    def test_new_run_without_resume_or_history(self):
+        CrawlCheckpoint.objects.create(site='zigzag', run_id='20261017-030000.000', category_code='1100')
+        self.assertNotEqual(resolve_run_id('zigzag', False, ['1100']), '20261017-030000.000')
+        self.assertRegex(resolve_run_id('musinsa', True, ['104002']), r'^\d{8}-\d{6}\.\d{3}$')
+
+    def test_resumes_latest_unfinished_run(self):
+        CrawlCheckpoint.objects.create(site='zigzag', run_id='20261016-030000.000', category_code='1100')
+        CrawlCheckpoint.objects.create(site='zigzag', run_id='20261017-030000.000', category_code='1100',
+                                       completed=True)
+        self.assertEqual(resolve_run_id('zigzag', True, ['1100', '1106']), '20261017-030000.000')
+
+    def test_finished_run_is_not_resumed(self):
+        for code in ('1100', '1106'):
+            CrawlCheckpoint.objects.create(site='zigzag', run_id='20261017-030000.000', category_code=code,
+                                           completed=True)
+        self.assertNotEqual(resolve_run_id('zigzag', True, ['1100', '1106']), '20261017-030000.000')
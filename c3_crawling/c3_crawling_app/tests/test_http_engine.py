@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from io import StringIO
+from unittest import mock
+
+import requests
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from benchmarks.standin import OY_PAGE_SIZE, serve
+from c3_crawling_app.crawling import oliveyoung
+from c3_crawling_app.crawling.async_engine import AsyncFetcher, crawl_pages
+from c3_crawling_app.crawling.http_client import HttpClient
+from c3_crawling_app.crawling.writer import ProductWriter
+from c3_crawling_app.management.commands.oy_cosmetics import CATEGORIES
+from c3_crawling_app.models import CrawlCheckpoint, ListingFingerprint, Oycosmetic
+
+# 카테고리마다 첫 페이지는 꽉 차고 둘째 페이지가 마지막이다
+PRODUCTS = OY_PAGE_SIZE + 6
+CATEGORY_CODES = [code for codes in CATEGORIES.values() for code in codes]
+
+
+class StandinServerMixin:
+    """benchmarks.standin 대역 서버를 빈 포트에 띄운다."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = serve(0, PRODUCTS)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.settings_override = override_settings(OLIVEYOUNG_BASE_URL=cls.base_url)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+
+class HttpEngineTests(StandinServerMixin, SimpleTestCase):
+    def test_fetch_raises_and_get_returns_status(self):
+        client = HttpClient(retries=0)
+        self.addCleanup(client.close)
+        self.assertIn('prd_info', client.fetch(oliveyoung.listing_url(CATEGORY_CODES[0], 1)))
+        self.assertEqual(client.get(self.base_url + '/missing').status_code, 404)
+        with self.assertRaises(requests.HTTPError):
+            client.fetch(self.base_url + '/missing')
+
+    def test_crawl_pages_stops_after_last_page(self):
+        client = HttpClient()
+        self.addCleanup(client.close)
+        seen = []
+
+        async def handle_page(page_number, url, html):
+            products, has_next = oliveyoung.parse_listing(html, '스킨케어', url)
+            seen.append((page_number, len(products)))
+            return has_next
+
+        fetcher = AsyncFetcher(client, per_host=4, rate=100)
+        asyncio.run(crawl_pages(
+            fetcher, lambda page_number: oliveyoung.listing_url(CATEGORY_CODES[0], page_number), handle_page,
+            prefetch=2,
+        ))
+        self.assertEqual(seen, [(1, OY_PAGE_SIZE), (2, PRODUCTS - OY_PAGE_SIZE)])
+
+    def test_crawl_pages_retries_failed_page(self):
+        client = HttpClient()
+        self.addCleanup(client.close)
+        attempts = []
+        retries = []
+
+        async def handle_page(page_number, url, html):
+            attempts.append(page_number)
+            if attempts.count(page_number) == 1 and page_number == 2:
+                raise ValueError('깨진 페이지')
+            return page_number < 2
+
+        asyncio.run(crawl_pages(
+            AsyncFetcher(client, rate=100),
+            lambda page_number: oliveyoung.listing_url(CATEGORY_CODES[0], page_number),
+            handle_page, retries=1, on_retry=lambda *args: retries.append(args[:2]),
+        ))
+        self.assertEqual(attempts, [1, 2, 2])
+        self.assertEqual(retries, [(2, 1)])
+
+
+class OliveyoungCommandTests(StandinServerMixin, TransactionTestCase):
+    def crawl(self, *args):
+        stdout = StringIO()
+        call_command('oy_cosmetics', *args, '--rate', '1000', stdout=stdout)
+        return stdout.getvalue()
+
+    def test_http_engine_saves_every_product_then_skips_unchanged_pages(self):
+        output = self.crawl('--engine', 'http')
+        self.assertIn(f'신규 {PRODUCTS * len(CATEGORY_CODES)}건', output)
+        self.assertEqual(Oycosmetic.objects.count(), PRODUCTS * len(CATEGORY_CODES))
+        self.assertEqual(ListingFingerprint.objects.filter(site='oliveyoung').count(), 2 * len(CATEGORY_CODES))
+        self.assertEqual(CrawlCheckpoint.objects.filter(site='oliveyoung', completed=True).count(),
+                         len(CATEGORY_CODES))
+
+        # 같은 카탈로그를 다시 돌면 목록 지문이 같아서 모든 페이지를 건너뛴다
+        output = self.crawl('--engine', 'http')
+        self.assertIn(f'변경 없음 {PRODUCTS * len(CATEGORY_CODES)}건', output)
+        self.assertIn('신규 0건', output)
+        self.assertIn(f'건너뛴 페이지 {2 * len(CATEGORY_CODES)}건', output)
+
+    def test_async_engine_matches_http_engine(self):
+        output = self.crawl('--engine', 'async', '--concurrency', '4', '--prefetch', '2')
+        self.assertIn(f'신규 {PRODUCTS * len(CATEGORY_CODES)}건', output)
+        first = oliveyoung.parse_listing(
+            HttpClient().fetch(oliveyoung.listing_url(CATEGORY_CODES[0], 1)), '스킨케어',
+            oliveyoung.listing_url(CATEGORY_CODES[0], 1),
+        )[0][0]
+        saved = Oycosmetic.objects.get(cosmetic_name=first['cosmetic_name'])
+        self.assertEqual((saved.price, saved.sale_price, saved.category), (first['price'], first['sale_price'], '스킨케어'))
+
+    def test_async_engine_flushes_the_writer_on_the_command_thread(self):
+        flush = ProductWriter.flush
+        threads = set()
+
+        def record_thread(writer):
+            threads.add(threading.get_ident())
+            return flush(writer)
+
+        with mock.patch.object(ProductWriter, 'flush', autospec=True, side_effect=record_thread):
+            self.crawl('--engine', 'async', '--concurrency', '4')
+        self.assertEqual(threads, {threading.get_ident()})
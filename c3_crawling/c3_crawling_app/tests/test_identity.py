@@ -0,0 +1,120 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from c3_crawling_app.crawling.identity import normalize_url, rehash_urls, url_hash
+from c3_crawling_app.models import Oycosmetic
+
+DETAIL_URL = 'https://www.oliveyoung.co.kr/store/goods/getGoodsDetail.do?goodsNo=A000000184228'
+
+
+class NormalizeUrlTests(SimpleTestCase):
+    def test_keeps_only_goods_no_on_oliveyoung_detail(self):
+        url = (
+            'https://www.oliveyoung.co.kr/store/goods/getGoodsDetail.do?goodsNo=A000000184228'
+            '&dispCatNo=100000100010013&trackingCd=Cat100000100010013_Small&curation=&egcode=&rccode='
+        )
+        self.assertEqual(normalize_url(url), DETAIL_URL)
+
+    def test_lowercases_host_and_drops_default_port_fragment_and_trailing_slash(self):
+        self.assertEqual(
+            normalize_url(' HTTPS://WWW.OliveYoung.co.kr:443/store/goods/getGoodsDetail.do/?goodsNo=A000000184228#review '),
+            DETAIL_URL,
+        )
+
+    def test_keeps_non_default_port(self):
+        self.assertEqual(normalize_url('http://127.0.0.1:8765/products/1'), 'http://127.0.0.1:8765/products/1')
+
+    def test_drops_tracking_params_and_sorts_the_rest(self):
+        self.assertEqual(
+            normalize_url('https://zigzag.kr/catalog/products/1?utm_source=ad&t_src=x&b=2&gclid=g&a=1'),
+            'https://zigzag.kr/catalog/products/1?a=1&b=2',
+        )
+
+    def test_path_is_case_sensitive(self):
+        self.assertNotEqual(normalize_url('https://zigzag.kr/A'), normalize_url('https://zigzag.kr/a'))
+
+
+class UrlHashTests(SimpleTestCase):
+    def test_same_product_same_hash(self):
+        self.assertEqual(
+            url_hash(DETAIL_URL + '&trackingCd=Best_Sellingbest&t_page=랭킹'),
+            url_hash(DETAIL_URL.replace('https://www.oliveyoung', 'https://WWW.oliveyoung')),
+        )
+
+    def test_different_product_different_hash(self):
+        self.assertNotEqual(url_hash(DETAIL_URL), url_hash(DETAIL_URL.replace('184228', '184229')))
+
+    def test_is_sha1_hex(self):
+        self.assertRegex(url_hash(DETAIL_URL), r'^[0-9a-f]{40}$')
+
+
+class RehashUrlsTests(TestCase):
+    def create(self, url):
+        return Oycosmetic.objects.create(
+            category='스킨케어', brand='라운드랩', cosmetic_name='독도 토너', price=33000, sale_price=24900,
+            cosmetic_url=url, image_url='',
+        )
+
+    def test_orm_save_fills_url_hash(self):
+        self.assertEqual(self.create(DETAIL_URL + '&trackingCd=a').url_hash, url_hash(DETAIL_URL))
+
+    def test_recomputes_stale_hashes_and_skips_conflicts(self):
+        first = self.create(DETAIL_URL)
+        second = self.create(DETAIL_URL.replace('184228', '163652'))
+        third = self.create(DETAIL_URL.replace('184228', '190011'))
+        # 예전 규칙으로 계산된 값처럼 바꿔 둔다. third 는 새 값이 first 와 겹치도록 URL 을 바꾼다
+        Oycosmetic.objects.filter(id=second.id).update(url_hash='0' * 40)
+        Oycosmetic.objects.filter(id=third.id).update(cosmetic_url=DETAIL_URL + '&trackingCd=x')
+
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(rehash_urls(Oycosmetic, chunk_size=2), (1, 1))
+
+        hashes = dict(Oycosmetic.objects.values_list('id', 'url_hash'))
+        self.assertEqual(hashes[first.id], url_hash(DETAIL_URL))
+        self.assertEqual(hashes[second.id], url_hash(second.cosmetic_url))
+        self.assertEqual(hashes[third.id], third.url_hash)
+
+
+class UrlHashMigrationTests(TransactionTestCase):
+    """0015 상태에서 url_hash 가 빈 상품을 넣고 0016 으로 올려 본다."""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('c3_crawling_app', target)])
+        return executor.loader.project_state([('c3_crawling_app', target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_fills_hashes_merges_duplicates_and_sets_not_null(self):
+        apps = self.migrate('0015_rankinghistory')
+        product = apps.get_model('c3_crawling_app', 'Oycosmetic')
+        price_history = apps.get_model('c3_crawling_app', 'PriceHistory')
+        product_match = apps.get_model('c3_crawling_app', 'ProductMatch')
+
+        def create(url, **values):
+            return product.objects.create(category='스킨케어', brand='라운드랩', cosmetic_name='독도 토너',
+                                          cosmetic_url=url, image_url='', **values)
+
+        crawled = create(DETAIL_URL, url_hash=url_hash(DETAIL_URL))
+        stale = create(DETAIL_URL + '&trackingCd=a')
+        other = create(DETAIL_URL.replace('184228', '163652') + '&trackingCd=a')
+        other_duplicate = create(DETAIL_URL.replace('184228', '163652') + '&trackingCd=b')
+        price_history.objects.create(site='oliveyoung', product_id=stale.id, day='2026-10-18')
+        product_match.objects.create(site='zigzag', product_id=1, oy_product_id=stale.id)
+
+        with self.assertLogs(level='WARNING'):
+            apps = self.migrate('0016_url_hash_not_null')
+
+        rows = dict(apps.get_model('c3_crawling_app', 'Oycosmetic').objects.values_list('id', 'url_hash'))
+        self.assertEqual(rows, {
+            crawled.id: url_hash(DETAIL_URL),
+            other.id: url_hash(other.cosmetic_url),
+        })
+        self.assertNotIn(other_duplicate.id, rows)
+        self.assertFalse(apps.get_model('c3_crawling_app', 'PriceHistory').objects.exists())
+        self.assertEqual(
+            apps.get_model('c3_crawling_app', 'ProductMatch').objects.get().oy_product_id, crawled.id
+        )
+        self.assertFalse(apps.get_model('c3_crawling_app', 'Oycosmetic')._meta.get_field('url_hash').null)
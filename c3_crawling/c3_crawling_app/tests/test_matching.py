@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from c3_crawling_app.crawling.matching import ProductIndex, normalize_product
+from c3_crawling_app.crawling.snapshot import load_products
+from c3_crawling_app.models import Oycosmetic, ProductMatch, Zzcosmetic
+
+OY_PRODUCTS = [
+    (11, '라운드랩', '라운드랩 1025 독도 토너 500ml'),
+    (12, '라운드랩', '라운드랩 1025 독도 토너 200ml'),
+    (13, '아누아', '[리뉴얼] 아누아 어성초 77 수딩 토너 250ml'),
+    (14, '토리든', '토리든 다이브인 저분자 히알루론산 스킨 토너 300ml 기획 (+100ml 증정)'),
+    (15, '토리든', '토리든 다이브인 저분자 히알루론산 스킨 토너 300ml'),
+    (16, '에스티 로더', '에스티로더 더블웨어 파운데이션 30ml'),
+]
+
+
+class NormalizeProductTests(SimpleTestCase):
+    def test_strips_brand_prefix_and_volume(self):
+        self.assertEqual(
+            normalize_product('라운드랩', '라운드랩 1025 독도 토너 500ml'),
+            (['1025', '독도', '토너'], '500ml', False),
+        )
+
+    def test_brand_prefix_with_different_spacing(self):
+        self.assertEqual(
+            normalize_product('에스티 로더', '에스티로더 더블웨어 파운데이션 30ML'),
+            (['더블웨어', '파운데이션'], '30ml', False),
+        )
+
+    def test_drops_bracketed_notes(self):
+        self.assertEqual(normalize_product('아누아', '[리뉴얼] 아누아 어성초 77 수딩 토너 250ml')[0],
+                         ['어성초', '77', '수딩', '토너'])
+
+    def test_bundle_volume_ignores_bonus_in_brackets(self):
+        tokens, volume, bundle = normalize_product(
+            '토리든', '토리든 다이브인 저분자 히알루론산 스킨 토너 300ml 기획 (+100ml 증정)'
+        )
+        self.assertEqual((tokens[0], volume, bundle), ('다이브인', '300ml', True))
+
+    def test_full_width_and_multiple_volumes(self):
+        self.assertEqual(normalize_product('브랜드', '토너 1.5L + 50ml')[1], '1.5l,50ml')
+        self.assertEqual(normalize_product('ＡＢＣ', 'ＡＢＣ 토너')[0], ['토너'])
+
+
+class ProductIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = ProductIndex(OY_PRODUCTS)
+
+    def test_matches_same_product_from_another_site(self):
+        best = self.index.best_match('라운드랩', '1025 독도 토너 500ml', threshold=0.6)
+        self.assertEqual(best[0], 11)
+        self.assertGreater(best[1], 0.9)
+
+    def test_different_volume_is_not_a_match(self):
+        self.assertIsNone(self.index.best_match('라운드랩', '1025 독도 토너 1000ml', threshold=0.6))
+        self.assertEqual(self.index.best_match('라운드랩', '1025 독도 토너 200ml', threshold=0.6)[0], 12)
+
+    def test_bundle_and_single_are_not_matched(self):
+        self.assertEqual(self.index.best_match('토리든', '다이브인 저분자 히알루론산 토너 300ml', threshold=0.6)[0], 15)
+        self.assertEqual(
+            self.index.best_match('토리든', '다이브인 저분자 히알루론산 토너 300ml 기획세트', threshold=0.6)[0], 14
+        )
+
+    def test_query_is_sorted_by_score(self):
+        results = self.index.query('라운드랩', '독도 토너')
+        scores = [score for _, score in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertIn(results[0][0], (0, 1))
+
+    def test_unrelated_name_has_no_match(self):
+        self.assertEqual(self.index.query('몰라', 'xyz'), [])
+        self.assertIsNone(self.index.best_match('에뛰드', '순정 약산성 클렌징 폼', threshold=0.6))
+
+    def test_start_skips_products_before_watermark(self):
+        self.assertEqual(self.index.position(12), 2)
+        self.assertEqual(self.index.position(0), 0)
+        self.assertEqual(self.index.position(99), len(self.index))
+        self.assertIsNone(self.index.best_match('라운드랩', '1025 독도 토너 500ml', threshold=0.6,
+                                                start=self.index.position(12)))
+        self.assertEqual(
+            self.index.best_match('아누아', '어성초 77 수딩 토너 250ml', threshold=0.6, start=self.index.position(12))[0],
+            13,
+        )
+
+    def test_index_accepts_a_generator(self):
+        index = ProductIndex(product for product in OY_PRODUCTS)
+        self.assertEqual(len(index), len(OY_PRODUCTS))
+        self.assertEqual(index.best_match('라운드랩', '1025 독도 토너 500ml', threshold=0.6)[0], 11)
+
+
+class MatchProductsCommandTests(TestCase):
+    def create(self, model, brand, name):
+        return model.objects.create(
+            category='스킨케어', brand=brand, cosmetic_name=name, price=20000, sale_price=15000,
+            cosmetic_url=f'https://example.com/{model.__name__}/{name}', image_url='',
+        )
+
+    def match(self):
+        call_command('match_products', stdout=StringIO())
+        return ProductMatch.objects.get(site='zigzag')
+
+    def test_new_oliveyoung_product_with_better_score_replaces_match(self):
+        self.create(Oycosmetic, '라운드랩', '라운드랩 1025 독도 토너 리필 기획 500ml')
+        self.create(Zzcosmetic, '라운드랩', '1025 독도 토너 500ml 기획')
+        first = self.match()
+        self.assertIsNotNone(first.oy_product_id)
+
+        exact = self.create(Oycosmetic, '라운드랩', '라운드랩 1025 독도 토너 기획 500ml')
+        second = self.match()
+        self.assertEqual(second.oy_product_id, exact.id)
+        self.assertGreater(second.score, first.score)
+
+        # 새 올리브영 상품이 지금 짝보다 못하면 그대로 둔다
+        self.create(Oycosmetic, '라운드랩', '라운드랩 1025 독도 토너 미니 기획 500ml')
+        self.assertEqual(self.match().oy_product_id, exact.id)
+
+    def test_load_products_reads_in_chunks(self):
+        products = [self.create(Oycosmetic, '라운드랩', f'독도 토너 {number}') for number in range(5)]
+        rows = load_products('oycosmetic', ['cosmetic_name'], chunk_size=2)
+        self.assertNotIsInstance(rows, list)
+        self.assertEqual(list(rows), [(product.id, product.cosmetic_name) for product in products])
@@ -0,0 +1,75 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+from c3_crawling_app.models import Oycosmetic, ProductImage
+from c3_crawling_app.tests.test_http_engine import StandinServerMixin
+
+
+class MirrorImagesTests(StandinServerMixin, TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.store_dir.cleanup)
+
+    def add_product(self, name):
+        return Oycosmetic.objects.create(
+            category='스킨케어', brand='라운드랩', cosmetic_name=f'독도 토너 {name}', price=33000, sale_price=24900,
+            cosmetic_url=f'{self.base_url}/products/{name}', image_url=f'{self.base_url}/_bench/img/{name}.jpg',
+        )
+
+    def mirror(self, *args):
+        out = StringIO()
+        call_command('mirror_images', '--site', 'oliveyoung', '--store-dir', self.store_dir.name, *args, stdout=out)
+        return out.getvalue()
+
+    def stored_files(self):
+        return [path for path in Path(self.store_dir.name).rglob('*') if path.is_file()]
+
+    def test_same_content_is_stored_once(self):
+        first = self.add_product('1')
+        same_url = Oycosmetic.objects.create(
+            category='스킨케어', brand='라운드랩', cosmetic_name='독도 토너 기획', price=33000, sale_price=24900,
+            cosmetic_url=f'{self.base_url}/products/1-set', image_url=first.image_url,
+        )
+        # 대역 서버는 파일명 바이트 합을 7로 나눈 나머지로 내용을 고르므로 1.jpg 와 8.jpg 는 내용이 같다
+        same_content = self.add_product('8')
+        other = self.add_product('2')
+
+        out = self.mirror()
+
+        self.assertIn('받음 3건', out)
+        images = {image.product_id: image for image in ProductImage.objects.filter(site='oliveyoung')}
+        self.assertEqual(images[first.id].sha256, images[same_url.id].sha256)
+        self.assertEqual(images[first.id].sha256, images[same_content.id].sha256)
+        self.assertNotEqual(images[first.id].sha256, images[other.id].sha256)
+        self.assertEqual(images[first.id].content_type, 'image/jpeg')
+        self.assertTrue(images[first.id].etag)
+        self.assertEqual(len(self.stored_files()), 2)
+
+    def test_refresh_sends_conditional_request(self):
+        product = self.add_product('1')
+        self.mirror()
+        before = ProductImage.objects.get(site='oliveyoung', product_id=product.id)
+
+        # 다시 돌리면 이미 받은 이미지는 요청하지 않는다
+        self.assertIn('받음 0건', self.mirror())
+
+        out = self.mirror('--refresh')
+
+        self.assertIn('변경 없음(304) 1건', out)
+        after = ProductImage.objects.get(site='oliveyoung', product_id=product.id)
+        self.assertEqual((after.status, after.sha256, after.etag), (304, before.sha256, before.etag))
+        self.assertEqual(len(self.stored_files()), 1)
+
+    def test_response_over_max_bytes_is_not_stored(self):
+        product = self.add_product('1')
+
+        with self.assertLogs(level='ERROR'):
+            out = self.mirror('--max-bytes', '1024')
+
+        self.assertIn('실패 1건', out)
+        image = ProductImage.objects.get(site='oliveyoung', product_id=product.id)
+        self.assertEqual((image.status, image.sha256, image.size), (200, None, None))
+        self.assertEqual(self.stored_files(), [])
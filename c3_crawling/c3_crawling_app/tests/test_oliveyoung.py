@@ -0,0 +1,103 @@
+from contextlib import nullcontext
+
+from django.test import SimpleTestCase
+from c3_crawling_app.crawling import oliveyoung
+from c3_crawling_app.tests import read_fixture
+
+PAGE_URL = 'https://www.oliveyoung.co.kr/store/display/getMCategoryList.do?dispCatNo=100000100010013&pageIdx=1'
+
+
+class ParseListingTests(SimpleTestCase):
+    def parse(self, name):
+        # 첫 페이지의 품절 카드는 판매가가 없어서 오류 로그를 남긴다
+        with self.assertLogs(level='ERROR') if name == 'oliveyoung_listing.html' else nullcontext():
+            return oliveyoung.parse_listing(read_fixture(name), '스킨케어', PAGE_URL)
+
+    def test_reads_cards_in_page_order(self):
+        products, has_next = self.parse('oliveyoung_listing.html')
+        self.assertTrue(has_next)
+        self.assertEqual(len(products), 4)
+        self.assertEqual(products[0], {
+            'category': '스킨케어',
+            'brand': '라운드랩',
+            'cosmetic_name': '라운드랩 1025 독도 토너 500ml',
+            'price': 33000,
+            'sale_price': 24900,
+            'cosmetic_url': (
+                'https://www.oliveyoung.co.kr/store/goods/getGoodsDetail.do?goodsNo=A000000184228'
+                '&dispCatNo=100000100010013&trackingCd=Cat100000100010013_Small&curation=&egcode=&rccode=&egrankcode='
+            ),
+            'image_url': 'https://image.oliveyoung.co.kr/uploads/images/goods/220/10/0000/0018/A00000018422806ko.jpg?l=ko',
+        })
+
+    def test_list_price_defaults_to_sale_price_without_discount(self):
+        products, _ = self.parse('oliveyoung_listing.html')
+        self.assertEqual((products[1]['price'], products[1]['sale_price']), (28000, 28000))
+        self.assertEqual((products[2]['price'], products[2]['sale_price']), (24000, 17900))
+
+    def test_card_without_price_is_none(self):
+        products, _ = self.parse('oliveyoung_listing.html')
+        self.assertIsNone(products[3])
+
+    def test_last_page_has_no_next(self):
+        products, has_next = self.parse('oliveyoung_listing_last.html')
+        self.assertFalse(has_next)
+        self.assertEqual([product['sale_price'] for product in products], [15400])
+
+    def test_best_list_keeps_rank_of_broken_cards(self):
+        with self.assertLogs(level='ERROR'):
+            ranked = oliveyoung.parse_best_list(read_fixture('oliveyoung_listing.html'), '전체', PAGE_URL)
+        self.assertEqual([rank for rank, _ in ranked], [1, 2, 3, 4])
+        self.assertIsNone(ranked[3][1])
+        self.assertEqual(ranked[2][1]['brand'], '토리든')
+
+
+class ListingFingerprintTests(SimpleTestCase):
+    def setUp(self):
+        # 판매가가 없는 품절 카드(마지막 카드)를 뺀 첫 페이지
+        html = read_fixture('oliveyoung_listing.html')
+        self.html = html[:html.index('<li class="flag soldout">')] + html[html.index('</ul>'):]
+
+    def fingerprint(self, html):
+        return oliveyoung.listing_fingerprint(*oliveyoung.parse_listing(html, '스킨케어', PAGE_URL))
+
+    def test_ignores_reviews_badges_and_tracking(self):
+        changed = (
+            self.html
+            .replace('(999+)', '(1,024)')
+            .replace('<span class="thumb_flag best">베스트</span>', '')
+            .replace('<span class="icon_flag coupon">쿠폰</span>', '')
+            .replace('trackingCd=Cat100000100010013_Small', 'trackingCd=Best_Sellingbest')
+            .replace('width:96.0%', 'width:98.0%')
+        )
+        self.assertIsNotNone(self.fingerprint(self.html))
+        self.assertEqual(self.fingerprint(changed), self.fingerprint(self.html))
+
+    def test_changes_with_price(self):
+        changed = self.html.replace('<span class="tx_num">24,900</span>', '<span class="tx_num">23,900</span>')
+        self.assertNotEqual(self.fingerprint(changed), self.fingerprint(self.html))
+
+    def test_changes_with_card_order(self):
+        first = self.html.index('<li class="flag">')
+        second = self.html.index('<li class="flag">', first + 1)
+        third = self.html.index('<li class="flag">', second + 1)
+        swapped = self.html[:first] + self.html[second:third] + self.html[first:second] + self.html[third:]
+        self.assertNotEqual(self.fingerprint(swapped), self.fingerprint(self.html))
+
+    def test_changes_when_next_page_disappears(self):
+        changed = self.html.replace('class="next"', 'class="next disabled"')
+        self.assertNotEqual(self.fingerprint(changed), self.fingerprint(self.html))
+
+    def test_no_fingerprint_when_a_card_is_not_read(self):
+        # 품절 카드처럼 판매가를 못 읽은 카드가 있으면 건너뛰지 않는다
+        with self.assertLogs(level='ERROR'):
+            self.assertIsNone(self.fingerprint(read_fixture('oliveyoung_listing.html')))
+
+    def test_no_fingerprint_when_markup_drifts(self):
+        # 가격이 다른 태그로 옮겨 가서 판매가를 못 읽으면, 가격이 바뀌어도 같은 지문이 나오지 않게 한다
+        drifted = self.html.replace('class="tx_cur"', 'class="tx_price"')
+        with self.assertLogs(level='ERROR'):
+            self.assertIsNone(self.fingerprint(drifted))
+        products = [{'cosmetic_url': 'https://www.oliveyoung.co.kr/store/goods/getGoodsDetail.do?dispCatNo=1',
+                     'brand': 'a', 'cosmetic_name': 'b', 'price': 1000, 'sale_price': 1000}]
+        self.assertIsNone(oliveyoung.listing_fingerprint(products, False))
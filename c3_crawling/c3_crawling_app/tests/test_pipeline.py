@@ -0,0 +1,44 @@
+from django.db import OperationalError
+from django.test import SimpleTestCase
+from c3_crawling_app.crawling.metrics import RunMetrics
+from c3_crawling_app.crawling.pipeline import DetailPipeline
+
+
+class FailingWriter:
+    """flush 할 때마다 DB 오류를 내는 writer."""
+
+    def __init__(self):
+        self.added = []
+
+    def add(self, product_data):
+        self.added.append(product_data)
+
+    def flush(self):
+        raise OperationalError('deadlock')
+
+
+class CachedPrices:
+    # 모든 상품의 정가가 캐시에 있어서 상세 단계를 거치지 않는다
+    def get(self, url, sale_price):
+        return 33000
+
+
+class DetailPipelineTests(SimpleTestCase):
+    def test_flush_error_is_raised_from_drain_and_close(self):
+        metrics = RunMetrics('zigzag')
+        pipeline = DetailPipeline(None, None, FailingWriter(), CachedPrices(), workers=0, metrics=metrics).start()
+        pipeline.submit({'cosmetic_url': 'https://zigzag.kr/catalog/products/1', 'sale_price': 24900})
+
+        with self.assertLogs(level='ERROR'), self.assertRaises(OperationalError):
+            pipeline.drain()
+        # 저장 스레드는 살아 있어서 다음 drain 도 기다리지 않고 끝난다
+        self.assertTrue(pipeline.write_thread.is_alive())
+        with self.assertLogs(level='ERROR'), self.assertRaises(OperationalError):
+            pipeline.drain()
+        with self.assertLogs(level='ERROR'), self.assertRaises(OperationalError):
+            pipeline.close()
+        self.assertEqual(pipeline.writer.added[0]['price'], 33000)
+        self.assertEqual(
+            sum(counter['value'] for counter in metrics.to_dict()['counters'] if counter['labels'].get('stage') == 'write'),
+            3,
+        )
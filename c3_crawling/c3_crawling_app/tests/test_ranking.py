@@ -0,0 +1,56 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from c3_crawling_app.crawling.catalog_version import current_versions
+from c3_crawling_app.crawling.ranking import publish_snapshot
+from c3_crawling_app.models import Oycosmetic, Ranking, RankingHistory, RankingStaging, Zzcosmetic
+
+DAY = date(2026, 10, 18)
+
+
+def ranking_rows(snapshot_date, category='전체', count=3, **values):
+    return [
+        RankingStaging(snapshot_date=snapshot_date, category=category, rank=rank, brand='라운드랩',
+                       cosmetic_name=f'독도 토너 {rank}', sale_price=1000 * rank, oy_price=1000 * rank,
+                       cosmetic_url=f'https://www.oliveyoung.co.kr/{rank}', image_url='', **values)
+        for rank in range(1, count + 1)
+    ]
+
+
+# RENAME TABLE 로 바꿔 끼우므로 테스트마다 트랜잭션으로 되돌리지 않고 테이블을 비운다
+class PublishSnapshotTests(TransactionTestCase):
+    def test_swaps_ranking_and_keeps_every_day_in_history(self):
+        publish_snapshot(ranking_rows(DAY))
+        publish_snapshot(ranking_rows(date(2026, 10, 19), count=2))
+
+        self.assertEqual(set(Ranking.objects.values_list('snapshot_date', flat=True)), {date(2026, 10, 19)})
+        self.assertEqual(Ranking.objects.count(), 2)
+        self.assertEqual(RankingHistory.objects.filter(snapshot_date=DAY).count(), 3)
+        self.assertEqual(RankingHistory.objects.filter(snapshot_date=date(2026, 10, 19)).count(), 2)
+        self.assertEqual(current_versions(['ranking'])['ranking'], 2)
+
+    def test_same_day_replaces_only_that_category(self):
+        publish_snapshot(ranking_rows(DAY) + ranking_rows(DAY, category='스킨케어'))
+        publish_snapshot(ranking_rows(DAY, count=1))
+
+        self.assertEqual(RankingHistory.objects.filter(snapshot_date=DAY, category='전체').count(), 1)
+        self.assertEqual(RankingHistory.objects.filter(snapshot_date=DAY, category='스킨케어').count(), 3)
+
+    def test_match_products_publishes_refreshed_prices(self):
+        oy = Oycosmetic.objects.create(category='스킨케어', brand='라운드랩', cosmetic_name='라운드랩 1025 독도 토너 200ml',
+                                       price=20000, sale_price=15000, cosmetic_url='https://www.oliveyoung.co.kr/1',
+                                       image_url='')
+        Zzcosmetic.objects.create(category='스킨케어', brand='라운드랩', cosmetic_name='1025 독도 토너 200ml',
+                                  price=20000, sale_price=12000, cosmetic_url='https://zigzag.kr/catalog/products/1',
+                                  image_url='')
+        publish_snapshot(ranking_rows(DAY, count=1, oy_product_id=oy.id))
+
+        call_command('match_products', stdout=StringIO())
+
+        row = Ranking.objects.get()
+        self.assertEqual((row.oy_price, row.zz_price, row.lowest_price), (1000, 12000, 1000))
+        # 새 스냅샷으로 바꿔 끼웠으므로 staging 에는 가격을 채우기 전 스냅샷이 남아 있다
+        self.assertIsNone(RankingStaging.objects.get().zz_price)
+        self.assertEqual(RankingHistory.objects.get(snapshot_date=DAY).zz_price, 12000)
@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.core.exceptions import BadRequest
+from django.test import TestCase
+from c3_crawling_app.crawling.catalog_version import bump_version
+from c3_crawling_app.models import Ranking, RankingHistory, Zzcosmetic
+from c3_crawling_app.views import PRODUCT_FIELDS, decode_cursor, encode_cursor, keyset_page
+
+
+def create_products(prices):
+    return [
+        Zzcosmetic.objects.create(
+            category='스킨케어', brand='라운드랩', cosmetic_name=f'토너 {index}', price=30000,
+            sale_price=sale_price, discount_rate=None if sale_price is None else (30000 - sale_price) * 100 // 30000,
+            cosmetic_url=f'https://zigzag.kr/catalog/products/{index}', image_url='',
+        )
+        for index, sale_price in enumerate(prices)
+    ]
+
+
+class KeysetPageTests(TestCase):
+    def pages(self, column, descending, limit):
+        queryset = Zzcosmetic.objects.all()
+        after = None
+        pages = []
+        while True:
+            page = keyset_page(queryset, column, descending, after, limit, PRODUCT_FIELDS)
+            pages.append([row['id'] for row in page['results']])
+            if page['next_cursor'] is None:
+                return pages
+            after = decode_cursor(page['next_cursor'], 2 if column else 1)
+
+    def test_pages_by_id(self):
+        products = create_products([1000] * 5)
+        self.assertEqual(self.pages(None, False, 2), [
+            [products[0].id, products[1].id], [products[2].id, products[3].id], [products[4].id],
+        ])
+
+    def test_ties_on_the_sort_column_are_broken_by_id(self):
+        products = create_products([3000, 1000, 2000, 1000, 1000, None])
+        pages = self.pages('sale_price', False, 2)
+        # 판매가가 없는 상품은 빠지고, 같은 가격끼리는 id 순서로 한 번씩만 나온다
+        self.assertEqual(sum(pages, []), [products[index].id for index in (1, 3, 4, 2, 0)])
+
+    def test_descending(self):
+        products = create_products([29000, 15000, 15000, 27000])
+        pages = self.pages('discount_rate', True, 3)
+        self.assertEqual(sum(pages, []), [products[index].id for index in (2, 1, 3, 0)])
+
+    def test_every_product_filter_and_order_reads_an_index(self):
+        create_products([1000, 2000])
+        cases = [
+            ({}, 'sale_price', 'zz_sale_price_id'),
+            ({}, 'discount_rate', 'zz_discount_id'),
+            ({'brand': '라운드랩'}, 'sale_price', 'zz_brand_sale_price'),
+            ({'brand': '라운드랩'}, 'discount_rate', 'zz_brand_discount'),
+            ({'category': '스킨케어'}, 'sale_price', 'zz_category_sale_price'),
+        ]
+        for filters, column, index in cases:
+            with self.subTest(filters=filters, column=column):
+                queryset = Zzcosmetic.objects.filter(**filters, **{f'{column}__isnull': False}).order_by(column, 'id')
+                self.assertIn(index, queryset.explain())
+
+    def test_exact_page_has_no_next_cursor(self):
+        create_products([1000, 2000])
+        page = keyset_page(Zzcosmetic.objects.all(), None, False, None, 2, PRODUCT_FIELDS)
+        self.assertIsNone(page['next_cursor'])
+
+    def test_decode_cursor_rejects_wrong_shape_and_types(self):
+        self.assertEqual(decode_cursor(encode_cursor([1000, 7]), 2), [1000, 7])
+        for values in ([1000], [1000, 7, 8], ['1000', 7], [1000.5, 7], [True, 7], [None, 7], {'id': 7}):
+            with self.subTest(values=values), self.assertRaises(BadRequest):
+                decode_cursor(encode_cursor(values), 2)
+        for cursor in ('!!!', 'bm90IGpzb24', ''):
+            with self.subTest(cursor=cursor), self.assertRaises(BadRequest):
+                decode_cursor(cursor, 1)
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_products_follow_next_cursor(self):
+        create_products([1000, 2000, 3000])
+        first = self.client.get('/api/products/zigzag/', {'order': 'price', 'limit': 2}).json()
+        self.assertEqual([row['sale_price'] for row in first['results']], [1000, 2000])
+        second = self.client.get('/api/products/zigzag/',
+                                 {'order': 'price', 'limit': 2, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([row['sale_price'] for row in second['results']], [3000])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_invalid_parameters_are_400_even_with_if_none_match(self):
+        for params in ({'order': 'name'}, {'limit': 'many'}, {'cursor': 'abc'},
+                       {'order': 'price', 'cursor': encode_cursor([1000])},
+                       {'order': 'price', 'cursor': encode_cursor(['1000', 1])}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/products/zigzag/', params, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/products/unknown/').status_code, 404)
+        self.assertEqual(self.client.get('/api/ranking/', {'cursor': encode_cursor([1.5, 1])}).status_code, 400)
+
+    def test_etag_changes_with_catalog_version(self):
+        create_products([1000])
+        response = self.client.get('/api/products/zigzag/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/products/zigzag/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        bump_version('zigzag')
+        response = self.client.get('/api/products/zigzag/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_ranking_pages_by_rank(self):
+        for rank in (2, 1, 3):
+            Ranking.objects.create(category='전체', rank=rank, brand='b', cosmetic_name=f'n{rank}',
+                                   sale_price=1000 * rank, lowest_price=900 * rank, cosmetic_url='', image_url='')
+        Ranking.objects.create(category='스킨케어', rank=1, brand='b', cosmetic_name='other', cosmetic_url='',
+                               image_url='')
+        first = self.client.get('/api/ranking/', {'limit': 2}).json()
+        self.assertEqual([(row['rank'], row['lowest_price']) for row in first['results']], [(1, 900), (2, 1800)])
+        second = self.client.get('/api/ranking/', {'limit': 2, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([row['rank'] for row in second['results']], [3])
+
+    def test_ranking_of_a_past_day(self):
+        for day, name in (('2026-10-17', 'yesterday'), ('2026-10-18', 'today')):
+            RankingHistory.objects.create(snapshot_date=day, category='전체', rank=1, brand='b', cosmetic_name=name,
+                                          cosmetic_url='', image_url='')
+        response = self.client.get('/api/ranking/', {'date': '2026-10-17'}).json()
+        self.assertEqual([row['cosmetic_name'] for row in response['results']], ['yesterday'])
+        self.assertEqual(self.client.get('/api/ranking/', {'date': '10/17'}).status_code, 400)
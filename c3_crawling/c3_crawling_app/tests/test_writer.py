@@ -0,0 +1,134 @@
+from datetime import date
+
+from django.test import TestCase
+from c3_crawling_app.crawling.catalog_version import current_versions
+from c3_crawling_app.crawling.identity import url_hash
+from c3_crawling_app.crawling.metrics import RunMetrics
+from c3_crawling_app.crawling.snapshot import CHANGED, NEW, UNCHANGED, CatalogueSnapshot, pack_prices
+from c3_crawling_app.crawling.writer import ProductWriter
+from c3_crawling_app.models import Oycosmetic, PriceHistory
+
+TODAY = date(2026, 10, 18)
+
+
+def product(number, price=33000, sale_price=24900):
+    return {
+        'category': '스킨케어',
+        'brand': '라운드랩',
+        'cosmetic_name': f'1025 독도 토너 {number}',
+        'price': price,
+        'sale_price': sale_price,
+        'cosmetic_url': f'https://www.oliveyoung.co.kr/store/goods/getGoodsDetail.do?goodsNo=A{number:012d}&trackingCd=x',
+        'image_url': f'https://image.oliveyoung.co.kr/{number}.jpg',
+    }
+
+
+def write(products, today=TODAY, **kwargs):
+    with ProductWriter('oycosmetic', today, **kwargs) as writer:
+        for product_data in products:
+            writer.add(dict(product_data))
+    return writer
+
+
+class ProductWriterTests(TestCase):
+    def test_inserts_new_products_with_discount_and_history(self):
+        writer = write([product(1), product(2, price=None, sale_price=18000)])
+
+        self.assertEqual(writer.counts(), {'inserted': 2, 'updated': 0, 'unchanged': 0})
+        saved = Oycosmetic.objects.get(url_hash=url_hash(product(1)['cosmetic_url']))
+        self.assertEqual((saved.price, saved.sale_price, saved.discount_rate), (33000, 24900, 24))
+        self.assertIsNone(Oycosmetic.objects.get(url_hash=url_hash(product(2)['cosmetic_url'])).discount_rate)
+        self.assertEqual(PriceHistory.objects.filter(site='oliveyoung', day=TODAY).count(), 2)
+
+    def test_classifies_unchanged_and_changed_against_the_table(self):
+        write([product(1), product(2)])
+        later = date(2026, 10, 19)
+        writer = write([product(1), product(2, sale_price=19900), product(3)], today=later)
+
+        self.assertEqual(writer.counts(), {'inserted': 1, 'updated': 1, 'unchanged': 1})
+        rows = {row.cosmetic_name: row for row in Oycosmetic.objects.all()}
+        self.assertEqual(rows['1025 독도 토너 2'].sale_price, 19900)
+        # 가격이 그대로인 상품은 updated_at 도 그대로다
+        self.assertEqual(rows['1025 독도 토너 1'].updated_at.date(), TODAY)
+        self.assertEqual(rows['1025 독도 토너 2'].updated_at.date(), later)
+        self.assertEqual(PriceHistory.objects.filter(day=later).count(), 2)
+
+    def test_same_product_twice_in_a_batch_keeps_the_last(self):
+        writer = write([product(1), product(1, sale_price=20000)])
+        self.assertEqual(writer.counts()['inserted'], 1)
+        self.assertEqual(Oycosmetic.objects.get().sale_price, 20000)
+
+    def test_bumps_catalog_version_only_when_something_was_written(self):
+        write([product(1)])
+        self.assertEqual(current_versions(['oliveyoung'])['oliveyoung'], 1)
+        write([product(1)])
+        self.assertEqual(current_versions(['oliveyoung'])['oliveyoung'], 1)
+        write([product(1, sale_price=1000)])
+        self.assertEqual(current_versions(['oliveyoung'])['oliveyoung'], 2)
+
+    def test_retries_rows_one_by_one_when_the_batch_fails(self):
+        metrics = RunMetrics('oliveyoung')
+        # 판매가가 음수면 PositiveIntegerField 제약에 걸려 그 행만 실패한다
+        with self.assertLogs(level='ERROR'):
+            writer = write([product(1), product(2, sale_price=-1), product(3)], batch_size=10, metrics=metrics)
+
+        self.assertEqual(writer.failed, 1)
+        self.assertEqual(writer.counts()['inserted'], 2)
+        self.assertEqual(Oycosmetic.objects.count(), 2)
+
+    def test_snapshot_skips_unchanged_products_and_calls_on_saved(self):
+        write([product(1), product(2)])
+        snapshot = CatalogueSnapshot.load('oycosmetic')
+        saved = []
+
+        with self.assertNumQueries(0):
+            writer = ProductWriter('oycosmetic', TODAY, snapshot=snapshot,
+                                   on_saved=lambda row: saved.append(row['cosmetic_name']))
+            writer.add(product(1))
+            writer.add(product(2))
+        writer.add(product(2, sale_price=1000))
+        self.assertEqual(saved, ['1025 독도 토너 1', '1025 독도 토너 2'])
+        writer.flush()
+
+        self.assertEqual(writer.counts(), {'inserted': 0, 'updated': 1, 'unchanged': 2})
+        self.assertEqual(saved[-1], '1025 독도 토너 2')
+        self.assertEqual(snapshot.classify({**product(2, sale_price=1000), 'url_hash': url_hash(product(2)['cosmetic_url'])}),
+                         UNCHANGED)
+
+    def test_known_price_from_snapshot_or_table(self):
+        write([product(1), product(2, price=None, sale_price=1000)])
+        url = product(1)['cosmetic_url']
+
+        self.assertEqual(ProductWriter('oycosmetic', TODAY).known_price(url), 33000)
+        writer = ProductWriter('oycosmetic', TODAY, snapshot=CatalogueSnapshot.load('oycosmetic'))
+        self.assertEqual(writer.known_price(url), 33000)
+        self.assertIsNone(writer.known_price(product(2)['cosmetic_url']))
+        self.assertIsNone(writer.known_price(product(3)['cosmetic_url']))
+
+
+class CatalogueSnapshotTests(TestCase):
+    def classify(self, snapshot, product_data):
+        return snapshot.classify({**product_data, 'url_hash': url_hash(product_data['cosmetic_url'])})
+
+    def test_loads_in_chunks_and_classifies(self):
+        write([product(number) for number in range(1, 6)])
+        snapshot = CatalogueSnapshot.load('oycosmetic', chunk_size=2)
+
+        self.assertEqual(len(snapshot), 5)
+        self.assertEqual(self.classify(snapshot, product(3)), UNCHANGED)
+        self.assertEqual(self.classify(snapshot, product(3, price=30000)), CHANGED)
+        self.assertEqual(self.classify(snapshot, product(6)), NEW)
+
+    def test_missing_price_differs_from_zero(self):
+        self.assertNotEqual(pack_prices(None, 1000), pack_prices(0, 1000))
+        self.assertNotEqual(pack_prices(1000, None), pack_prices(1000, 0))
+
+    def test_update_and_known_price(self):
+        snapshot = CatalogueSnapshot()
+        data = {**product(1), 'url_hash': url_hash(product(1)['cosmetic_url'])}
+        self.assertIsNone(snapshot.known_price(data['url_hash']))
+        snapshot.update(data)
+        self.assertEqual(snapshot.known_price(data['url_hash']), 33000)
+        self.assertEqual(snapshot.classify(data), UNCHANGED)
+        snapshot.update({**data, 'price': None})
+        self.assertIsNone(snapshot.known_price(data['url_hash']))
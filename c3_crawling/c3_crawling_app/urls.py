@@ -0,0 +1,9 @@
+from django.urls import path
+from c3_crawling_app import views
+
+urlpatterns = [
+    path('products/<str:site>/', views.products, name='api-products'),
+    path('ranking/', views.ranking, name='api-ranking'),
+    path('compare/<int:oy_product_id>/', views.compare, name='api-compare'),
+    path('search/', views.search, name='api-search'),
+]
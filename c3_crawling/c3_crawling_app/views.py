@@ -1,3 +1,241 @@
-from django.shortcuts import render
+from django.core.cache import cache
+from django.core.exceptions import BadRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+from c3_crawling_app.crawling.catalog_version import current_versions
+from c3_crawling_app.crawling.ranking import MATCH_SITES, lowest_price
+from c3_crawling_app.crawling.search import search_products
+from c3_crawling_app.models import Msscosmetic, Oycosmetic, ProductMatch, Ranking, RankingHistory, Zzcosmetic
+from datetime import date
+from urllib.parse import urlencode
+import base64
+import hashlib
+import json
 
-# Create your views here.
+PRODUCT_MODELS = {
+    'oliveyoung': Oycosmetic,
+    'zigzag': Zzcosmetic,
+    'musinsa': Msscosmetic,
+}
+
+PRODUCT_FIELDS = (
+    'id', 'category', 'brand', 'cosmetic_name', 'price', 'sale_price', 'discount_rate',
+    'cosmetic_url', 'image_url', 'updated_at',
+)
+RANKING_FIELDS = (
+    'id', 'snapshot_date', 'category', 'rank', 'brand', 'cosmetic_name', 'price', 'sale_price',
+    'cosmetic_url', 'image_url', 'oy_product_id', 'oy_price', 'zz_price', 'mss_price',
+    'lowest_price',
+)
+
+# order 파라미터 → (정렬 컬럼, 내림차순 여부). 모두 id 를 덧붙여 정렬해서 커서가 한 행을 가리키고,
+# (category|brand, 컬럼, id) 인덱스를 순서대로 읽는다
+ORDERINGS = {
+    'id': (None, False),
+    'price': ('sale_price', False),
+    'discount': ('discount_rate', True),
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """cursor 를 정렬 값 목록으로 푼다. 정렬 컬럼이 모두 정수라서 size 개의 정수여야 한다."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise BadRequest('잘못된 cursor 입니다')
+    # bool 도 int 이므로 type 으로 비교한다
+    if not isinstance(values, list) or len(values) != size or any(type(value) is not int for value in values):
+        raise BadRequest('잘못된 cursor 입니다')
+    return values
+
+
+def page_cursor(request, column):
+    cursor = request.GET.get('cursor')
+    if cursor is None:
+        return None
+    return decode_cursor(cursor, 2 if column else 1)
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise BadRequest('limit 은 정수여야 합니다')
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def page_order(request):
+    order = request.GET.get('order', 'id')
+    if order not in ORDERINGS:
+        raise BadRequest(f'order 는 {", ".join(ORDERINGS)} 중 하나여야 합니다')
+    return ORDERINGS[order]
+
+
+def page_date(request):
+    value = request.GET.get('date')
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest('date 는 YYYY-MM-DD 형식이어야 합니다')
+
+
+def keyset_page(queryset, column, descending, after, limit, fields):
+    """(column, id) 순서로 after(decode_cursor 로 푼 마지막 행의 정렬 값) 다음 limit 개를 읽는다.
+
+    OFFSET 없이 마지막 행의 값보다 뒤인 행만 고르므로, 몇 번째 페이지든 인덱스 범위를
+    limit + 1 행만큼만 읽는다. 다음 페이지가 있으면 next_cursor 에 마지막 행의 정렬 값을 담는다.
+    """
+    ordering = [column, 'id'] if column else ['id']
+    if column:
+        # NULL 은 비교가 안 되므로 정렬 컬럼 값이 있는 행만 보여 준다
+        queryset = queryset.filter(**{f'{column}__isnull': False})
+
+    if after is not None:
+        op = 'lt' if descending else 'gt'
+        if column:
+            value, last_id = after
+            queryset = queryset.filter(
+                Q(**{f'{column}__{op}': value}) | Q(**{column: value, f'id__{op}': last_id})
+            )
+        else:
+            queryset = queryset.filter(**{f'id__{op}': after[0]})
+
+    queryset = queryset.order_by(*[('-' if descending else '') + name for name in ordering])
+    rows = list(queryset.values(*fields)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][name] for name in ordering])
+    return {'results': rows, 'next_cursor': next_cursor}
+
+
+def cached_json(request, scopes, build):
+    """build() 결과를 JSON 으로 돌려준다. 캐시 키와 ETag 는 요청과 scopes 의 catalog_version 으로 만든다.
+
+    크롤링이 데이터를 바꾸면 버전이 올라가서 키가 바뀌므로 따로 지울 필요가 없다.
+    If-None-Match 가 맞으면 catalog_version 만 읽고 304 를 돌려준다.
+    """
+    versions = current_versions(scopes)
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    key = hashlib.sha1(f'{request.path}?{query}|{sorted(versions.items())}'.encode('utf-8')).hexdigest()
+    etag = f'"{key}"'
+
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in [tag.removeprefix('W/') for tag in if_none_match] or '*' in if_none_match:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    body = cache.get(f'api:{key}')
+    if body is None:
+        body = json.dumps(build(), ensure_ascii=False, cls=DjangoJSONEncoder).encode('utf-8')
+        cache.set(f'api:{key}', body)
+    response = HttpResponse(body, content_type='application/json; charset=utf-8')
+    response['ETag'] = etag
+    # 클라이언트도 저장해 두되, 쓰기 전에 ETag 로 바뀌었는지 확인하게 한다
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@require_GET
+def products(request, site):
+    """사이트별 상품 목록. ?category=&brand=&order=id|price|discount&cursor=&limit="""
+    model = PRODUCT_MODELS.get(site)
+    if model is None:
+        raise Http404(f'알 수 없는 사이트: {site}')
+
+    # 잘못된 파라미터는 ETag 를 만들기 전에 400 으로 돌려보낸다
+    column, descending = page_order(request)
+    after = page_cursor(request, column)
+    limit = page_limit(request)
+
+    def build():
+        queryset = model.objects.all()
+        if request.GET.get('category'):
+            queryset = queryset.filter(category=request.GET['category'])
+        if request.GET.get('brand'):
+            queryset = queryset.filter(brand=request.GET['brand'])
+        return keyset_page(queryset, column, descending, after, limit, PRODUCT_FIELDS)
+
+    return cached_json(request, [site], build)
+
+
+@require_GET
+def ranking(request):
+    """올리브영 랭킹과 사이트별 판매가. ?category=전체&date=&cursor=&limit=
+
+    date(YYYY-MM-DD)를 주면 ranking_history 에 남은 그날의 스냅샷을, 없으면 현재 스냅샷을 보여 준다.
+    """
+    snapshot_date = page_date(request)
+    after = page_cursor(request, 'rank')
+    limit = page_limit(request)
+
+    def build():
+        if snapshot_date is None:
+            queryset = Ranking.objects.all()
+        else:
+            queryset = RankingHistory.objects.filter(snapshot_date=snapshot_date)
+        queryset = queryset.filter(category=request.GET.get('category', '전체'))
+        return keyset_page(queryset, 'rank', False, after, limit, RANKING_FIELDS)
+
+    return cached_json(request, ['ranking'], build)
+
+
+@require_GET
+def compare(request, oy_product_id):
+    """올리브영 상품 하나와 맺어진 지그재그/무신사 상품의 가격 비교."""
+    def build():
+        product = Oycosmetic.objects.filter(id=oy_product_id).values(*PRODUCT_FIELDS).first()
+        if product is None:
+            raise Http404(f'올리브영 상품 {oy_product_id} 이(가) 없습니다')
+
+        matches = {}
+        for site in MATCH_SITES:
+            scores = dict(
+                ProductMatch.objects.filter(site=site, oy_product_id=oy_product_id)
+                .values_list('product_id', 'score')
+            )
+            rows = PRODUCT_MODELS[site].objects.filter(id__in=scores).values(*PRODUCT_FIELDS)
+            matches[site] = sorted(
+                ({**row, 'score': scores[row['id']]} for row in rows),
+                key=lambda row: -row['score'],
+            )
+        return {
+            'product': product,
+            'matches': matches,
+            'lowest_price': lowest_price(
+                product['sale_price'], *(row['sale_price'] for rows in matches.values() for row in rows)
+            ),
+        }
+
+    return cached_json(request, [*PRODUCT_MODELS, 'product_match'], build)
+
+
+@require_GET
+def search(request):
+    """세 사이트 상품을 브랜드/상품명으로 찾는다. ?q=&site=(여러 번 가능)&limit="""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        raise BadRequest('q 는 비울 수 없습니다')
+    sites = request.GET.getlist('site') or list(PRODUCT_MODELS)
+    unknown = [site for site in sites if site not in PRODUCT_MODELS]
+    if unknown:
+        raise BadRequest(f'알 수 없는 사이트: {", ".join(unknown)}')
+    limit = page_limit(request)
+
+    def build():
+        return {'results': search_products(query, sites, limit)}
+
+    return cached_json(request, sites, build)